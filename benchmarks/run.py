@@ -0,0 +1,238 @@
+import os
+import sys
+import json
+import math
+import time
+import signal
+import socket
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.stand_in import StandInServer, Fault, HOSTS
+from src.paths import PROJECT_ROOT
+
+SCENARIOS = ["news", "biotech", "xposting", "listener", "webhook"]
+
+COMMANDS = {
+    "news": [sys.executable, "news/main.py", "--ticker", "DNA", "--include-seen"],
+    "biotech": [sys.executable, "biotech_news/main.py", "--include-seen", "--mode", "merge"],
+    "xposting": [sys.executable, "xPosting/main.py", "--include-seen"],
+    "listener": [sys.executable, "-m", "src.listener", "--workers", "4"],
+    "webhook": [sys.executable, "-m", "src.webhook", "--workers", "4"],
+}
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+def bench_env(server: StandInServer, cache_dir: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "HTTP_BASE_OVERRIDES": server.overrides(),
+        "STOCK_BOT_CACHE_DIR": cache_dir,
+        "PYTHONPATH": PROJECT_ROOT,
+        # Dummy credentials: the stand-in server does not check them
+        "GEMINI_API_KEY": "bench",
+        "TELEGRAM_BOT_TOKEN": "bench",
+        "TELEGRAM_CHAT_ID": "1",
+        "X_CONSUMER_KEY": "bench",
+        "X_CONSUMER_SECRET": "bench",
+        "X_ACCESS_TOKEN": "bench",
+        "X_ACCESS_TOKEN_SECRET": "bench",
+        "X_BEARER_TOKEN": "bench",
+        # Measure our own overhead, not the production posting quotas
+        "X_POSTS_PER_DAY": "1000000",
+        "TELEGRAM_CHAT_PER_SEC": "1000",
+        # The stand-in does not impersonate Yahoo Finance
+        "MARKET_DATA": "0",
+    })
+    return env
+
+def run_process(command: list, env: dict, log_path: str, timeout: float) -> dict:
+    """Runs one entry point; returns wall time, exit status and peak RSS of that process."""
+    started = time.perf_counter()
+    with open(log_path, "ab") as log:
+        proc = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        deadline = time.time() + timeout
+        while True:
+            pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.time() > deadline:
+                proc.kill()
+                pid, status, usage = os.wait4(proc.pid, 0)
+                break
+            time.sleep(0.005)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        "elapsed": time.perf_counter() - started,
+        "returncode": proc.returncode,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": usage.ru_maxrss / 1024,
+    }
+
+def bench_entry_point(name: str, server: StandInServer, iterations: int, work_dir: str, warm: bool, timeout: float) -> dict:
+    runs = []
+    shared_cache = os.path.join(work_dir, f"{name}-cache")
+    for i in range(iterations):
+        server.reset()
+        cache_dir = shared_cache if warm else os.path.join(work_dir, f"{name}-cache-{i}")
+        env = bench_env(server, cache_dir)
+        if not warm:
+            env["LLM_CACHE_BYPASS"] = "1"
+        result = run_process(COMMANDS[name], env, os.path.join(work_dir, f"{name}.log"), timeout)
+        result["requests"] = dict(server.request_counts)
+        result["injected_errors"] = dict(server.error_counts)
+        result["tweets"] = len(server.tweets)
+        result["telegram_messages"] = len(server.telegram_sent)
+        runs.append(result)
+
+    latencies = [r["elapsed"] for r in runs]
+    return {
+        "scenario": name,
+        "runs": iterations,
+        "failed_runs": sum(1 for r in runs if r["returncode"] != 0),
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "throughput_per_sec": iterations / sum(latencies) if latencies else 0.0,
+        "peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+        "tweets": sum(r["tweets"] for r in runs),
+        "telegram_messages": sum(r["telegram_messages"] for r in runs),
+        "injected_errors": sum(sum(r["injected_errors"].values()) for r in runs),
+        "requests_per_run": runs[-1]["requests"],
+    }
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def bench_listener(server: StandInServer, messages: int, chats: int, work_dir: str, timeout: float,
+                   mode: str = "listener") -> dict:
+    """
+    Starts the listener against the stand-in Telegram API, pushes `messages` updates across
+    `chats` chats and measures update → tweet latency for each one. With mode="webhook"
+    the stand-in POSTs the updates to src.webhook instead of serving getUpdates.
+    """
+    server.reset()
+    env = bench_env(server, os.path.join(work_dir, f"{mode}-cache"))
+    log = open(os.path.join(work_dir, f"{mode}.log"), "ab")
+    command = list(COMMANDS[mode])
+    if mode == "webhook":
+        port = free_port()
+        command += ["--url", f"http://127.0.0.1:{port}/telegram", "--listen", f"127.0.0.1:{port}"]
+    started = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        if mode == "webhook":
+            if not server.wait_for(lambda s: s.webhook is not None, timeout=30):
+                raise RuntimeError("웹훅이 등록되지 않았습니다. webhook.log를 확인하세요.")
+        # Wait for the first long poll so the updates are not skipped as "old messages"
+        elif not server.wait_for(lambda s: s.polls >= 2, timeout=30):
+            raise RuntimeError("리스너가 getUpdates를 호출하지 않았습니다. listener.log를 확인하세요.")
+        texts = [f"bench message {i} #DNA" for i in range(messages)]
+        pushed = server.push_updates(texts, chat_ids=list(range(1, chats + 1)))
+        push_started = pushed[0][1]
+        completed = server.wait_for(lambda s: len(s.tweets) >= messages, timeout=timeout)
+        finished = time.time()
+
+        posted_at = {}
+        for received_at, text in server.tweets:
+            posted_at.setdefault(text, received_at)
+        latencies = [posted_at[text] - pushed_at for text, (_, pushed_at) in zip(texts, pushed) if text in posted_at]
+    finally:
+        # KeyboardInterrupt path: finish in-flight work, drain the queue, write metrics
+        proc.send_signal(signal.SIGINT)
+        try:
+            _, status, usage = os.wait4(proc.pid, 0)
+        except ChildProcessError:
+            usage = None
+        log.close()
+
+    return {
+        "scenario": mode,
+        "runs": 1,
+        "messages": messages,
+        "delivered": len(latencies),
+        "completed": completed,
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "throughput_per_sec": len(latencies) / (finished - push_started) if latencies else 0.0,
+        "peak_rss_mb": usage.ru_maxrss / 1024 if usage else None,
+        "wall": time.perf_counter() - started,
+        "injected_errors": sum(server.error_counts.values()),
+        "requests_per_run": dict(server.request_counts),
+    }
+
+def parse_faults(args) -> tuple:
+    default = Fault(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, error_rate=args.error_rate)
+    faults = {}
+    for spec in args.host_fault or []:
+        # HOST=LATENCY_MS[:ERROR_RATE]
+        host, _, values = spec.partition("=")
+        latency, _, error_rate = values.partition(":")
+        if host not in HOSTS:
+            raise SystemExit(f"unknown host {host!r}; known: {', '.join(HOSTS)}")
+        faults[host] = Fault(latency=float(latency or 0) / 1000, jitter=default.jitter,
+                             error_rate=float(error_rate) if error_rate else default.error_rate)
+    return faults, default
+
+def print_report(results: list):
+    print(f"{'scenario':<10} {'runs':>5} {'p50 (s)':>9} {'p95 (s)':>9} {'thru/s':>8} {'peak RSS':>10} {'errors':>7}")
+    for r in results:
+        p50 = f"{r['p50']:.3f}" if r["p50"] is not None else "-"
+        p95 = f"{r['p95']:.3f}" if r["p95"] is not None else "-"
+        rss = f"{r['peak_rss_mb']:.1f} MB" if r.get("peak_rss_mb") else "-"
+        runs = r["runs"] if r["scenario"] not in ("listener", "webhook") else f"{r['delivered']}/{r['messages']}"
+        print(f"{r['scenario']:<10} {runs:>5} {p50:>9} {p95:>9} {r['throughput_per_sec']:>8.2f} {rss:>10} {r['injected_errors']:>7}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark against local stand-in services")
+    parser.add_argument("scenarios", nargs="*", default=SCENARIOS, help=f"Scenarios to run (default: {' '.join(SCENARIOS)})")
+    parser.add_argument("--iterations", type=int, default=5, help="Runs per main.py scenario (default: 5)")
+    parser.add_argument("--messages", type=int, default=50, help="Telegram messages pushed in the listener/webhook scenarios (default: 50)")
+    parser.add_argument("--chats", type=int, default=5, help="Distinct chats in the listener/webhook scenarios (default: 5)")
+    parser.add_argument("--warm", action="store_true", help="Reuse the HTTP/LLM caches between iterations")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected latency for every stand-in request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform jitter added to the injected latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--host-fault", action="append", metavar="HOST=MS[:RATE]", help="Per-host latency/error rate, repeatable")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-run timeout in seconds")
+    parser.add_argument("--work-dir", type=str, help="Keep caches and per-scenario logs here (default: temporary directory)")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    faults, default = parse_faults(args)
+    server = StandInServer(faults=faults, default_fault=default).start()
+    results = []
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="stock_bot_bench_") as temp_dir:
+        work_dir = args.work_dir or temp_dir
+        try:
+            for name in args.scenarios:
+                if name in ("listener", "webhook"):
+                    results.append(bench_listener(server, args.messages, args.chats, work_dir, args.timeout, mode=name))
+                else:
+                    results.append(bench_entry_point(name, server, args.iterations, work_dir, args.warm, args.timeout))
+        finally:
+            server.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+if __name__ == "__main__":
+    # Run from the project root: python -m benchmarks.run
+    main()
@@ -0,0 +1,392 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Original host -> fixture served for GET requests on it
+FEED_FIXTURES = {
+    "news.google.com": ("google_news.xml", "application/rss+xml; charset=utf-8"),
+    "www.fiercebiotech.com": ("fiercebiotech.xml", "application/rss+xml; charset=utf-8"),
+    "www.biopharmadive.com": ("biopharmadive.xml", "application/rss+xml; charset=utf-8"),
+    "endpts.com": ("endpts.xml", "application/rss+xml; charset=utf-8"),
+    "www.genengnews.com": ("genengnews.xml", "application/rss+xml; charset=utf-8"),
+    "www.nature.com": ("nature_nbt.xml", "application/rdf+xml; charset=utf-8"),
+    "www.statnews.com": ("statnews.xml", "application/rss+xml; charset=utf-8"),
+    "investors.ginkgobioworks.com": ("ginkgo_ir.html", "text/html; charset=utf-8"),
+}
+# (host, ?page=N) -> fixture for later pages of paginated listings
+PAGE_FIXTURES = {
+    ("investors.ginkgobioworks.com", "2"): "ginkgo_ir_page2.html",
+}
+TELEGRAM_HOST = "api.telegram.org"
+X_HOST = "api.twitter.com"
+GEMINI_HOST = "generativelanguage.googleapis.com"
+
+SNOWFLAKE_EPOCH_MS = 1288834974657
+
+# streamGenerateContent answers in this many pieces, GEMINI_STREAM_INTERVAL seconds apart
+GEMINI_STREAM_CHUNKS = 8
+GEMINI_STREAM_INTERVAL = 0.15
+
+# Like Telegram: concurrent webhook deliveries, and attempts before an update is dropped
+WEBHOOK_CONNECTIONS = 10
+WEBHOOK_ATTEMPTS = 5
+
+HOSTS = list(FEED_FIXTURES) + [TELEGRAM_HOST, X_HOST, GEMINI_HOST]
+
+# {{rfc822:-3h}}, {{iso:-2d}}, {{date:-4d}}: timestamps relative to the time of the request
+_PLACEHOLDER = re.compile(r"\{\{(rfc822|iso|date):(-?\d+)([hd])\}\}")
+# Google News "before:YYYY-MM-DD" search operator
+_BEFORE = re.compile(r"\bbefore:(\d{4}-\d{2}-\d{2})")
+
+def render_fixture(text: str, now: datetime = None) -> str:
+    """Fills the relative timestamp placeholders so recorded fixtures never go stale."""
+    now = now or datetime.now(timezone.utc)
+
+    def replace(match):
+        kind, amount, unit = match.group(1), int(match.group(2)), match.group(3)
+        moment = now + (timedelta(hours=amount) if unit == "h" else timedelta(days=amount))
+        if kind == "rfc822":
+            return format_datetime(moment)
+        if kind == "iso":
+            return moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        return moment.strftime("%b %d, %Y")
+    return _PLACEHOLDER.sub(replace, text)
+
+
+class Fault:
+    """Injected behaviour for one host: latency (seconds, plus uniform jitter) and error rate."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 503):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    def delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+
+class StandInServer:
+    """
+    One local HTTP server impersonating every external service the bots talk to.
+
+    Requests arrive as /<original host>/<original path> (see HTTP_BASE_OVERRIDES in
+    src.http_session), so a single port serves Google News, the biotech feeds, the Ginkgo
+    IR page, the Telegram Bot API, the X v2 API and Gemini.
+    """
+
+    def __init__(self, faults: dict = None, default_fault: Fault = None, host: str = "127.0.0.1", port: int = 0):
+        self.faults = faults or {}
+        self.default_fault = default_fault or Fault()
+        self._lock = threading.Lock()
+        self._updates_changed = threading.Condition(self._lock)
+        self._fixtures = {}
+        self._tweets = None
+        self.started = datetime.now(timezone.utc)
+        self._next_message_id = 1
+        self._next_tweet_id = 1900000000000000000
+        self._next_update_id = 1000
+        self._webhook_pool = ThreadPoolExecutor(max_workers=WEBHOOK_CONNECTIONS, thread_name_prefix="stand-in-webhook")
+        self.webhook = None       # (url, secret_token) registered through setWebhook
+        self.webhook_failures = 0 # webhook deliveries answered with an error
+        self.updates = []         # pending Telegram updates served by getUpdates
+        self.tweets = []          # (received_at, text) posted to X
+        self.telegram_sent = []   # (received_at, chat_id, text) sent through sendMessage
+        self.telegram_edits = []  # (received_at, message_id, text) from editMessageText
+        self.request_counts = {}  # host -> requests
+        self.error_counts = {}    # host -> injected errors
+        self.polls = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def overrides(self) -> str:
+        """Value for the HTTP_BASE_OVERRIDES environment variable."""
+        return ",".join(f"{host}={self.base_url}/{host}" for host in HOSTS)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._lock:
+            self._updates_changed.notify_all()
+        self._webhook_pool.shutdown(wait=False, cancel_futures=True)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.updates.clear()
+            self.tweets.clear()
+            self.telegram_sent.clear()
+            self.telegram_edits.clear()
+            self.request_counts.clear()
+            self.error_counts.clear()
+            self.polls = 0
+            self.webhook = None
+            self.webhook_failures = 0
+
+    # ---- Telegram update injection ------------------------------------
+
+    def push_updates(self, texts: list, chat_ids: list = None) -> list:
+        """
+        Sends incoming Telegram messages: queued for getUpdates, or POSTed to the webhook
+        when one is registered. Returns [(update_id, pushed_at)].
+        """
+        chat_ids = chat_ids or [1]
+        pushed = []
+        with self._lock:
+            webhook = self.webhook
+            for i, text in enumerate(texts):
+                chat_id = chat_ids[i % len(chat_ids)]
+                update_id = self._next_update_id
+                self._next_update_id += 1
+                update = {
+                    "update_id": update_id,
+                    "message": {"message_id": update_id, "date": int(time.time()), "text": text,
+                                "chat": {"id": chat_id, "type": "private"}, "from": {"id": chat_id, "is_bot": False}},
+                }
+                if webhook:
+                    self._webhook_pool.submit(self._deliver, webhook, update)
+                else:
+                    self.updates.append(update)
+                pushed.append((update_id, time.time()))
+            self._updates_changed.notify_all()
+        return pushed
+
+    def _deliver(self, webhook: tuple, update: dict):
+        url, secret = webhook
+        data = json.dumps(update).encode("utf-8")
+        for attempt in range(WEBHOOK_ATTEMPTS):
+            request = urllib.request.Request(url, data=data, method="POST", headers={
+                "Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": secret or ""})
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    if response.status == 200:
+                        return
+            except Exception:
+                pass
+            with self._lock:
+                self.webhook_failures += 1
+            time.sleep(0.2 * 2 ** attempt)
+
+    def wait_for(self, predicate, timeout: float) -> bool:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._lock:
+                if predicate(self):
+                    return True
+            time.sleep(0.01)
+        return False
+
+    # ---- request handling ------------------------------------------------
+
+    def _fixture(self, name: str) -> str:
+        if name not in self._fixtures:
+            with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+                self._fixtures[name] = f.read()
+        return self._fixtures[name]
+
+    def _get_updates(self, query: dict) -> dict:
+        offset = int(query.get("offset", [0])[0] or 0)
+        timeout = min(float(query.get("timeout", [0])[0] or 0), 5.0)
+        deadline = time.time() + timeout
+        with self._lock:
+            self.polls += 1
+            # getUpdates confirms everything below `offset`
+            self.updates = [u for u in self.updates if u["update_id"] >= offset]
+            while not self.updates and time.time() < deadline:
+                self._updates_changed.wait(deadline - time.time())
+            return {"ok": True, "result": list(self.updates[:100])}
+
+    def _telegram(self, method: str, path: str, query: dict, body: dict):
+        name = path.rsplit("/", 1)[-1]
+        if name == "getUpdates":
+            if self.webhook:
+                return 409, {"ok": False, "error_code": 409,
+                             "description": "Conflict: can't use getUpdates method while webhook is active"}
+            return 200, self._get_updates(query)
+        if name in ("sendMessage", "editMessageText"):
+            with self._lock:
+                message_id = body.get("message_id")
+                if message_id:
+                    self.telegram_edits.append((time.time(), message_id, body.get("text", "")))
+                else:
+                    message_id = self._next_message_id
+                    self._next_message_id += 1
+                    self.telegram_sent.append((time.time(), body.get("chat_id"), body.get("text", "")))
+            return 200, {"ok": True, "result": {"message_id": message_id, "date": int(time.time()),
+                                                "chat": {"id": body.get("chat_id")}, "text": body.get("text", "")}}
+        if name == "setWebhook":
+            with self._lock:
+                self.webhook = (body.get("url"), body.get("secret_token")) if body.get("url") else None
+            return 200, {"ok": True, "result": True, "description": "Webhook was set"}
+        if name == "deleteWebhook":
+            with self._lock:
+                self.webhook = None
+            return 200, {"ok": True, "result": True, "description": "Webhook was deleted"}
+        return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+
+    def _x(self, method: str, path: str, query: dict, body: dict):
+        if method == "POST" and path.endswith("/2/tweets"):
+            with self._lock:
+                tweet_id = str(self._next_tweet_id)
+                self._next_tweet_id += 1
+                self.tweets.append((time.time(), body.get("text", "")))
+            return 201, {"data": {"id": tweet_id, "text": body.get("text", ""), "edit_history_tweet_ids": [tweet_id]}}
+        if path.endswith("/2/tweets/search/recent"):
+            return 200, self._search_recent(query)
+        return 404, {"title": "Not Found Error", "status": 404}
+
+    def _search_recent(self, query: dict) -> dict:
+        """search/recent with since_id, max_results and next_token (an offset here)."""
+        if self._tweets is None:
+            # Rendered once: tweets must keep their IDs and times for since_id to work
+            fixture = json.loads(render_fixture(self._fixture("x_search_recent.json"), now=self.started))
+            for i, tweet in enumerate(fixture["data"]):
+                created = datetime.strptime(tweet["created_at"], "%Y-%m-%dT%H:%M:%S.000Z").replace(tzinfo=timezone.utc)
+                tweet["id"] = str(((int(created.timestamp() * 1000) - SNOWFLAKE_EPOCH_MS) << 22) + i)
+                tweet["edit_history_tweet_ids"] = [tweet["id"]]
+            fixture["data"].sort(key=lambda t: int(t["id"]), reverse=True)
+            self._tweets = fixture
+
+        since_id = int(query.get("since_id", ["0"])[0])
+        page_size = max(10, min(100, int(query.get("max_results", ["10"])[0])))
+        offset = int(query.get("next_token", ["0"])[0])
+        matching = [t for t in self._tweets["data"] if int(t["id"]) > since_id]
+        page = matching[offset:offset + page_size]
+        meta = {"result_count": len(page)}
+        if page:
+            meta.update(newest_id=page[0]["id"], oldest_id=page[-1]["id"])
+        if offset + page_size < len(matching):
+            meta["next_token"] = str(offset + page_size)
+        result = {"meta": meta}
+        if page:
+            authors = {t["author_id"] for t in page}
+            result["data"] = page
+            result["includes"] = {"users": [u for u in self._tweets["includes"]["users"] if u["id"] in authors]}
+        return result
+
+    def _gemini(self, body: dict):
+        """The fixture answer; batched (JSON) requests get it once per task id."""
+        config = body.get("generationConfig") or {}
+        if config.get("responseMimeType") != "application/json":
+            return self._fixture("gemini_generate.json")
+        response = json.loads(self._fixture("gemini_generate.json"))
+        prompt = " ".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+        answer = response["candidates"][0]["content"]["parts"][0]["text"]
+        results = [{"id": task_id, "text": answer} for task_id in re.findall(r"=== TASK id=(\S+) ", prompt)]
+        response["candidates"][0]["content"]["parts"][0]["text"] = json.dumps({"results": results}, ensure_ascii=False)
+        return response
+
+    def _gemini_stream(self) -> list:
+        """The fixture answer cut into SSE events, the way streamGenerateContent sends it."""
+        response = json.loads(self._fixture("gemini_generate.json"))
+        answer = response["candidates"][0]["content"]["parts"][0]["text"]
+        size = max(1, len(answer) // GEMINI_STREAM_CHUNKS)
+        events = []
+        for start in range(0, len(answer), size):
+            chunk = json.loads(json.dumps(response))
+            chunk["candidates"][0]["content"]["parts"][0]["text"] = answer[start:start + size]
+            if start + size < len(answer):
+                chunk["candidates"][0].pop("finishReason", None)
+                chunk.pop("usageMetadata", None)
+            events.append(f"data: {json.dumps(chunk, ensure_ascii=False)}\r\n\r\n".encode("utf-8"))
+        return events
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, payload, content_type: str = "application/json"):
+                data = payload if isinstance(payload, bytes) else (
+                    payload.encode("utf-8") if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_events(self, events: list, interval: float):
+                # No Content-Length: the body ends when the connection closes
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for event in events:
+                    self.wfile.write(event)
+                    self.wfile.flush()
+                    time.sleep(interval)
+                self.close_connection = True
+
+            def _handle(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                parts = urlsplit(self.path)
+                _, host, path = parts.path.split("/", 2) if parts.path.count("/") >= 2 else ("", parts.path.strip("/"), "")
+                path = "/" + path
+                query = parse_qs(parts.query)
+
+                with stand_in._lock:
+                    stand_in.request_counts[host] = stand_in.request_counts.get(host, 0) + 1
+                fault = stand_in.faults.get(host, stand_in.default_fault)
+                delay = fault.delay()
+                if delay:
+                    time.sleep(delay)
+                if fault.error_rate and random.random() < fault.error_rate:
+                    with stand_in._lock:
+                        stand_in.error_counts[host] = stand_in.error_counts.get(host, 0) + 1
+                    return self._send(fault.error_status, {"ok": False, "error_code": fault.error_status, "description": "injected failure"})
+
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    body = {k: v[0] for k, v in parse_qs(raw.decode("utf-8", "replace")).items()}
+
+                if host in FEED_FIXTURES:
+                    name, content_type = FEED_FIXTURES[host]
+                    name = PAGE_FIXTURES.get((host, query.get("page", [""])[0]), name)
+                    # Historical searches (news/backfill.py) see the fixture as of the window end
+                    before = _BEFORE.search(query.get("q", [""])[0])
+                    now = datetime.strptime(before.group(1), "%Y-%m-%d").replace(tzinfo=timezone.utc) if before else None
+                    return self._send(200, render_fixture(stand_in._fixture(name), now), content_type)
+                if host == TELEGRAM_HOST:
+                    return self._send(*stand_in._telegram(method, path, query, body))
+                if host == X_HOST:
+                    return self._send(*stand_in._x(method, path, query, body))
+                if host == GEMINI_HOST and path.endswith(":streamGenerateContent"):
+                    return self._send_events(stand_in._gemini_stream(), GEMINI_STREAM_INTERVAL)
+                if host == GEMINI_HOST and path.endswith(":generateContent"):
+                    return self._send(200, stand_in._gemini(body))
+                return self._send(404, {"error": f"no stand-in for {host}{path}"})
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+        return Handler
@@ -1,80 +1,130 @@
-import feedparser
-import logging
-from datetime import datetime, timedelta
 import time
-import requests
-import random
+import os
+import logging
+from functools import partial
+from src.fanout import fan_out, MODE_FIRST
+from src.http_cache import cached_get, cached_parse
+from src.feed_stream import parse_feed
+from src import seen_store, metrics
+from src.source_health import get_health, ORDER_HEALTH
+from src.news_item import NewsItem, filter_since, newest_first
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def fetch_biotech_news(lookback_hours: int = 24) -> list:
+RSS_SOURCES = [
+    {"name": "Fierce Biotech", "url": "https://www.fiercebiotech.com/rss"},
+    {"name": "BioPharma Dive", "url": "https://www.biopharmadive.com/feeds/news/"},
+    {"name": "Endpoints News", "url": "https://endpts.com/feed"},
+    {"name": "GEN (Genetic Engineering & Biotechnology News)", "url": "https://www.genengnews.com/feed"},
+    {"name": "Nature Biotechnology", "url": "https://www.nature.com/nbt.rss"},
+    {"name": "STAT News", "url": "https://www.statnews.com/feed/"}
+]
+
+SEEN_SOURCE = "biotech"
+
+# 연속으로 이 개수만큼 기간 밖 항목이 나오면 피드 읽기를 멈춥니다
+STALE_LIMIT = 5
+
+# first 모드에서 동시에 조회할 소스 수. 나머지는 상위 소스가 실패할 때만 순서대로 조회합니다
+FIRST_PARALLEL = int(os.getenv("BIOTECH_FIRST_PARALLEL", "3"))
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+def _fetch_source(source: dict, cutoff: int, lookback_hours: int, skip_seen: bool) -> list:
+    """
+    단일 RSS 소스를 가져와 cutoff(UTC epoch) 이후의 항목만 반환합니다.
+    피드는 최신순이므로 오래된 항목이 연속으로 나오면 파싱을 중단합니다.
+    변경되지 않은 피드(304 또는 동일 본문)는 다시 파싱하지 않습니다.
+    응답 시간, 오류, 최신 항목 시각은 src.source_health에 기록됩니다.
+    """
+    health = get_health()
+    started = time.monotonic()
+    try:
+        # 타임아웃은 고정 15초 대신 이 소스의 평소 응답 시간에 맞춥니다
+        response = cached_get(source['url'], headers=HEADERS, timeout=health.timeout(source['name']))
+        entries = cached_parse(
+            response,
+            partial(parse_feed, cutoff=cutoff, stale_limit=STALE_LIMIT),
+            version=f"stream-{lookback_hours}h"
+        )
+    except Exception:
+        health.record_failure(source['name'], time.monotonic() - started)
+        raise
+    newest = max((int(entry['published']) for entry in entries if entry['published']), default=None)
+    health.record_success(source['name'], None if response.fresh else time.monotonic() - started, newest)
+
+    if not entries:
+        logger.warning(f"{source['name']}에서 최근 항목을 찾을 수 없습니다.")
+        return []
+
+    # 날짜가 없는 항목은 지금 발행된 것으로 간주
+    now = int(time.time())
+    items = [
+        NewsItem(entry['title'] or '제목 없음', entry['link'], entry['summary'], source['name'],
+                 int(entry['published']) if entry['published'] else now)
+        for entry in entries
+    ]
+    source_news_items = filter_since(items, cutoff)
+
+    if skip_seen:
+        source_news_items = seen_store.filter_new(SEEN_SOURCE, source_news_items)
+
+    if not source_news_items:
+        logger.info(f"{source['name']}에 최근 새 뉴스가 없습니다.")
+    return source_news_items
+
+@metrics.timed("fetch_seconds", source="biotech")
+def fetch_biotech_news(lookback_hours: int = 24, mode: str = MODE_FIRST, deadline: float = 20.0, skip_seen: bool = True,
+                       order: str = ORDER_HEALTH) -> list:
     """
-    여러 바이오테크 뉴스 소스(Nature, FierceBiotech 등)에서 랜덤하게 하나를 선택하여 최신 기술 뉴스를 가져옵니다.
+    여러 바이오테크 뉴스 소스(Nature, FierceBiotech 등)를 동시에 조회하여 최신 기술 뉴스를 가져옵니다.
     
     Args:
         lookback_hours (int): 현재 시간 기준 조회할 시간 범위 (기본값: 24시간).
+        mode (str): "first" - 가장 먼저 뉴스를 돌려준 소스 하나만 사용하고 나머지는 취소합니다.
+                    "merge" - 마감 시간 안에 응답한 모든 소스의 뉴스를 합칩니다.
+        deadline (float): 전체 조회에 허용할 최대 시간(초). 느린 소스는 기다리지 않습니다.
+        skip_seen (bool): 이전 실행에서 이미 전달한 뉴스는 제외합니다 (src.seen_store).
+        order (str): "health" - 응답 속도, 오류율, 최신성 점수가 높은 소스부터 조회합니다.
+                     "weighted" - 점수를 가중치로 한 무작위 순서 (다양한 콘텐츠용).
         
     Returns:
-        list: 뉴스 항목 리스트 (title, summary, link, published_at).
+        list: NewsItem 리스트 (최신순 정렬은 merge 모드에서만).
     """
-    rss_sources = [
-        {"name": "Fierce Biotech", "url": "https://www.fiercebiotech.com/rss"},
-        {"name": "BioPharma Dive", "url": "https://www.biopharmadive.com/feeds/news/"},
-        {"name": "Endpoints News", "url": "https://endpts.com/feed"},
-        {"name": "GEN (Genetic Engineering & Biotechnology News)", "url": "https://www.genengnews.com/feed"},
-        {"name": "Nature Biotechnology", "url": "https://www.nature.com/nbt.rss"},
-        {"name": "STAT News", "url": "https://www.statnews.com/feed/"}
-    ]
+    # 상태 점수 순서 (제출 순서 및 merge 결과 순서). 회로가 열린 소스는 제외됩니다
+    by_name = {source['name']: source for source in RSS_SOURCES}
+    health = get_health()
+    plan = health.plan(list(by_name), order=order)
+    rss_sources = [by_name[name] for name in plan]
     
-    # 랜덤하게 순서 섞기
-    random.shuffle(rss_sources)
+    cutoff = int(time.time()) - lookback_hours * 3600
+    tasks = [(source['name'], partial(_fetch_source, source, cutoff, lookback_hours, skip_seen)) for source in rss_sources]
     
-    cutoff_time = datetime.utcnow() - timedelta(hours=lookback_hours)
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    }
+    # first 모드는 상위 소스만 먼저 조회하고, 결과가 나오면 대기 중인 나머지는 취소됩니다.
+    # 반개방(half-open) 소스의 점검 요청은 맨 앞에 오며, 취소되지 않도록 첫 묶음을 그만큼 늘립니다
+    max_workers = FIRST_PARALLEL + len(health.probes(plan)) if mode == MODE_FIRST else None
+    logger.info(f"{len(tasks)}개 소스를 조회합니다 (모드: {mode}, 순서: {', '.join(t[0] for t in tasks)}, 마감: {deadline}초)")
+    result = fan_out(tasks, mode=mode, deadline=deadline, max_workers=max_workers)
     
-    for source in rss_sources:
-        source_news_items = []
-        logger.info(f"오늘의 랜덤 소스 선택: {source['name']} ({source['url']})")
-        
-        try:
-            response = requests.get(source['url'], headers=headers, timeout=15)
-            response.raise_for_status()
-            feed = feedparser.parse(response.content)
-            
-            if not feed.entries:
-                logger.warning(f"{source['name']}에서 항목을 찾을 수 없습니다.")
-                continue
-                
-            for entry in feed.entries:
-                published_parsed = entry.get('published_parsed')
-                if published_parsed:
-                    pub_date = datetime.fromtimestamp(time.mktime(published_parsed))
-                else:
-                    pub_date = datetime.utcnow()
-                    
-                if pub_date >= cutoff_time:
-                    source_news_items.append({
-                        'title': entry.get('title', '제목 없음'),
-                        'summary': entry.get('summary', entry.get('description', '')),
-                        'link': entry.get('link', ''),
-                        'published_at': pub_date.strftime('%Y-%m-%d %H:%M:%S'),
-                        'publisher': source['name']
-                    })
-            
-            if source_news_items:
-                logger.info(f"{source['name']}에서 {len(source_news_items)}개의 최신 뉴스를 찾았습니다.")
-                return source_news_items
-            else:
-                logger.info(f"{source['name']}에 최근 {lookback_hours}시간 내 뉴스가 없습니다. 다음 소스로 시도합니다.")
-                
-        except Exception as e:
-            logger.error(f"{source['name']} 피드 가져오기 오류: {e}")
+    for name, error in result.errors.items():
+        logger.error(f"{name} 피드 가져오기 오류: {error}")
+    
+    if mode == MODE_FIRST:
+        if result.winner:
+            news_items = result.results[result.winner]
+            logger.info(f"{result.winner}에서 {len(news_items)}개의 최신 뉴스를 찾았습니다. ({result.elapsed:.1f}초)")
+            return news_items
+    else:
+        news_items = newest_first(result.merged())
+        if news_items:
+            logger.info(f"{len(result.results)}개 소스에서 {len(news_items)}개의 최신 뉴스를 찾았습니다. ({result.elapsed:.1f}초)")
+            return news_items
             
-    logger.info("모든 소스에서 최신 뉴스를 찾지 못했습니다.")
+    logger.info(f"모든 소스에서 최근 {lookback_hours}시간 내 뉴스를 찾지 못했습니다.")
     return []
 
 if __name__ == "__main__":
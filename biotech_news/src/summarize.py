@@ -1,41 +1,23 @@
 import os
-from google import genai
 import logging
+from src import llm, llm_batch, metrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def summarize_biotech_news(news_items: list) -> str:
+# 프롬프트에 들어가는 항목 필드 (토큰 예산 계산 대상)
+PROMPT_FIELDS = ("title", "summary", "publisher")
+
+def build_instructions() -> str:
     """
-    바이오테크 기술 뉴스를 Gemini를 사용하여 X(트위터) 포스팅용으로 요약합니다.
-    
-    Args:
-        news_items (list): 뉴스 항목 리스트 (title, summary, link, publisher).
-        
-    Returns:
-        str: 생성된 트윗 내용.
+    뉴스 데이터를 뺀 작성 지침입니다. 주제와 상관없이 같으므로 묶음 요청에는 한 번만 들어갑니다.
     """
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        logger.error("환경 변수에서 GEMINI_API_KEY를 찾을 수 없습니다.")
-        return "오류: API 키가 없습니다."
-
-    if not news_items:
-        return "오늘의 주요 바이오테크 기술 뉴스가 없습니다."
-
-    # Prepare the input text
-    news_text = ""
-    for idx, item in enumerate(news_items[:3]): # 상위 3개 뉴스만 사용
-        news_text += f"{idx+1}. 제목: {item['title']}\n내용 요약: {item['summary']}\n출처: {item['publisher']}\n\n"
-
-    prompt = f"""
+    return """
     너는 어려운 바이오 기술을 초등학생도 이해할 수 있을 만큼 쉽게 풀어서 전달하면서도, 
     핵심 인사이트를 콕 짚어주는 '인간미 넘치는 기술 큐레이터'야. 
     딱딱한 AI 말투는 지양하고, 마치 지인에게 오늘의 놀라운 발견을 설명하듯 친근하면서도 날결하게 작성해줘.
 
-    주제: {news_text}
-
     필수 룰 – 절대 어기지 마:
     - 첫 문장은 볼드 효과를 주어 강하게 헤드라인으로 시작 (Unicode Sans-serif Bold 사용: 𝗕𝗢𝗟𝗗 𝗧𝗘𝗫𝗧 이런 식으로 써)
     - **핵심: 어려운 전문 용어가 나오면 반드시 쉬운 비유나 설명을 덧붙여줘. (예: 아셈블로이드 -> 인공 미니 장기)**
@@ -50,21 +32,67 @@ def summarize_biotech_news(news_items: list) -> str:
     - 답변은 반드시 한국어로 작성해줘.
     - 완성된 포스팅 텍스트만 출력해.
     """
+
+def build_task(news_items: list, include_links: bool = False) -> str:
+    """요약할 뉴스 목록입니다. HITL 메시지에는 사람이 확인할 수 있도록 기사 링크도 포함합니다."""
+    news_text = ""
+    for idx, item in enumerate(news_items):
+        publishers = ", ".join(item.get('publishers') or [item['publisher']])
+        news_text += f"{idx+1}. 제목: {item['title']}\n내용 요약: {item['summary']}\n출처: {publishers}\n"
+        if include_links:
+            news_text += f"링크: {item['link']}\n"
+        news_text += "\n"
+
+    return f"""
+    주제:
+    {news_text}
+    """
+
+def build_prompt(news_items: list, include_links: bool = False) -> str:
+    """
+    요약 프롬프트를 만듭니다. summarize_biotech_news와 HITL 메시지가 함께 사용합니다.
+    """
+    return build_instructions() + build_task(news_items, include_links)
+
+def batch_member(news_items: list) -> llm_batch.BatchMember:
+    """묶음 Gemini 요청의 한 항목으로 만듭니다 (src.llm_batch 참고)."""
+    task = build_task(news_items)
+    return llm_batch.BatchMember("biotech", build_instructions(), task)
+
+@metrics.timed("summarize_seconds", bot="biotech")
+def summarize_biotech_news(news_items: list) -> str:
+    """
+    바이오테크 기술 뉴스를 Gemini를 사용하여 X(트위터) 포스팅용으로 요약합니다.
     
-    try:
-        # Initialize Client with the new SDK
-        client = genai.Client(api_key=api_key)
+    Args:
+        news_items (list): 뉴스 항목 리스트 (title, summary, link, publisher). 모두 프롬프트에
+            들어가므로 호출자가 미리 골라야 합니다 (파이프라인의 Select 단계 또는 src.selection.select).
         
-        # Call the model
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt
-        )
-        return response.text.strip()
+    Returns:
+        str: 생성된 트윗 내용.
+    """
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        logger.error("환경 변수에서 GEMINI_API_KEY를 찾을 수 없습니다.")
+        return "오류: API 키가 없습니다."
+
+    if not news_items:
+        return "오늘의 주요 바이오테크 기술 뉴스가 없습니다."
+
+    prompt = build_prompt(news_items)
+
+    try:
+        # Shared client + response cache (identical prompts are not re-billed)
+        return llm.generate(prompt, model='gemini-2.5-flash').strip()
     except Exception as e:
         logger.error(f"요약 생성 오류: {e}")
         return f"Error generating summary: {e}"
 
+def stream_biotech_news(news_items: list):
+    """summarize_biotech_news와 같지만, Gemini가 쓰는 대로 조각 단위로 돌려줍니다."""
+    prompt = build_prompt(news_items)
+    yield from llm.generate_stream(prompt, model='gemini-2.5-flash')
+
 if __name__ == "__main__":
     # 테스트용 스텁
     mock_news = [
@@ -1,6 +1,12 @@
-import requests
+import os
+import sys
 import feedparser
 
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src import http_session
+
 rss_sources = [
     {"name": "Fierce Biotech", "url": "https://www.fiercebiotech.com/rss"},
     {"name": "BioPharma Dive", "url": "https://www.biopharmadive.com/feeds/news/"},
@@ -17,7 +23,7 @@ headers = {
 for source in rss_sources:
     try:
         print(f"Testing {source['name']}...")
-        response = requests.get(source['url'], headers=headers, timeout=10)
+        response = http_session.get(source['url'], headers=headers, timeout=10, retries=0)
         if response.status_code == 200:
             feed = feedparser.parse(response.content)
             if feed.entries:
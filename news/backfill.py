@@ -0,0 +1,152 @@
+import os
+import sys
+import json
+import argparse
+import logging
+import tempfile
+import threading
+from datetime import date, timedelta
+from dotenv import load_dotenv
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from news.src.fetch_news import fetch_news_window, DATE_FORMAT
+from src import news_archive, http_session, metrics
+from src.fanout import fan_out, MODE_MERGE
+from src.news_item import format_epoch, parse_utc
+from src.paths import cache_path
+
+# Load environment variables from .env file for local development
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Days per Google News query; busy tickers need smaller windows (100 items per query)
+WINDOW_DAYS = int(os.getenv("BACKFILL_WINDOW_DAYS", "7"))
+# Concurrent window fetches; Google News throttles aggressive clients
+WORKERS = int(os.getenv("BACKFILL_WORKERS", "4"))
+# Items buffered before they are written as one archive segment
+FLUSH_ROWS = int(os.getenv("BACKFILL_FLUSH_ROWS", "2000"))
+
+def split_windows(start: date, end: date, days: int = WINDOW_DAYS) -> list:
+    """[(after, before)] day strings covering [start, end), newest window first."""
+    windows = []
+    cursor = end
+    while cursor > start:
+        window_start = max(start, cursor - timedelta(days=days))
+        windows.append((window_start.strftime(DATE_FORMAT), cursor.strftime(DATE_FORMAT)))
+        cursor = window_start
+    return windows
+
+
+class Backfill:
+    """
+    Fetches a ticker's history window by window and appends it to src.news_archive.
+    A window is recorded as done in `archive/<TICKER>/backfill.json` only after its items
+    were written, so an interrupted run resumes with the windows it had not finished.
+    """
+
+    def __init__(self, ticker: str, flush_rows: int = FLUSH_ROWS):
+        self.ticker = ticker.upper()
+        self.flush_rows = flush_rows
+        self.progress_path = cache_path(news_archive.ARCHIVE_DIR, self.ticker, "backfill.json")
+        self.done = self._load_progress()
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._buffered_windows = []
+        self.added = 0
+
+    def _load_progress(self) -> set:
+        try:
+            with open(self.progress_path, "r", encoding="utf-8") as f:
+                return set(json.load(f).get("done", []))
+        except (OSError, ValueError):
+            return set()
+
+    def _save_progress(self):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.progress_path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"done": sorted(self.done)}, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def fetch(self, window: tuple) -> int:
+        after, before = window
+        items = fetch_news_window(self.ticker, after, before)
+        metrics.inc("backfill_windows_total", ticker=self.ticker)
+        with self._lock:
+            self._buffer.extend(items)
+            self._buffered_windows.append(f"{after}/{before}")
+            if len(self._buffer) >= self.flush_rows:
+                self._flush()
+        return len(items)
+
+    def _flush(self):
+        # Called with self._lock held
+        if self._buffered_windows:
+            self.added += news_archive.append(self.ticker, self._buffer)
+            self.done.update(self._buffered_windows)
+            self._save_progress()
+        self._buffer, self._buffered_windows = [], []
+
+    def run(self, start: date, end: date, window_days: int = WINDOW_DAYS, workers: int = WORKERS) -> bool:
+        """Returns True when every window of [start, end) is in the archive."""
+        windows = [w for w in split_windows(start, end, window_days) if f"{w[0]}/{w[1]}" not in self.done]
+        if not windows:
+            logger.info(f"{self.ticker}: {start}~{end} 구간은 이미 모두 수집되었습니다.")
+            return True
+        logger.info(f"{self.ticker}: {len(windows)}개 구간을 최대 {workers}개씩 병렬로 수집합니다.")
+
+        result = fan_out([(f"{after}/{before}", (lambda w=(after, before): self.fetch(w))) for after, before in windows],
+                         mode=MODE_MERGE, max_workers=workers)
+        with self._lock:
+            self._flush()
+        news_archive.compact(self.ticker)
+
+        for name, error in result.errors.items():
+            logger.error(f"{self.ticker} {name} 구간 수집 실패: {error}")
+        if result.errors:
+            metrics.inc("backfill_windows_failed_total", len(result.errors), ticker=self.ticker)
+            logger.warning(f"{len(result.errors)}개 구간이 실패했습니다. 같은 명령을 다시 실행하면 남은 구간만 수집합니다.")
+        logger.info(f"{self.ticker}: 새 기사 {self.added}건을 아카이브에 추가했습니다 ({result.elapsed:.1f}초).")
+        return not result.errors
+
+
+def print_summary(ticker: str, start: date, end: date):
+    """Articles per month from the archive, read from the time column only."""
+    data = news_archive.scan_columns(ticker, parse_utc(str(start), DATE_FORMAT), parse_utc(str(end), DATE_FORMAT),
+                                     columns=("published", "publisher"))
+    months = {}
+    for published in data["published"]:
+        month = format_epoch(int(published), "%Y-%m")
+        months[month] = months.get(month, 0) + 1
+    print(f"{ticker.upper()}: {len(data['published'])}건, 매체 {len(set(data['publisher']))}곳")
+    for month, total in sorted(months.items()):
+        print(f"  {month}: {total}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill historical Google News into the local archive")
+    parser.add_argument("--tickers", type=str, default="DNA", help="Comma-separated tickers (default: DNA)")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day, YYYY-MM-DD (default: 180 days ago)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Day after the last day, YYYY-MM-DD (default: today)")
+    parser.add_argument("--window-days", type=int, default=WINDOW_DAYS, help=f"Days per query (default: {WINDOW_DAYS})")
+    parser.add_argument("--workers", type=int, default=WORKERS, help=f"Concurrent window fetches (default: {WORKERS})")
+    parser.add_argument("--summary", action="store_true", help="Only print what the archive holds for the range")
+    args = parser.parse_args()
+
+    end = args.end or date.today()
+    start = args.start or end - timedelta(days=180)
+    if start >= end:
+        parser.error("--start must be before --end")
+    tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+
+    complete = True
+    for ticker in tickers:
+        if not args.summary:
+            complete = Backfill(ticker).run(start, end, window_days=args.window_days, workers=args.workers) and complete
+        print_summary(ticker, start, end)
+
+    http_session.log_stats()
+    metrics.write_report("backfill")
+    sys.exit(0 if complete else 1)
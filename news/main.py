@@ -2,16 +2,18 @@ import os
 import sys
 import argparse
 import logging
+from functools import partial
 from dotenv import load_dotenv
 
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.post_tweet import post_to_x
-from news.src.fetch_news import fetch_stock_news
-from news.src.summarize import summarize_news
-from src.telegram_bot import send_to_telegram
-import html
+from news.src.fetch_news import fetch_stock_news, seen_source
+from news.src.summarize import summarize_news, stream_news, build_prompt, batch_member, PROMPT_FIELDS
+from src import outbound_queue, http_session, llm, llm_batch, metrics, market_data
+from src.fanout import fan_out, MODE_MERGE
+from src.dedup import cluster_items
+from src.pipeline import Pipeline, Source, Dedup, Enrich, selector, hitl_summarizer, gemini_summarizer, publisher
 
 # Load environment variables from .env file for local development
 load_dotenv()
@@ -19,83 +21,114 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def main(ticker: str, dry_run: bool = False, hitl: bool = False):
-    logger.info(f"{ticker} 주식 뉴스 봇을 시작합니다...")
-    
-    # 1. Fetch News
-    news = fetch_stock_news(ticker)
-    if not news:
-        logger.info("보고할 뉴스가 없습니다.")
-        return
+def build_pipeline(ticker: str, dry_run: bool = False, hitl: bool = False, news: list = None, include_seen: bool = False,
+                   stream: bool = False) -> Pipeline:
+    """
+    fetch → cluster → select → market context → summarize (Gemini, or an HITL prompt for
+    Telegram) → publish. Batch mode passes pre-fetched `news`.
+    """
+    def fetch(ctx):
+        return news if news is not None else fetch_stock_news(ticker, skip_seen=not include_seen)
 
     if hitl:
-        logger.info("HITL 모드 활성화: 텔레그램으로 뉴스 원문을 전송합니다.")
-        
-        # 뉴스 텍스트 생성
-        news_list_text = ""
-        for i, item in enumerate(news[:5]):
-            title = html.escape(item['title'])
-            link = html.escape(item['link'])
-            news_list_text += f"{i+1}. {title}\nLink: {link}\n\n"
-        
-        # 프롬프트 템플릿 (summarize.py에서 가져옴)
-        prompt_template = f"""
-----------------------------------------
-[AI 프롬프트 시작]
-
-You are a professional stock market analyst writing for Korean retail investors.
-Summarize the following recent news for '{ticker}' into a concise X (Twitter) post in Korean.
-
-주제:
-{news_list_text}
-
-CRITICAL Requirements:
-1. Company Name: ALWAYS use "깅코바이오웍스" (NOT 진코바이오웍스)
-2. Source Attribution: At the end, ALWAYS add "출처: [언론사명]" for each major news item.
-3. Currency & Financial Impact: Convert ALL USD amounts to KRW (1 USD = 1,450 KRW). Format: "약 X억원 (약 $Y million)". ALWAYS explain the financial impact.
-4. Format: Catchy headline, 2-3 bullet points with investment insights. Focus on partnerships, financial results, products, regulatory news.
-5. Tone: Professional but accessible for retail investors.
-6. Length: STRICTLY under 10 lines.
-7. Ending: Source attribution line, Hashtags: #{ticker} #깅코바이오웍스
-8. 언어: 답변은 반드시 한국어(Korean)로 작성해줘.
+        summarize = hitl_summarizer(lambda items, ctx: build_prompt(items, ticker, include_links=True))
+    else:
+        summarize = gemini_summarizer(lambda items, ctx: summarize_news(items, ticker),
+                                      lambda items, ctx: batch_member(items, ticker),
+                                      lambda items, ctx: stream_news(items, ticker))
 
-[AI 프롬프트 끝]
-----------------------------------------
-위 내용을 전체 복사하여 GPT나 Claude 등에 넣고 답변을 받으세요. 
-그 후 받은 답변을 이 봇에게 다시 보내주시면 X에 포스팅됩니다!
-"""
-        send_to_telegram(prompt_template)
-        logger.info("텔레그램 전송 완료. 프로그램을 종료합니다.")
-        return
+    return Pipeline(f"news:{ticker}", [
+        Source("fetch", fetch),
+        # Collapse the same story syndicated by several publishers
+        Dedup("cluster", cluster_items),
+        # Best stories that fit the prompt token budget
+        selector(PROMPT_FIELDS),
+        # Latest price move and volume, so the post can speak to market impact
+        Enrich("market", lambda items, ctx: market_data.attach(items, ticker)),
+        summarize,
+        publisher(seen_source(ticker)),
+    ], dry_run=dry_run, hitl=hitl, stream=stream)
 
-    # 2. Summarize (Auto Mode)
-    # Check if Gemini API key exists
-    if not os.getenv("GEMINI_API_KEY"):
-        logger.error("GEMINI_API_KEY가 없습니다. 요약을 건너뜜니다.")
-        return
-        
-    summary = summarize_news(news, ticker)
-    logger.info("요약 생성 완료:")
-    print("-" * 40)
-    print(summary)
-    print("-" * 40)
+def main(ticker: str, dry_run: bool = False, hitl: bool = False, news: list = None, include_seen: bool = False, stream: bool = False):
+    logger.info(f"{ticker} 주식 뉴스 봇을 시작합니다...")
+    # Runs alongside the news fetch; the Enrich stage waits for it
+    market_data.refresh_async([ticker])
+    return build_pipeline(ticker, dry_run=dry_run, hitl=hitl, news=news, include_seen=include_seen, stream=stream).run()
 
-    if summary.startswith("Error"):
-        logger.error("요약 생성 실패. 트위터 포스팅을 건너뜁니다.")
-        return
+def load_watchlist(path: str) -> list:
+    """
+    Reads tickers from a watchlist file (one or more per line, comma separated, '#' comments).
+    """
+    tickers = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            tickers.extend(t.strip().upper() for t in line.split(",") if t.strip())
+    return tickers
 
-    # 3. Post to X
-    if dry_run:
-        logger.info("테스트 모드 활성화. 트위터 포스팅을 건너뜁니다.")
-    else:
-        post_to_x(summary)
+def run_batch(tickers: list, dry_run: bool = False, hitl: bool = False, workers: int = 4, include_seen: bool = False,
+              stream: bool = False):
+    """
+    Fetches news for every ticker concurrently (bounded by `workers`), then runs every
+    ticker's pipeline at once so their summaries share batched Gemini requests
+    (src.llm_batch). Logs per-ticker timing at the end.
+    """
+    tickers = list(dict.fromkeys(tickers))  # de-duplicate, keep order
+    logger.info(f"배치 모드: {len(tickers)}개 티커 뉴스를 동시에 가져옵니다 (workers={workers})")
+    
+    # Prices for the whole watchlist in one download, alongside the news fetches
+    market_data.refresh_async(tickers)
+    tasks = [(t, partial(fetch_stock_news, t, skip_seen=not include_seen)) for t in tickers]
+    fetched = fan_out(tasks, mode=MODE_MERGE, max_workers=workers)
+    logger.info(f"뉴스 수집 완료 ({fetched.elapsed:.1f}초)")
+    
+    pipelines = [build_pipeline(t, dry_run=dry_run, hitl=hitl, news=fetched.results.get(t, []), include_seen=include_seen,
+                                stream=stream)
+                 for t in tickers]
+    # Streamed drafts are shown per ticker, so they are not batched
+    if not hitl and not stream:
+        batch = llm_batch.BatchCollector(len(pipelines))
+        for pipeline in pipelines:
+            pipeline.ctx["batch"] = batch
+    # Fetching is done, so the pipelines mostly wait on Gemini; run them all at once
+    processed = fan_out([(t, p.run) for t, p in zip(tickers, pipelines)], mode=MODE_MERGE, max_workers=max(1, len(pipelines)))
+    for ticker, error in processed.errors.items():
+        logger.error(f"{ticker} 처리 중 오류: {error}")
+    process_times = processed.timings
+    
+    logger.info("티커별 처리 시간:")
+    for ticker in tickers:
+        count = len(fetched.results.get(ticker) or [])
+        logger.info(f"  {ticker:<8} 뉴스 {count:>3}개 | 수집 {fetched.timings.get(ticker, 0.0):5.2f}초 | 처리 {process_times.get(ticker, 0.0):5.2f}초")
+    http_session.log_stats()
+    cache_stats = llm.stats()
+    logger.info(f"LLM 캐시: 적중 {cache_stats['hits']}회, 미스 {cache_stats['misses']}회")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Stock News Automation Bot")
     parser.add_argument("--ticker", type=str, default="DNA", help="Stock ticker symbol (default: DNA)")
     parser.add_argument("--dry-run", action="store_true", help="Run without posting to X")
     parser.add_argument("--hitl", action="store_true", help="Human-In-The-Loop mode: Send raw news to Telegram")
+    parser.add_argument("--tickers", type=str, help="Batch mode: comma-separated tickers (e.g. DNA,TSLA)")
+    parser.add_argument("--watchlist", type=str, help="Batch mode: file with tickers (comma or newline separated)")
+    parser.add_argument("--include-seen", action="store_true", help="Do not skip news already delivered in previous runs")
+    parser.add_argument("--stream", action="store_true", help="Show the Gemini draft live in Telegram while it is generated")
+    parser.add_argument("--workers", type=int, default=4, help="Batch mode: max concurrent news fetches (default: 4)")
     
     args = parser.parse_args()
     
-    main(ticker=args.ticker, dry_run=args.dry_run, hitl=args.hitl)
+    batch = []
+    if args.tickers:
+        batch.extend(t.strip().upper() for t in args.tickers.split(",") if t.strip())
+    if args.watchlist:
+        batch.extend(load_watchlist(args.watchlist))
+    
+    if batch:
+        run_batch(batch, dry_run=args.dry_run, hitl=args.hitl, workers=args.workers, include_seen=args.include_seen,
+                  stream=args.stream)
+    else:
+        main(ticker=args.ticker, dry_run=args.dry_run, hitl=args.hitl, include_seen=args.include_seen, stream=args.stream)
+    
+    # Posts are queued; give them a chance to go out before the process exits
+    outbound_queue.drain()
+    metrics.write_report("news")
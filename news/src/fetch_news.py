@@ -1,63 +1,97 @@
-import feedparser
+import time
 import logging
 import urllib.parse
-from datetime import datetime, timedelta
-from time import mktime
+from src.http_cache import cached_get, cached_parse
+from src.feed_stream import parse_feed
+from src import seen_store, metrics
+from src.news_item import NewsItem, filter_since, parse_utc
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def fetch_stock_news(ticker_symbol: str, lookback_hours: int = 240) -> list:
+DATE_FORMAT = "%Y-%m-%d"
+# Google News RSS answers at most this many items per query
+GOOGLE_NEWS_MAX_ITEMS = 100
+
+def seen_source(ticker_symbol: str) -> str:
+    """Seen-store source name for a ticker."""
+    return f"news:{ticker_symbol.upper()}"
+
+def google_news_url(query: str) -> str:
+    # We fetch English news because it's more abundant for US stocks.
+    # The summarizer will translate it anyway.
+    return f"https://news.google.com/rss/search?q={urllib.parse.quote(query)}&hl=en-US&gl=US&ceid=US:en"
+
+def to_items(entries: list) -> list:
+    return [
+        NewsItem(entry['title'], entry['link'], publisher=entry['source'] or 'Google News', published=int(entry['published']))
+        for entry in entries if entry['published'] is not None
+    ]
+
+@metrics.timed("fetch_seconds", source="google_news")
+def fetch_stock_news(ticker_symbol: str, lookback_hours: int = 240, skip_seen: bool = True) -> list:
     """
     Fetches news for a given stock ticker using Google News RSS.
     
     Args:
         ticker_symbol (str): The stock ticker (e.g., "DNA").
         lookback_hours (int): How many hours back to filter news for (default: 240 = 10 days).
+        skip_seen (bool): Drop items already delivered in a previous run (see src.seen_store).
         
     Returns:
-        list: A list of dictionaries containing news metadata.
+        list: NewsItems published within the lookback window.
     """
     try:
-        # URL Encode the query
-        query = urllib.parse.quote(f"{ticker_symbol} stock")
-        
         # Google News RSS URL (English, US)
-        # We fetch English news because it's more abundant for US stocks.
-        # The summarizer will translate it anyway.
-        rss_url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
+        rss_url = google_news_url(f"{ticker_symbol} stock")
         
         logger.info(f"RSS 가져오는 중: {rss_url}")
-        feed = feedparser.parse(rss_url)
+        response = cached_get(rss_url, timeout=15)
+        # Google News search results are not ordered by date, so no early termination here
+        entries = cached_parse(response, parse_feed, version="stream")
         
-        if not feed.entries:
+        if not entries:
             logger.info(f"{ticker_symbol}에 대한 RSS 항목을 찾을 수 없습니다")
             return []
             
-        filtered_news = []
-        cutoff_time = datetime.now() - timedelta(hours=lookback_hours)
-        
-        for entry in feed.entries:
-            # entry.published_parsed is a struct_time
-            if hasattr(entry, 'published_parsed'):
-                pub_dt = datetime.fromtimestamp(mktime(entry.published_parsed))
-                
-                if pub_dt > cutoff_time:
-                    filtered_news.append({
-                        'title': entry.title,
-                        'link': entry.link,
-                        'publisher': entry.source.title if hasattr(entry, 'source') else 'Google News',
-                        'published_at': pub_dt.strftime('%Y-%m-%d %H:%M:%S')
-                    })
+        # Both sides are UTC epochs (the old local now() vs UTC comparison drifted by the tz offset)
+        cutoff = int(time.time()) - lookback_hours * 3600
+        filtered_news = filter_since(to_items(entries), cutoff)
         
         logger.info(f"Google News에서 {ticker_symbol}의 최근 {lookback_hours}시간 내 뉴스 {len(filtered_news)}개를 찾았습니다.")
+        if skip_seen:
+            filtered_news = seen_store.filter_new(seen_source(ticker_symbol), filtered_news)
         return filtered_news
 
     except Exception as e:
         logger.error(f"{ticker_symbol} 뉴스 가져오기 오류: {e}")
         return []
 
+def fetch_news_window(ticker_symbol: str, after: str, before: str) -> list:
+    """
+    Fetches one historical window with Google News date operators (used by news/backfill.py).
+
+    Args:
+        ticker_symbol (str): The stock ticker.
+        after (str): First day of the window, YYYY-MM-DD (UTC).
+        before (str): Day after the window, YYYY-MM-DD (UTC).
+
+    Returns:
+        list: NewsItems published in [after, before). Raises on network errors, so the
+        caller can leave the window for a later retry.
+    """
+    rss_url = google_news_url(f"{ticker_symbol} stock after:{after} before:{before}")
+    # Past windows do not change; the conditional-GET cache makes re-runs cheap
+    response = cached_get(rss_url, timeout=15)
+    entries = cached_parse(response, parse_feed, version="stream")
+    if len(entries) >= GOOGLE_NEWS_MAX_ITEMS:
+        logger.warning(f"{ticker_symbol} {after}~{before} 구간이 {len(entries)}건으로 잘렸을 수 있습니다. 구간을 줄여 보세요.")
+
+    # The operators are day-granular and loose; keep exactly the window
+    start, end = parse_utc(after, DATE_FORMAT), parse_utc(before, DATE_FORMAT)
+    return [item for item in filter_since(to_items(entries), start) if item.published < end]
+
 if __name__ == "__main__":
     # Test run
     results = fetch_stock_news("TSLA", lookback_hours=72)
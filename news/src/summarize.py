@@ -1,41 +1,31 @@
 import os
-from google import genai
 import logging
+from src import llm, llm_batch, metrics, market_data
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def summarize_news(news_items: list, ticker: str) -> str:
-    """
-    Summarizes a list of news items into a single X (Twitter) post using Gemini (New SDK).
-    
-    Args:
-        news_items (list): List of news dictionaries (title, link, published_at).
-        ticker (str): The stock ticker symbol.
-        
-    Returns:
-        str: The generated tweet content.
-    """
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        logger.error("환경 변수에서 GEMINI_API_KEY를 찾을 수 없습니다.")
-        return "오류: API 키가 없습니다."
+# Item fields the prompt uses (what the token budget is spent on)
+PROMPT_FIELDS = ("title", "publisher")
 
-    if not news_items:
-        return f"오늘 {ticker} 관련 주요 뉴스가 없습니다."
+# Ticker -> (Korean name, English name, common misspelling to avoid)
+COMPANIES = {
+    "DNA": ("깅코바이오웍스", "Ginkgo Bioworks", "진코바이오웍스"),
+}
 
-    # Prepare the input text
-    news_text = ""
-    for idx, item in enumerate(news_items[:3]): # Limit to top 3 to save tokens
-        news_text += f"{idx+1}. {item['title']} (Source: {item['publisher']})\n"
-
-    prompt = f"""
+def build_instructions() -> str:
+    """
+    The task instructions without the news data. They are the same for every ticker,
+    so a batched request carries them only once; the company name and hashtags are
+    part of the per-ticker task.
+    """
+    return """
     You are a professional stock market analyst writing for Korean retail investors.
-    Summarize the following recent news for '{ticker}' (깅코바이오웍스, Ginkgo Bioworks) into a concise X (Twitter) post in Korean.
+    Summarize the recent news for the ticker given below into a concise X (Twitter) post in Korean.
     
     CRITICAL Requirements:
-    1. Company Name: ALWAYS use "깅코바이오웍스" (NOT 진코바이오웍스)
+    1. Company Name: ALWAYS use the Korean company name given with the ticker
     
     2. Source Attribution: 
        - At the end, ALWAYS add "출처: [언론사명]" for each major news item
@@ -51,6 +41,7 @@ def summarize_news(news_items: list, ticker: str) -> str:
        - 2-3 bullet points with investment insights
        - Focus on: partnerships, financial results, products, regulatory news
        - Include financial impact analysis for any monetary figures
+       - If market data is given, relate the news to the latest price move and trading volume
     
     5. Tone: Professional but accessible for retail investors
     
@@ -58,26 +49,83 @@ def summarize_news(news_items: list, ticker: str) -> str:
     
     7. Ending: 
        - Source attribution line
-       - Hashtags: #DNA #깅코바이오웍스
-    
-    News Data (last 10 days):
+       - The hashtags given with the ticker
+    """
+
+def company_lines(ticker: str) -> str:
+    """Company name and hashtag lines of the task for `ticker`."""
+    if ticker.upper() not in COMPANIES:
+        return f"""Company: the company listed as {ticker} (use its common Korean name)
+    Hashtags: #{ticker}"""
+    korean, english, avoid = COMPANIES[ticker.upper()]
+    return f"""Company: {korean} ({english}); write "{korean}" (NOT {avoid})
+    Hashtags: #{ticker} #{korean}"""
+
+def build_task(news_items: list, ticker: str, include_links: bool = False) -> str:
+    """The ticker, its company and its news list; HITL messages also list the article links."""
+    news_text = ""
+    for idx, item in enumerate(news_items):
+        publishers = ", ".join(item.get('publishers') or [item['publisher']])
+        news_text += f"{idx+1}. {item['title']} (Source: {publishers})\n"
+        if include_links:
+            news_text += f"   Link: {item['link']}\n"
+
+    market = next((item['market'] for item in news_items if item.get('market')), None)
+    market_text = f"{market_data.format_context(market)}\n    " if market else ""
+
+    return f"""
+    Ticker: {ticker}
+    {company_lines(ticker)}
+    {market_text}News Data (last 10 days):
     {news_text}
     """
+
+def build_prompt(news_items: list, ticker: str, include_links: bool = False) -> str:
+    """
+    Builds the summarization prompt. Shared by summarize_news and the HITL message.
+    """
+    return build_instructions() + build_task(news_items, ticker, include_links)
+
+def batch_member(news_items: list, ticker: str) -> llm_batch.BatchMember:
+    """This ticker as one member of a batched Gemini request (see src.llm_batch)."""
+    task = build_task(news_items, ticker)
+    return llm_batch.BatchMember(f"news:{ticker}", build_instructions(), task)
+
+@metrics.timed("summarize_seconds", bot="news")
+def summarize_news(news_items: list, ticker: str) -> str:
+    """
+    Summarizes a list of news items into a single X (Twitter) post using Gemini (New SDK).
     
-    try:
-        # Initialize Client with the new SDK
-        client = genai.Client(api_key=api_key)
+    Args:
+        news_items (list): NewsItems (title, link, publisher). All of them go into the prompt,
+            so callers pre-select them (the pipeline's Select stage, or src.selection.select).
+        ticker (str): The stock ticker symbol.
         
-        # Call the model
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt
-        )
-        return response.text
+    Returns:
+        str: The generated tweet content.
+    """
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        logger.error("환경 변수에서 GEMINI_API_KEY를 찾을 수 없습니다.")
+        return "오류: API 키가 없습니다."
+
+    if not news_items:
+        return f"오늘 {ticker} 관련 주요 뉴스가 없습니다."
+
+    prompt = build_prompt(news_items, ticker)
+
+    try:
+        # Shared client + response cache (identical prompts are not re-billed)
+        return llm.generate(prompt, model='gemini-2.5-flash')
     except Exception as e:
         logger.error(f"요약 생성 오류: {e}")
         return f"Error generating summary: {e}"
 
+def stream_news(news_items: list, ticker: str):
+    """Like summarize_news, but yields the post as Gemini writes it."""
+    prompt = build_prompt(news_items, ticker)
+    yield from llm.generate_stream(prompt, model='gemini-2.5-flash')
+
 if __name__ == "__main__":
     # Test stub
     logger.info("Test run...")
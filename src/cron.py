@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+# (low, high) per field: minute hour day-of-month month day-of-week
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+def _parse_field(field: str, low: int, high: int) -> list:
+    values = set()
+    for part in field.split(","):
+        part, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if not low <= start <= end <= high or step < 1:
+            raise ValueError(f"cron 필드 범위 오류: {field}")
+        values.update(range(start, end + 1, step))
+    return sorted(values)
+
+
+class CronSchedule:
+    """
+    Standard 5-field cron expression ("30 4 * * *"), evaluated in UTC like the GitHub
+    Actions schedules it replaces. Supports *, lists, ranges and steps. As in cron, when
+    both day-of-month and day-of-week are restricted, a day matching either one runs.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 표현식은 5개 필드가 필요합니다: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_field(f, low, high) for f, (low, high) in zip(fields, FIELD_RANGES)
+        )
+        # 7 is Sunday as well
+        self.weekdays = sorted({d % 7 for d in weekdays})
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_month = moment.day in self.days
+        # Python: Monday=0; cron: Sunday=0
+        in_week = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after `moment` (aware UTC datetime)."""
+        t = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Five years covers every valid expression, including Feb 29 on a given weekday
+        for _ in range(366 * 5):
+            if t.month in self.months and self._day_matches(t):
+                for hour in self.hours:
+                    if hour < t.hour:
+                        continue
+                    for minute in self.minutes:
+                        if hour == t.hour and minute < t.minute:
+                            continue
+                        return t.replace(hour=hour, minute=minute)
+            t = (t + timedelta(days=1)).replace(hour=0, minute=0)
+        raise ValueError(f"일치하는 시각이 없는 cron 표현식입니다: {self.expression!r}")
+
+    def __repr__(self):
+        return f"CronSchedule({self.expression!r})"
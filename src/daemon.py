@@ -0,0 +1,257 @@
+import os
+import sys
+import time
+import signal
+import logging
+import argparse
+import threading
+from functools import partial
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from news import main as news_main
+from biotech_news import main as biotech_main
+from xPosting import main as xposting_main
+from src import listener, webhook, metrics, outbound_queue, http_session
+from src.cron import CronSchedule
+
+# Load environment variables from .env file for local development
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Same times (UTC) as the GitHub Actions workflows
+DEFAULT_SCHEDULES = {
+    "xposting": "30 3 * * *",
+    "biotech": "30 4 * * *",
+    "news": "0 5 * * *",
+}
+# A run still going after this long is reported as hung and no longer blocks its next run
+JOB_TIMEOUT = float(os.getenv("DAEMON_JOB_TIMEOUT", str(30 * 60)))
+# Upper bound on one scheduler sleep, so a changed clock is noticed
+TICK_SECONDS = 30.0
+
+
+class Job:
+    """
+    One scheduled bot run. Each run gets its own thread, so a slow or hung run never
+    delays other jobs; a job is not started again while its previous run is active.
+    """
+
+    def __init__(self, name: str, schedule: str, target, timeout: float = JOB_TIMEOUT):
+        self.name = name
+        self.schedule = CronSchedule(schedule)
+        self.target = target
+        self.timeout = timeout
+        self.next_run = None
+        self.runs = 0
+        self.failures = 0
+        self._thread = None
+        self._started = None
+        self._hung_reported = False
+
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def plan(self, now: datetime):
+        self.next_run = self.schedule.next_after(now)
+
+    def start(self):
+        self._started = time.monotonic()
+        self._hung_reported = False
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        logger.info(f"[{self.name}] 작업을 시작합니다.")
+        try:
+            with metrics.timer("daemon_job_seconds", job=self.name):
+                self.target()
+            self.runs += 1
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"[{self.name}] 작업 실패: {e}")
+        finally:
+            logger.info(f"[{self.name}] 작업 종료 ({time.monotonic() - self._started:.1f}초)")
+            # Keep the textfile metrics current between runs
+            metrics.write_report("daemon")
+
+    def join(self, timeout: float):
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def seconds_to_timeout(self):
+        """Seconds until the active run counts as hung, or None."""
+        if not self.running() or self._hung_reported:
+            return None
+        return self._started + self.timeout - time.monotonic()
+
+    def check_hung(self) -> bool:
+        """True (once per run) when the active run exceeded its timeout; it is then abandoned."""
+        if not self.running() or self._hung_reported:
+            return False
+        if time.monotonic() - self._started < self.timeout:
+            return False
+        self._hung_reported = True
+        # Threads cannot be killed; forget it so the next scheduled run can start
+        self._thread = None
+        return True
+
+
+class Scheduler:
+    """
+    Runs jobs on their cron schedules in this process, plus the Telegram listener as a
+    long-lived thread. HTTP pools, the HTTP/parse/LLM caches, the Gemini and X clients,
+    the SQLite stores and the outbound queue stay warm between runs.
+    """
+
+    def __init__(self, jobs: list, listener_target=None):
+        # listener_target(stop_event=...) runs until the event is set (listener.start_listener)
+        self.jobs = jobs
+        self.listener_target = listener_target
+        self.stop_event = threading.Event()
+        self._listener_thread = None
+
+    def run_now(self, names: list):
+        for job in self.jobs:
+            if job.name in names and not job.running():
+                job.start()
+
+    def _start_listener(self):
+        def run():
+            try:
+                self.listener_target(stop_event=self.stop_event)
+            except Exception as e:
+                logger.error(f"리스너 스레드 오류: {e}")
+        self._listener_thread = threading.Thread(target=run, name="listener", daemon=True)
+        self._listener_thread.start()
+
+    def run(self):
+        now = datetime.now(timezone.utc)
+        for job in self.jobs:
+            job.plan(now)
+            logger.info(f"[{job.name}] 다음 실행: {job.next_run:%Y-%m-%d %H:%M} UTC ({job.schedule.expression})")
+        if self.listener_target:
+            self._start_listener()
+
+        while not self.stop_event.is_set():
+            now = datetime.now(timezone.utc)
+            for job in self.jobs:
+                if job.check_hung():
+                    logger.error(f"[{job.name}] 작업이 {job.timeout:.0f}초를 넘겨 응답이 없습니다. 다음 실행을 막지 않도록 분리합니다.")
+                    metrics.inc("daemon_jobs_total", job=job.name, outcome="hung")
+                if now < job.next_run:
+                    continue
+                if job.running():
+                    logger.warning(f"[{job.name}] 이전 실행이 아직 진행 중이라 이번 실행을 건너뜁니다.")
+                    metrics.inc("daemon_jobs_total", job=job.name, outcome="skipped")
+                else:
+                    metrics.inc("daemon_jobs_total", job=job.name, outcome="started")
+                    job.start()
+                job.plan(now)
+                logger.info(f"[{job.name}] 다음 실행: {job.next_run:%Y-%m-%d %H:%M} UTC")
+
+            if self._listener_thread is not None and not self._listener_thread.is_alive() and not self.stop_event.is_set():
+                logger.error("리스너 스레드가 종료되었습니다. 다시 시작합니다.")
+                self._start_listener()
+
+            delays = [TICK_SECONDS]
+            delays.extend((job.next_run - datetime.now(timezone.utc)).total_seconds() for job in self.jobs)
+            delays.extend(d for d in (job.seconds_to_timeout() for job in self.jobs) if d is not None)
+            self.stop_event.wait(max(min(delays), 0.5))
+
+    def stop(self):
+        self.stop_event.set()
+
+    def shutdown(self, grace: float = 60.0):
+        """Waits (bounded) for running jobs and the listener, then drains the outbound queue."""
+        deadline = time.monotonic() + grace
+        for job in self.jobs:
+            if job.running():
+                logger.info(f"[{job.name}] 진행 중인 작업을 기다립니다...")
+                job.join(max(0.0, deadline - time.monotonic()))
+        if self._listener_thread is not None:
+            # A polling listener notices the stop after its current long poll (up to 30s)
+            self._listener_thread.join(max(0.0, deadline - time.monotonic()))
+        outbound_queue.drain(timeout=30)
+        http_session.log_stats()
+        metrics.write_report("daemon")
+
+
+def build_jobs(names: list, schedules: dict, dry_run: bool = False, hitl: bool = False, tickers: list = None,
+               include_seen: bool = False) -> list:
+    tickers = tickers or ["DNA"]
+
+    targets = {
+        # Same path as the batch CLI: concurrent fetches, one price refresh, batched Gemini requests
+        "news": lambda: news_main.run_batch(tickers, dry_run=dry_run, hitl=hitl, include_seen=include_seen),
+        "biotech": lambda: biotech_main.main(dry_run=dry_run, hitl=hitl, include_seen=include_seen),
+        # xPosting has no HITL mode
+        "xposting": lambda: xposting_main.main(dry_run=dry_run, include_seen=include_seen),
+    }
+    return [Job(name, schedules[name], targets[name]) for name in names if name in targets]
+
+def parse_schedules(values: list) -> dict:
+    """'name=cron expression' overrides on top of DEFAULT_SCHEDULES."""
+    schedules = dict(DEFAULT_SCHEDULES)
+    for value in values or []:
+        name, _, expression = value.partition("=")
+        name = name.strip().lower()
+        if name not in DEFAULT_SCHEDULES or not expression.strip():
+            raise ValueError(f"잘못된 스케줄 지정: {value!r} (예: news=0 5 * * *)")
+        CronSchedule(expression.strip())  # validate early
+        schedules[name] = expression.strip()
+    return schedules
+
+if __name__ == "__main__":
+    # Run from the project root: python -m src.daemon
+    parser = argparse.ArgumentParser(description="Run the bots on cron schedules and the Telegram listener in one process")
+    parser.add_argument("--jobs", type=str, default="news,biotech,xposting,listener",
+                        help="Comma-separated jobs (news, biotech, xposting, listener)")
+    parser.add_argument("--schedule", action="append", metavar="JOB=CRON",
+                        help="Override a schedule in UTC, e.g. --schedule 'news=0 5 * * *' (repeatable)")
+    parser.add_argument("--tickers", type=str, default="DNA", help="Tickers for the news job (default: DNA)")
+    parser.add_argument("--dry-run", action="store_true", help="Run without posting to X")
+    parser.add_argument("--hitl", action="store_true", help="Human-In-The-Loop mode for news and biotech")
+    parser.add_argument("--include-seen", action="store_true", help="Do not skip items already delivered in previous runs")
+    parser.add_argument("--run-now", action="store_true", help="Also run every scheduled job once at startup")
+    parser.add_argument("--listener-workers", type=int, default=4, help="Threads handling listener updates (the outbound queue paces posting)")
+    parser.add_argument("--webhook-url", type=str, default=os.getenv("TELEGRAM_WEBHOOK_URL"),
+                        help="Receive Telegram updates on this public URL instead of polling")
+    parser.add_argument("--listen", type=str, default=webhook.DEFAULT_LISTEN, help="Local host:port for the webhook server")
+    args = parser.parse_args()
+
+    names = [n.strip().lower() for n in args.jobs.split(",") if n.strip()]
+    unknown = set(names) - set(DEFAULT_SCHEDULES) - {"listener"}
+    if unknown:
+        parser.error(f"unknown jobs: {', '.join(sorted(unknown))}")
+    try:
+        schedules = parse_schedules(args.schedule)
+    except ValueError as e:
+        parser.error(str(e))
+    tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+
+    jobs = build_jobs(names, schedules, dry_run=args.dry_run, hitl=args.hitl, tickers=tickers, include_seen=args.include_seen)
+    listener_target = None
+    if "listener" in names and args.webhook_url:
+        listener_target = partial(webhook.start_webhook, args.webhook_url, listen=args.listen,
+                                  dry_run=args.dry_run, workers=args.listener_workers)
+    elif "listener" in names:
+        listener_target = partial(listener.start_listener, dry_run=args.dry_run, workers=args.listener_workers)
+
+    scheduler = Scheduler(jobs, listener_target)
+    # SIGTERM (systemd, docker stop) and Ctrl+C both stop gracefully
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: scheduler.stop())
+
+    logger.info(f"데몬을 시작합니다: {', '.join(names)}")
+    if args.run_now:
+        scheduler.run_now([job.name for job in jobs])
+    scheduler.run()
+    logger.info("데몬을 종료합니다. 진행 중인 작업을 마무리합니다...")
+    scheduler.shutdown()
@@ -0,0 +1,118 @@
+import re
+import hashlib
+import logging
+from functools import lru_cache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BITS = 64
+
+# Titles whose SimHash differs in at most this many bits are treated as the same story.
+# Unrelated headlines sit around 32 bits apart and rarely closer than ~20.
+MAX_DISTANCE = 8
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _strip_publisher(title: str, publisher: str) -> str:
+    # Google News appends " - Publisher" to every syndicated headline
+    if publisher and title.endswith(f" - {publisher}"):
+        return title[:-len(publisher) - 3]
+    return title
+
+def _shingles(title: str) -> list:
+    # Single-word shingles: headlines are short, so bigrams make one edited word
+    # move the hash too far for syndicated rewrites to stay within MAX_DISTANCE
+    return _WORD_RE.findall(title.lower())
+
+@lru_cache(maxsize=65536)
+def _token_vector(token: str) -> tuple:
+    # +1/-1 per hash bit, cached so repeated words across a batch are hashed once
+    h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+    return tuple(1 if (h >> bit) & 1 else -1 for bit in range(BITS))
+
+def simhash(title: str) -> int:
+    """
+    64-bit SimHash of a title over its word shingles.
+    """
+    vectors = [_token_vector(token) for token in _shingles(title)]
+    if not vectors:
+        return 0
+    value = 0
+    for bit, count in enumerate(map(sum, zip(*vectors))):
+        if count > 0:
+            value |= 1 << bit
+    return value
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+def cluster_items(items: list, max_distance: int = MAX_DISTANCE) -> list:
+    """
+    Collapses syndicated copies of the same story into one representative.
+
+    Items are visited in order, so the first (usually most relevant or newest) copy becomes
+    the representative. Candidate clusters are found through LSH bands: with
+    `max_distance + 1` bands, two hashes within `max_distance` bits always share a band.
+
+    Args:
+        items (list): News dicts with at least 'title' (and optionally 'publisher').
+        max_distance (int): Maximum Hamming distance between SimHashes of one story.
+
+    Returns:
+        list: Representative items (copies) with extra keys 'publishers' (all publishers
+        of the story, representative first) and 'members' (the collapsed duplicates).
+    """
+    if not items:
+        return []
+
+    bands = max_distance + 1
+    width = BITS // bands
+    band_mask = (1 << width) - 1
+
+    buckets = {}
+    clusters = []  # (hash, representative)
+    for item in items:
+        title = _strip_publisher(item.get("title", ""), item.get("publisher", ""))
+        h = simhash(title)
+        band_keys = [(b, (h >> (b * width)) & band_mask) for b in range(bands)]
+
+        match = None
+        for key in band_keys:
+            for index in buckets.get(key, ()):
+                if hamming(h, clusters[index][0]) <= max_distance:
+                    match = index
+                    break
+            if match is not None:
+                break
+
+        if match is None:
+            rep = item.copy()
+            rep["publishers"] = [item["publisher"]] if item.get("publisher") else []
+            rep["members"] = []
+            clusters.append((h, rep))
+            for key in band_keys:
+                buckets.setdefault(key, []).append(len(clusters) - 1)
+        else:
+            rep = clusters[match][1]
+            rep["members"].append(item)
+            publisher = item.get("publisher")
+            if publisher and publisher not in rep["publishers"]:
+                rep["publishers"].append(publisher)
+
+    representatives = [rep for _, rep in clusters]
+    if len(representatives) < len(items):
+        logger.info(f"중복 기사 {len(items) - len(representatives)}개를 묶었습니다: {len(items)}개 → {len(representatives)}개")
+    return representatives
+
+def expand_clusters(items: list) -> list:
+    """
+    Returns representatives followed by their collapsed members (e.g. for seen-marking).
+    """
+    expanded = []
+    for item in items:
+        expanded.append(item)
+        expanded.extend(item.get("members", ()))
+    return expanded
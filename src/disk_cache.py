@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from src.paths import CACHE_DIR
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Writes between full rescans of the directory, which pick up changes made by other processes
+RESCAN_WRITES = 500
+# Eviction trims to this fraction of max_bytes, so the next writes do not trigger it again
+LOW_WATER = 0.9
+
+
+class CacheEntry:
+    """A cached body plus its JSON metadata."""
+
+    def __init__(self, meta: dict, body: bytes):
+        self.meta = meta
+        self.body = body
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.meta.get("stored_at", 0)
+
+
+class DiskCache:
+    """
+    Small size-bounded key/value cache on disk, shared by the HTTP and LLM caches.
+
+    Each entry is a body file plus a JSON metadata file named after the SHA-256 of the key.
+    Reads refresh the body's mtime, so eviction drops the least recently used entries
+    once the directory grows past `max_bytes`. The size is tracked as a running total;
+    the directory is only walked when that total exceeds the budget (or every
+    RESCAN_WRITES writes).
+    """
+
+    def __init__(self, name: str, max_bytes: int = 50 * 1024 * 1024, directory: str = None):
+        self.directory = directory or os.path.join(CACHE_DIR, name)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None  # bytes on disk; None until the first scan
+        self._writes = 0
+
+    def _paths(self, key: str):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, digest[:2], digest)
+        return base + ".json", base + ".body"
+
+    def get(self, key: str, ttl: float = None):
+        """
+        Returns the CacheEntry for `key`, or None if missing or older than `ttl` seconds.
+        """
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        entry = CacheEntry(meta, body)
+        if ttl is not None and entry.age > ttl:
+            return None
+
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+        return entry
+
+    @staticmethod
+    def _size(*paths) -> int:
+        size = 0
+        for path in paths:
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _account(self, delta: int):
+        """Adds `delta` bytes to the running total; evicts when it is over budget or a rescan is due."""
+        with self._lock:
+            self._writes += 1
+            if self._total is not None:
+                self._total += delta
+            due = self._total is None or self._total > self.max_bytes or self._writes >= RESCAN_WRITES
+        if due:
+            self.evict()
+
+    def set(self, key: str, body: bytes, meta: dict = None):
+        """
+        Stores `body` and `meta` under `key` and evicts old entries if over budget.
+        """
+        meta = dict(meta or {})
+        meta.setdefault("stored_at", time.time())
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        previous = self._size(meta_path, body_path)
+
+        try:
+            self._atomic_write(body_path, body)
+            self._atomic_write(meta_path, meta_bytes)
+        except OSError as e:
+            logger.warning(f"캐시 저장 실패 ({self.directory}): {e}")
+            return
+        self._account(len(body) + len(meta_bytes) - previous)
+
+    def update_meta(self, key: str, **fields):
+        """Merges `fields` into the metadata of an existing entry."""
+        entry = self.get(key)
+        if entry is None:
+            return
+        entry.meta.update(fields)
+        meta_path, _ = self._paths(key)
+        meta_bytes = json.dumps(entry.meta, ensure_ascii=False).encode("utf-8")
+        previous = self._size(meta_path)
+        try:
+            self._atomic_write(meta_path, meta_bytes)
+        except OSError as e:
+            logger.warning(f"캐시 메타데이터 갱신 실패: {e}")
+            return
+        with self._lock:
+            if self._total is not None:
+                self._total += len(meta_bytes) - previous
+
+    def delete(self, key: str):
+        removed = 0
+        for path in self._paths(key):
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                removed += size
+            except OSError:
+                pass
+        with self._lock:
+            if self._total is not None:
+                self._total -= removed
+
+    def evict(self):
+        """
+        Rescans the directory; when over max_bytes, removes least recently used entries
+        until it is down to LOW_WATER × max_bytes.
+        """
+        with self._lock:
+            self._writes = 0
+            entries = []
+            total = 0
+            for root, _, files in os.walk(self.directory):
+                for filename in files:
+                    if not filename.endswith(".body"):
+                        continue
+                    body_path = os.path.join(root, filename)
+                    meta_path = body_path[:-len(".body")] + ".json"
+                    try:
+                        st = os.stat(body_path)
+                        size = st.st_size + (os.path.getsize(meta_path) if os.path.exists(meta_path) else 0)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, size, body_path, meta_path))
+                    total += size
+
+            if total <= self.max_bytes:
+                self._total = total
+                return
+
+            entries.sort()
+            target = self.max_bytes * LOW_WATER
+            for _, size, body_path, meta_path in entries:
+                if total <= target:
+                    break
+                for path in (meta_path, body_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+            self._total = total
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,127 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODE_FIRST = "first"
+MODE_MERGE = "merge"
+
+
+class FanOutResult:
+    """
+    Outcome of a fan_out() call.
+
+    Attributes:
+        results (dict): name -> return value for every task that finished in time.
+        errors (dict): name -> exception for every task that raised.
+        timings (dict): name -> seconds the task took (finished tasks only).
+        pending (list): names of tasks still running (or never started) at return time.
+        winner (str | None): in "first" mode, the name of the accepted task.
+        elapsed (float): wall time of the whole fan-out in seconds.
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.errors = {}
+        self.timings = {}
+        self.pending = []
+        self.winner = None
+        self.elapsed = 0.0
+
+    def merged(self) -> list:
+        """Concatenates list results in task order."""
+        items = []
+        for value in self.results.values():
+            if value:
+                items.extend(value)
+        return items
+
+
+def fan_out(tasks, mode: str = MODE_MERGE, deadline: float = None, max_workers: int = None, accept=bool) -> FanOutResult:
+    """
+    Runs independent blocking calls (usually network fetches) in parallel.
+
+    Args:
+        tasks (dict | list): name -> zero-argument callable, or a list of (name, callable) pairs.
+            Order is preserved in the result and decides submission order when max_workers
+            is smaller than the number of tasks.
+        mode (str): "first" returns as soon as one task produces a value that passes `accept`
+            and cancels everything not yet started. "merge" waits for every task.
+        deadline (float): Overall wall-clock budget in seconds. Tasks still running when it
+            expires are reported in `pending` and their results are ignored.
+        max_workers (int): Thread pool size (default: one thread per task).
+        accept (callable): Predicate deciding whether a result wins in "first" mode
+            (default: any truthy value, i.e. a non-empty list).
+
+    Returns:
+        FanOutResult: Per-task results, errors and timings.
+    """
+    if mode not in (MODE_FIRST, MODE_MERGE):
+        raise ValueError(f"지원하지 않는 fan-out 모드입니다: {mode}")
+
+    task_list = list(tasks.items()) if isinstance(tasks, dict) else list(tasks)
+    result = FanOutResult()
+    if not task_list:
+        return result
+
+    started = time.monotonic()
+    end_at = started + deadline if deadline is not None else None
+
+    def timed(call):
+        t0 = time.monotonic()
+        try:
+            return call(), time.monotonic() - t0
+        except Exception as e:
+            e.fanout_elapsed = time.monotonic() - t0
+            raise
+
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(task_list), thread_name_prefix="fanout")
+    futures = {executor.submit(timed, call): name for name, call in task_list}
+    not_done = set(futures)
+
+    try:
+        while not_done:
+            timeout = None
+            if end_at is not None:
+                timeout = end_at - time.monotonic()
+                if timeout <= 0:
+                    break
+
+            done, not_done = wait(not_done, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+
+            for future in done:
+                name = futures[future]
+                try:
+                    value, elapsed = future.result()
+                except Exception as e:
+                    result.errors[name] = e
+                    result.timings[name] = getattr(e, "fanout_elapsed", 0.0)
+                    continue
+
+                result.results[name] = value
+                result.timings[name] = elapsed
+                if mode == MODE_FIRST and result.winner is None and accept(value):
+                    result.winner = name
+
+            if result.winner is not None:
+                break
+    finally:
+        # Never block on stragglers: queued tasks are cancelled, running ones finish in the
+        # background and are bounded by their own request timeouts.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    result.pending = [futures[f] for f in not_done]
+    result.elapsed = time.monotonic() - started
+
+    if result.pending and result.winner is None:
+        logger.warning(f"fan-out 마감 시간 {deadline}초 초과. 대기 중인 작업: {', '.join(result.pending)}")
+
+    # Keep results in task order so "merge" output is deterministic
+    order = {name: i for i, (name, _) in enumerate(task_list)}
+    result.results = dict(sorted(result.results.items(), key=lambda kv: order[kv[0]]))
+    return result
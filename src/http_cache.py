@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+from src.disk_cache import DiskCache
+from src import http_session
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds a stored response is served without contacting the origin at all.
+# 0 means "always revalidate with If-None-Match / If-Modified-Since".
+DEFAULT_TTL = float(os.getenv("HTTP_CACHE_TTL", "0"))
+MAX_BYTES = int(float(os.getenv("HTTP_CACHE_MAX_MB", "50")) * 1024 * 1024)
+
+# Per-host overrides for DEFAULT_TTL
+HOST_TTL = {
+    "news.google.com": 10 * 60,
+    "investors.ginkgobioworks.com": 60 * 60,
+}
+
+# Parsed results kept in memory, so a long-running process (src.daemon) skips the disk
+# read and JSON decode for pages that did not change
+PARSED_MEMORY_ENTRIES = 64
+
+_cache = None
+_parsed = OrderedDict()  # key -> (body_hash, parsed)
+_parsed_lock = threading.Lock()
+
+def _get_cache() -> DiskCache:
+    global _cache
+    if _cache is None:
+        _cache = DiskCache("http", max_bytes=MAX_BYTES)
+    return _cache
+
+def set_host_ttl(host: str, seconds: float):
+    """
+    Overrides the freshness lifetime for one host.
+    """
+    HOST_TTL[host] = seconds
+
+def _ttl_for(url: str) -> float:
+    return HOST_TTL.get(urlparse(url).hostname or "", DEFAULT_TTL)
+
+
+class CachedResponse:
+    """
+    Minimal response object returned by cached_get().
+
+    `not_modified` is True when the body came from the cache, either because it was still
+    fresh or because the origin answered 304. Callers can skip re-parsing in that case.
+    `fresh` is True when the origin was not contacted at all.
+    """
+
+    def __init__(self, url: str, content: bytes, status_code: int, headers: dict, not_modified: bool,
+                 fresh: bool = False):
+        self.url = url
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers
+        self.not_modified = not_modified
+        self.fresh = fresh
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+
+def cached_get(url: str, headers: dict = None, timeout: float = 15, bypass: bool = False) -> CachedResponse:
+    """
+    GETs `url` through the on-disk conditional-GET cache.
+
+    Args:
+        url (str): Absolute URL (query string included).
+        headers (dict): Extra request headers.
+        timeout (float): Request timeout in seconds.
+        bypass (bool): Ignore any cached copy and fetch unconditionally.
+
+    Returns:
+        CachedResponse: The (possibly cached) response. Raises requests.HTTPError on 4xx/5xx.
+    """
+    cache = _get_cache()
+    entry = None if bypass else cache.get(url)
+
+    if entry is not None and entry.age < _ttl_for(url):
+        logger.info(f"HTTP 캐시 적중 (신선): {url}")
+        return CachedResponse(url, entry.body, 200, entry.meta.get("headers", {}), not_modified=True, fresh=True)
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry.meta.get("etag"):
+            request_headers["If-None-Match"] = entry.meta["etag"]
+        if entry.meta.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry.meta["last_modified"]
+
+    response = http_session.get(url, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304 and entry is not None:
+        logger.info(f"HTTP 304 Not Modified: {url}")
+        # Restart the freshness clock; the stored body is still valid
+        cache.update_meta(url, stored_at=time.time())
+        return CachedResponse(url, entry.body, 200, entry.meta.get("headers", {}), not_modified=True)
+
+    response.raise_for_status()
+
+    stored_headers = {k: v for k, v in response.headers.items() if k.lower() in ("content-type", "etag", "last-modified")}
+    cache.set(url, response.content, {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "headers": stored_headers,
+    })
+    return CachedResponse(url, response.content, response.status_code, stored_headers, not_modified=False)
+
+def cached_parse(response: CachedResponse, parse_fn, version: str = "1"):
+    """
+    Returns parse_fn(response.content), reusing the stored result when the body is unchanged.
+
+    The parsed result must be JSON-serializable. It is keyed by the body hash and `version`,
+    so bump `version` whenever parse_fn's output format changes. Callers must not
+    modify the returned value; it may be shared with later calls in the same process.
+    """
+    cache = _get_cache()
+    body_hash = hashlib.sha256(response.content).hexdigest()
+    key = f"parsed:{version}:{response.url}"
+
+    with _parsed_lock:
+        remembered = _parsed.get(key)
+        if remembered is not None and remembered[0] == body_hash:
+            _parsed.move_to_end(key)
+            return remembered[1]
+
+    parsed = None
+    entry = cache.get(key)
+    if entry is not None and entry.meta.get("body_hash") == body_hash:
+        try:
+            parsed = json.loads(entry.body)
+        except ValueError:
+            pass
+
+    if parsed is None:
+        parsed = parse_fn(response.content)
+        cache.set(key, json.dumps(parsed, ensure_ascii=False).encode("utf-8"), {"body_hash": body_hash})
+    with _parsed_lock:
+        _parsed[key] = (body_hash, parsed)
+        _parsed.move_to_end(key)
+        while len(_parsed) > PARSED_MEMORY_ENTRIES:
+            _parsed.popitem(last=False)
+    return parsed
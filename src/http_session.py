@@ -0,0 +1,215 @@
+import os
+import time
+import random
+import logging
+import threading
+from typing import Optional
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse, urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from src import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Connection pool sizing: number of hosts kept and keep-alive connections per host
+POOL_HOSTS = 16
+POOL_SIZE = 8
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+def _parse_overrides(value: str) -> dict:
+    overrides = {}
+    for pair in value.split(","):
+        host, sep, base = pair.strip().partition("=")
+        if sep and host and base:
+            overrides[host.strip().lower()] = base.strip().rstrip("/")
+    return overrides
+
+# Redirects whole hosts to another base URL, e.g. local stand-in servers for benchmarks:
+# HTTP_BASE_OVERRIDES="news.google.com=http://127.0.0.1:8080/news.google.com,api.telegram.org=..."
+BASE_OVERRIDES = _parse_overrides(os.getenv("HTTP_BASE_OVERRIDES", ""))
+
+_session = None
+_lock = threading.Lock()
+_request_counts = {}
+
+def base_override(host: str) -> str:
+    """The override base URL for `host`, or None."""
+    return BASE_OVERRIDES.get(host.lower())
+
+def rewrite_url(url: str) -> str:
+    """Applies BASE_OVERRIDES: https://host/path?q -> <base>/path?q."""
+    if not BASE_OVERRIDES:
+        return url
+    parts = urlsplit(url)
+    base = BASE_OVERRIDES.get((parts.hostname or "").lower())
+    if base is None:
+        return url
+    return base + (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+
+class OverrideAdapter(HTTPAdapter):
+    """HTTPAdapter that sends requests for overridden hosts to their replacement base URL."""
+
+    def send(self, request, **kwargs):
+        request.url = rewrite_url(request.url)
+        return super().send(request, **kwargs)
+
+def mount_overrides(session: requests.Session):
+    """
+    Routes another library's requests.Session (e.g. tweepy's) through BASE_OVERRIDES.
+    No-op when no overrides are configured.
+    """
+    if BASE_OVERRIDES:
+        adapter = OverrideAdapter()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+def _accept_encoding() -> str:
+    # urllib3 only decodes brotli when a brotli package is installed
+    for module in ("brotli", "brotlicffi"):
+        try:
+            __import__(module)
+            return "gzip, deflate, br"
+        except ImportError:
+            continue
+    return "gzip, deflate"
+
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide requests.Session with per-host keep-alive pools.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                # Retries are handled in request() so Retry-After can be honoured
+                adapter = OverrideAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["Accept-Encoding"] = _accept_encoding()
+                _session = session
+    return _session
+
+def retry_after(response) -> Optional[float]:
+    """
+    Seconds to wait according to the Retry-After header or Telegram's `parameters.retry_after`,
+    or None when the response carries neither.
+    """
+    value = response.headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    try:
+        return float(response.json()["parameters"]["retry_after"])
+    except Exception:
+        return None
+
+def _backoff(attempt: int, base: float, cap: float) -> float:
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def request(method: str, url: str, retries: int = 3, backoff: float = 0.5, max_backoff: float = 30.0,
+            retry_statuses: set = None, **kwargs) -> requests.Response:
+    """
+    Sends a request over the shared session, retrying transient failures.
+
+    Idempotent methods are retried on connection errors, timeouts and RETRY_STATUSES.
+    Other methods (POST) are only retried on 429 and connect timeouts, where the request
+    is known not to have been processed.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Absolute URL.
+        retries (int): Maximum number of retries after the first attempt.
+        backoff (float): Base delay in seconds for exponential backoff.
+        max_backoff (float): Upper bound for a single wait, including Retry-After.
+        retry_statuses (set): Status codes to retry (default depends on the method).
+        **kwargs: Passed through to requests.Session.request (params, json, headers, timeout...).
+
+    Returns:
+        requests.Response: The last response received. Status is not checked.
+    """
+    method = method.upper()
+    idempotent = method in IDEMPOTENT_METHODS
+    if retry_statuses is None:
+        retry_statuses = RETRY_STATUSES if idempotent else {429}
+    retry_exceptions = (requests.ConnectionError, requests.Timeout) if idempotent else (requests.exceptions.ConnectTimeout,)
+
+    host = urlparse(url).hostname or ""
+    session = get_session()
+    attempt = 0
+    while True:
+        with _lock:
+            _request_counts[host] = _request_counts.get(host, 0) + 1
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+            if not kwargs.get("stream"):
+                metrics.inc("http_response_bytes_total", len(response.content), host=host)
+        except Exception as e:
+            metrics.observe("http_request_seconds", time.perf_counter() - started, host=host, status="error")
+            metrics.inc("http_requests_total", host=host, status="error")
+            if not isinstance(e, retry_exceptions) or attempt >= retries:
+                raise
+            delay = _backoff(attempt, backoff, max_backoff)
+            logger.warning(f"{host} 요청 실패 ({e}). {delay:.1f}초 후 재시도합니다 ({attempt + 1}/{retries})")
+            time.sleep(delay)
+            attempt += 1
+            continue
+        metrics.observe("http_request_seconds", time.perf_counter() - started, host=host, status=response.status_code)
+        metrics.inc("http_requests_total", host=host, status=response.status_code)
+
+        if response.status_code not in retry_statuses or attempt >= retries:
+            return response
+
+        delay = retry_after(response)
+        delay = min(max_backoff, delay) if delay is not None else _backoff(attempt, backoff, max_backoff)
+        logger.warning(f"{host} 응답 {response.status_code}. {delay:.1f}초 후 재시도합니다 ({attempt + 1}/{retries})")
+        response.close()
+        time.sleep(delay)
+        attempt += 1
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+def stats() -> dict:
+    """
+    Connection reuse statistics per host: requests sent (including retries), TCP/TLS
+    connections opened, and requests that reused an existing connection.
+    """
+    result = {host: {"requests": count, "connections": 0, "reused": 0} for host, count in _request_counts.items()}
+    if _session is None:
+        return result
+
+    seen = set()
+    for adapter in _session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            entry = result.setdefault(pool.host, {"requests": 0, "connections": 0, "reused": 0})
+            entry["connections"] += pool.num_connections
+            entry["reused"] += max(0, pool.num_requests - pool.num_connections)
+    return result
+
+def log_stats():
+    for host, s in sorted(stats().items()):
+        logger.info(f"HTTP {host}: 요청 {s['requests']}회, 연결 {s['connections']}개, 재사용 {s['reused']}회")
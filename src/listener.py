@@ -1,56 +1,235 @@
 import os
-import time
+import json
 import logging
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from dotenv import load_dotenv
-from src.telegram_bot import get_latest_telegram_reply, send_to_telegram
-from src.post_tweet import post_to_x
+from src.telegram_bot import get_telegram_updates, delete_webhook
+from src.outbound_queue import enqueue_tweet, enqueue_telegram
+from src import http_session, metrics, outbound_queue
+from src.paths import cache_path
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def start_listener(dry_run=False):
+OFFSET_FILE = "telegram_offset.json"
+# Update ids remembered for duplicate detection when updates may arrive out of order
+RECENT_UPDATE_IDS = 1000
+
+def load_offset():
+    """
+    Returns the persisted getUpdates offset (next update_id to process), or None.
+    """
+    try:
+        with open(cache_path(OFFSET_FILE), "r", encoding="utf-8") as f:
+            return json.load(f).get("offset")
+    except (OSError, ValueError):
+        return None
+
+def save_offset(offset):
+    path = cache_path(OFFSET_FILE)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"offset": offset}, f)
+    os.replace(tmp_path, path)
+
+
+class UpdateDispatcher:
     """
-    Polls Telegram for new messages and posts them to X.
+    Runs an update handler on a thread pool, in order per chat and concurrently across chats.
+    handle_update only queues the post in src.outbound_queue, so the pool orders and
+    parallelizes that enqueue step; when and how fast posts go out to X is up to the
+    queue (its jobs are delivered in enqueue order per destination).
+
+    Tracks which update_ids have finished so `offset` only moves past an update once it
+    and every update before it were handled. Polling from that offset means a crash or
+    restart re-delivers unfinished updates instead of losing them.
+
+    With `in_order=False` (webhook deliveries, which Telegram sends concurrently) an
+    older update_id is still accepted; duplicates are detected from the recent ids.
     """
+
+    def __init__(self, handler, max_workers: int = 4, offset=None, on_commit=None, in_order: bool = True):
+        self.handler = handler
+        self.offset = offset
+        self.on_commit = on_commit
+        self.in_order = in_order
+        self._recent = deque(maxlen=RECENT_UPDATE_IDS)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="listener")
+        self._lock = threading.Lock()
+        self._progress = threading.Condition(self._lock)
+        self._queues = {}        # chat_id -> deque of updates
+        self._running = set()    # chat_ids with a drain task scheduled
+        self._in_flight = set()  # update_ids dispatched but not finished
+        self._highest = offset - 1 if offset is not None else None
+
+    def submit(self, update: dict) -> bool:
+        """
+        Queues an update. Returns False if it was already dispatched (re-delivered by a poll).
+        """
+        update_id = update["update_id"]
+        chat_id = (update.get("message") or {}).get("chat", {}).get("id")
+        with self._lock:
+            if self.in_order:
+                if self._highest is not None and update_id <= self._highest:
+                    return False
+            elif update_id in self._recent:
+                return False
+            self._recent.append(update_id)
+            self._highest = update_id if self._highest is None else max(self._highest, update_id)
+            self._in_flight.add(update_id)
+            self._queues.setdefault(chat_id, deque()).append(update)
+            if chat_id not in self._running:
+                self._running.add(chat_id)
+                self._executor.submit(self._drain, chat_id)
+        return True
+
+    def _drain(self, chat_id):
+        while True:
+            with self._lock:
+                queue = self._queues.get(chat_id)
+                if not queue:
+                    self._queues.pop(chat_id, None)
+                    self._running.discard(chat_id)
+                    return
+                update = queue.popleft()
+
+            try:
+                self.handler(update)
+            except Exception as e:
+                logger.error(f"업데이트 {update['update_id']} 처리 중 오류: {e}")
+            finally:
+                self._finish(update["update_id"])
+
+    def _finish(self, update_id: int):
+        with self._lock:
+            self._in_flight.discard(update_id)
+            new_offset = min(self._in_flight) if self._in_flight else self._highest + 1
+            changed = new_offset != self.offset
+            self.offset = new_offset
+            # Persist under the lock so concurrent finishes never write an older offset last
+            if changed and self.on_commit:
+                self.on_commit(new_offset)
+            self._progress.notify_all()
+
+    def poll_offset(self):
+        """Offset to send to getUpdates: the oldest update not finished yet."""
+        with self._lock:
+            if self._in_flight:
+                return min(self._in_flight)
+            return self._highest + 1 if self._highest is not None else self.offset
+
+    def busy(self) -> bool:
+        with self._lock:
+            return bool(self._in_flight)
+
+    def pending(self) -> int:
+        """Updates accepted but not finished yet."""
+        with self._lock:
+            return len(self._in_flight)
+
+    def wait_progress(self, timeout: float):
+        with self._lock:
+            if self._in_flight:
+                self._progress.wait(timeout)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+def handle_update(update: dict, dry_run: bool = False):
+    """
+    Queues the text of one Telegram message for X; the result is reported back to the chat
+    by the outbound queue once the post went out (or finally failed).
+    """
+    message_text = (update.get("message") or {}).get("text")
+    if not message_text:
+        return
+
+    logger.info(f"새로운 메시지 수신: {message_text[:50]}...")
+
+    if dry_run:
+        logger.info(f"[테스트 모드] X에 다음 내용을 포스팅했을 것입니다: {message_text}")
+        enqueue_telegram(f"✅ 테스트 모드: X에 포스팅했을 내용입니다:\n{message_text}")
+    else:
+        logger.info("X 포스팅 대기열에 추가합니다.")
+        enqueue_tweet(
+            message_text,
+            notify_success="🚀 X에 성공적으로 포스팅되었습니다!",
+            notify_failure="❌ X 포스팅에 실패했습니다. 로그를 확인해주세요."
+        )
+
+def start_listener(dry_run=False, workers: int = 4, stop_event: threading.Event = None):
+    """
+    Polls Telegram for new messages and posts every one of them to X.
+    Runs until Ctrl+C, or until `stop_event` is set when hosted by another process
+    (src.daemon), which then owns draining the outbound queue and the metrics report.
+    """
+    stop = stop_event or threading.Event()
     logger.info("텔레그램 리스너를 시작합니다. 새로운 메시지를 기다리는 중...")
-    last_update_id = None
-    
-    # Initialize last_update_id to skip old messages
-    last_update_id, _ = get_latest_telegram_reply()
-    
-    while True:
+
+    offset = load_offset()
+    if offset is None:
+        # First start: skip messages sent before the listener existed
         try:
-            update_id, message_text = get_latest_telegram_reply(last_update_id)
-            
-            if update_id and message_text:
-                last_update_id = update_id
-                logger.info(f"새로운 메시지 수신: {message_text[:50]}...")
-                
-                if dry_run:
-                    logger.info(f"[테스트 모드] X에 다음 내용을 포스팅했을 것입니다: {message_text}")
-                    send_to_telegram(f"✅ 테스트 모드: X에 포스팅했을 내용입니다:\n{message_text}")
-                else:
-                    logger.info("X에 포스팅을 시작합니다.")
-                    post_to_x(message_text)
-                    send_to_telegram("🚀 X에 성공적으로 포스팅되었습니다!")
-            
-            # Polling interval
-            time.sleep(5)
-            
+            updates = get_telegram_updates(timeout=0)
+        except Exception as e:
+            logger.error(f"텔레그램 응답 가져오기 실패: {e}")
+            updates = []
+        offset = updates[-1]["update_id"] + 1 if updates else None
+        if offset is not None:
+            save_offset(offset)
+    else:
+        logger.info(f"저장된 offset {offset}부터 이어서 처리합니다.")
+
+    dispatcher = UpdateDispatcher(partial(handle_update, dry_run=dry_run), max_workers=workers, offset=offset, on_commit=save_offset)
+    error_delay = 1
+
+    while not stop.is_set():
+        try:
+            updates = get_telegram_updates(dispatcher.poll_offset(), timeout=30)
+            error_delay = 1
+
+            dispatched = sum(dispatcher.submit(update) for update in updates)
+            if not dispatched and dispatcher.busy():
+                # Only re-delivered in-flight updates: wait for a handler instead of spinning
+                dispatcher.wait_progress(timeout=1)
+
         except KeyboardInterrupt:
-            logger.info("리스너를 종료합니다.")
             break
         except Exception as e:
-            logger.error(f"리스너 오류 발생: {e}")
-            time.sleep(10)
+            response = getattr(e, "response", None)
+            if response is not None and response.status_code == 409:
+                # A webhook is still registered (src.webhook); polling takes over
+                logger.warning("등록된 웹훅이 있어 getUpdates가 거부되었습니다. 웹훅을 해제합니다.")
+                try:
+                    delete_webhook()
+                    continue
+                except Exception as delete_error:
+                    e = delete_error
+            logger.error(f"리스너 오류 발생: {e}. {error_delay}초 후 재시도합니다.")
+            stop.wait(error_delay)
+            error_delay = min(error_delay * 2, 30)
+
+    logger.info("리스너를 종료합니다. 처리 중인 메시지를 마무리합니다...")
+    dispatcher.shutdown()
+    if stop_event is None:
+        outbound_queue.drain(timeout=30)
+        http_session.log_stats()
+        metrics.write_report("listener")
 
 if __name__ == "__main__":
     import argparse
     load_dotenv()
-    
+
     parser = argparse.ArgumentParser(description="Telegram to X Listener")
     parser.add_argument("--dry-run", action="store_true", help="Run without posting to X")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Threads handling updates (queued for X in order per chat; the outbound queue paces posting)")
     args = parser.parse_args()
-    
-    start_listener(dry_run=args.dry_run)
+
+    start_listener(dry_run=args.dry_run, workers=args.workers)
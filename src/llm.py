@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from src.disk_cache import DiskCache
+from src import metrics, http_session
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = 'gemini-2.5-flash'
+API_HOST = "generativelanguage.googleapis.com"
+
+# Cached responses older than this are regenerated (default: 7 days)
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "20")) * 1024 * 1024)
+# LLM_CACHE_BYPASS=1 always calls the model (responses are still stored)
+CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "").lower() in ("1", "true", "yes")
+
+_client = None
+_cache = None
+_lock = threading.Lock()
+_counters = {"hits": 0, "misses": 0}
+
+def get_client():
+    """
+    Returns the process-wide Gemini client (created on first use).
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            # Imported lazily: google-genai is slow to import and unused in HITL runs
+            from google import genai
+            from google.genai import types
+            base_url = http_session.base_override(API_HOST)
+            http_options = types.HttpOptions(base_url=base_url) if base_url else None
+            _client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"), http_options=http_options)
+        return _client
+
+def _get_cache() -> DiskCache:
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = DiskCache("llm", max_bytes=CACHE_MAX_BYTES)
+        return _cache
+
+def _config_dict(config) -> dict:
+    if config is None:
+        return {}
+    if hasattr(config, "model_dump"):
+        return config.model_dump(mode="json", exclude_none=True)
+    return dict(config)
+
+def cache_key(model: str, prompt: str, config=None) -> str:
+    """
+    Content address of a request: (model, prompt hash, generation config).
+    """
+    return json.dumps({
+        "model": model,
+        "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        "config": _config_dict(config),
+    }, sort_keys=True)
+
+def _record_usage(model: str, response):
+    # usage_metadata is missing on some error/blocked responses
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for kind, field in (("prompt", "prompt_token_count"), ("output", "candidates_token_count"),
+                        ("thoughts", "thoughts_token_count"), ("total", "total_token_count")):
+        count = getattr(usage, field, None)
+        if count:
+            metrics.inc("llm_tokens_total", count, model=model, kind=kind)
+
+def generate(prompt: str, model: str = DEFAULT_MODEL, config=None, bypass_cache: bool = None) -> str:
+    """
+    Calls Gemini generate_content through the on-disk response cache.
+
+    Args:
+        prompt (str): The full prompt.
+        model (str): Gemini model name.
+        config: Optional generation config (dict or types.GenerateContentConfig); part of the key.
+        bypass_cache (bool): Skip the cache lookup (default: LLM_CACHE_BYPASS env var).
+
+    Returns:
+        str: The response text. Exceptions from the SDK propagate to the caller.
+    """
+    if bypass_cache is None:
+        bypass_cache = CACHE_BYPASS
+    key = cache_key(model, prompt, config)
+    cache = _get_cache()
+
+    if not bypass_cache:
+        entry = cache.get(key, ttl=CACHE_TTL)
+        if entry is not None:
+            with _lock:
+                _counters["hits"] += 1
+            metrics.inc("llm_cache_total", model=model, result="hit")
+            logger.info(f"LLM 캐시 적중 ({model})")
+            return entry.body.decode("utf-8")
+
+    with _lock:
+        _counters["misses"] += 1
+    metrics.inc("llm_cache_total", model=model, result="miss")
+
+    kwargs = {"model": model, "contents": prompt}
+    if config is not None:
+        kwargs["config"] = config
+    with metrics.timer("llm_request_seconds", model=model):
+        response = get_client().models.generate_content(**kwargs)
+    _record_usage(model, response)
+
+    text = response.text
+    if text:
+        cache.set(key, text.encode("utf-8"), {"model": model})
+    return text
+
+def generate_stream(prompt: str, model: str = DEFAULT_MODEL, config=None, bypass_cache: bool = None):
+    """
+    Streaming variant of generate(): yields the response text piece by piece as Gemini
+    produces it (generate_content_stream). A cache hit yields the whole text at once.
+    The full text is cached when the stream completes.
+    """
+    if bypass_cache is None:
+        bypass_cache = CACHE_BYPASS
+    key = cache_key(model, prompt, config)
+    cache = _get_cache()
+
+    if not bypass_cache:
+        entry = cache.get(key, ttl=CACHE_TTL)
+        if entry is not None:
+            with _lock:
+                _counters["hits"] += 1
+            metrics.inc("llm_cache_total", model=model, result="hit")
+            logger.info(f"LLM 캐시 적중 ({model})")
+            yield entry.body.decode("utf-8")
+            return
+
+    with _lock:
+        _counters["misses"] += 1
+    metrics.inc("llm_cache_total", model=model, result="miss")
+
+    kwargs = {"model": model, "contents": prompt}
+    if config is not None:
+        kwargs["config"] = config
+    parts = []
+    last = None
+    # Only time spent inside the SDK counts; the consumer (Telegram edits) runs between yields
+    elapsed = 0.0
+    outcome = "ok"
+    try:
+        started = time.perf_counter()
+        stream = iter(get_client().models.generate_content_stream(**kwargs))
+        while True:
+            try:
+                chunk = next(stream)
+            except StopIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - started
+            last = chunk
+            if chunk.text:
+                if not parts:
+                    metrics.observe("llm_first_token_seconds", elapsed, model=model)
+                parts.append(chunk.text)
+                yield chunk.text
+            started = time.perf_counter()
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        metrics.observe("llm_request_seconds", elapsed, model=model, mode="stream", outcome=outcome)
+    # The last chunk carries the usage totals for the whole response
+    if last is not None:
+        _record_usage(model, last)
+
+    text = "".join(parts)
+    if text:
+        cache.set(key, text.encode("utf-8"), {"model": model})
+
+def stats() -> dict:
+    with _lock:
+        return dict(_counters)
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import logging
+import threading
+from src import llm, metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Members per request; larger batches risk hitting the output token limit
+MAX_MEMBERS = int(os.getenv("LLM_BATCH_MAX_MEMBERS", "8"))
+# Attempts per member; only members that failed are sent again
+MAX_ATTEMPTS = int(os.getenv("LLM_BATCH_ATTEMPTS", "3"))
+# How long a BatchCollector waits for other pipelines before sending what it has
+WINDOW = float(os.getenv("LLM_BATCH_WINDOW", "5"))
+
+RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "results": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "id": {"type": "STRING"},
+                    "text": {"type": "STRING"},
+                },
+                "required": ["id", "text"],
+            },
+        },
+    },
+    "required": ["results"],
+}
+
+BATCH_CONFIG = {"response_mime_type": "application/json", "response_schema": RESPONSE_SCHEMA}
+
+BATCH_HEADER = """
+You will complete {count} independent tasks. Each task names the instruction set it must follow;
+treat every task on its own and never mix content between tasks.
+Respond with JSON only: {{"results": [{{"id": "<task id>", "text": "<finished output>"}}]}},
+exactly one entry per task id, where "text" is the complete output the instructions ask for.
+"""
+
+
+class BatchMember:
+    """
+    One topic of a batched request: the instructions (shared with other members that use
+    the same text) and the topic-specific task data.
+    """
+
+    def __init__(self, key: str, instructions: str, task: str, validate=None):
+        self.key = key
+        self.instructions = instructions
+        self.task = task
+        self.validate = validate
+
+    def prompt(self) -> str:
+        """The equivalent single-topic prompt."""
+        return self.instructions + self.task
+
+    def accepts(self, text) -> bool:
+        if not isinstance(text, str) or not text.strip():
+            return False
+        return self.validate(text) if self.validate else True
+
+
+def build_batch_prompt(members: list) -> str:
+    """Packs members into one prompt, writing each distinct instruction text once."""
+    labels = {}
+    for member in members:
+        labels.setdefault(member.instructions, chr(ord("A") + len(labels)))
+
+    parts = [BATCH_HEADER.format(count=len(members))]
+    for instructions, label in labels.items():
+        parts.append(f"=== INSTRUCTIONS {label} ===\n{instructions.strip()}\n")
+    for member in members:
+        parts.append(f"=== TASK id={member.key} (follow INSTRUCTIONS {labels[member.instructions]}) ===\n{member.task.strip()}\n")
+    return "\n".join(parts)
+
+def parse_batch_response(text: str) -> dict:
+    """id -> text from a batch response; {} when the JSON is unusable."""
+    try:
+        results = json.loads(text).get("results")
+    except (TypeError, ValueError, AttributeError):
+        return {}
+    if not isinstance(results, list):
+        return {}
+    return {str(r.get("id")): r.get("text") for r in results if isinstance(r, dict)}
+
+def _request(members: list, model: str, retry: bool) -> dict:
+    prompt = build_batch_prompt(members)
+    metrics.inc("llm_batch_requests_total", model=model)
+    try:
+        # Retries skip the cache: an identical prompt would return the same bad answer
+        text = llm.generate(prompt, model=model, config=BATCH_CONFIG, bypass_cache=True if retry else None)
+    except Exception as e:
+        logger.error(f"묶음 요청 오류 ({len(members)}개): {e}")
+        return {}
+    return parse_batch_response(text)
+
+def generate_batch(members: list, model: str = llm.DEFAULT_MODEL, max_attempts: int = MAX_ATTEMPTS,
+                   max_members: int = MAX_MEMBERS) -> dict:
+    """
+    Runs several topics through as few generate_content calls as possible.
+
+    Args:
+        members (list): BatchMembers with unique keys.
+        model (str): Gemini model name.
+        max_attempts (int): Attempts per member; failed members are retried on their own batch.
+        max_members (int): Members per request.
+
+    Returns:
+        dict: key -> generated text, or None for members that never produced a valid result.
+    """
+    results = {member.key: None for member in members}
+    pending = list(members)
+    attempt = 0
+    while pending and attempt < max_attempts:
+        failed = []
+        for start in range(0, len(pending), max_members):
+            chunk = pending[start:start + max_members]
+            answers = _request(chunk, model, retry=attempt > 0)
+            for member in chunk:
+                text = answers.get(member.key)
+                if member.accepts(text):
+                    results[member.key] = text.strip()
+                else:
+                    failed.append(member)
+        metrics.inc("llm_batch_members_total", len(pending) - len(failed), outcome="ok")
+        if failed:
+            metrics.inc("llm_batch_members_total", len(failed), outcome="failed")
+            logger.warning(f"묶음 요청에서 {len(failed)}개 항목이 실패했습니다: {', '.join(m.key for m in failed)}")
+        pending = failed
+        attempt += 1
+
+    logger.info(f"묶음 요약 완료: {len(members) - len(pending)}/{len(members)}개 성공")
+    return results
+
+
+class _Slot:
+    def __init__(self, member: BatchMember):
+        self.member = member
+        self.done = False
+        self.text = None
+
+
+class BatchCollector:
+    """
+    Lets concurrently running pipelines share Gemini requests. Each participant submits
+    at most one member and blocks until its batch returns. A batch is sent when every
+    participant has either submitted or left, when MAX_MEMBERS are waiting, or `window`
+    seconds after the first member arrived.
+    """
+
+    def __init__(self, participants: int, model: str = llm.DEFAULT_MODEL, window: float = WINDOW):
+        self.participants = participants
+        self.model = model
+        self.window = window
+        self._cond = threading.Condition()
+        self._pending = []
+        self._finished = set()  # keys that submitted or left
+        self._deadline = None
+
+    def _take_ready(self) -> list:
+        if not self._pending:
+            return []
+        if (len(self._finished) >= self.participants or len(self._pending) >= MAX_MEMBERS
+                or time.monotonic() >= self._deadline):
+            batch, self._pending, self._deadline = self._pending, [], None
+            return batch
+        return []
+
+    def submit(self, member: BatchMember):
+        """Queues the member and returns its text (None if it failed)."""
+        slot = _Slot(member)
+        with self._cond:
+            self._pending.append(slot)
+            self._finished.add(member.key)
+            if self._deadline is None:
+                self._deadline = time.monotonic() + self.window
+            self._cond.notify_all()
+        while True:
+            with self._cond:
+                while not slot.done:
+                    # Whoever sees a ready batch sends it, even if its own slot is elsewhere
+                    batch = self._take_ready()
+                    if batch:
+                        break
+                    timeout = self._deadline - time.monotonic() if self._deadline else None
+                    self._cond.wait(timeout=timeout)
+                else:
+                    return slot.text
+            self._send(batch)
+
+    def leave(self, key: str):
+        """Marks a participant as done; it will not submit (again)."""
+        with self._cond:
+            self._finished.add(key)
+            self._cond.notify_all()
+
+    def _send(self, batch: list):
+        try:
+            texts = generate_batch([slot.member for slot in batch], model=self.model)
+        except Exception as e:
+            logger.error(f"묶음 요약 오류: {e}")
+            texts = {}
+        with self._cond:
+            for slot in batch:
+                slot.text = texts.get(slot.member.key)
+                slot.done = True
+            self._cond.notify_all()
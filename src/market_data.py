@@ -0,0 +1,243 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from datetime import date, timedelta
+from src.paths import cache_path
+from src import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Set MARKET_DATA=0 to skip price/volume context (e.g. offline benchmarks)
+ENABLED = os.getenv("MARKET_DATA", "1") != "0"
+# History loaded for a ticker seen for the first time (the volume average needs ~20 bars)
+LOOKBACK_DAYS = int(os.getenv("MARKET_DATA_LOOKBACK_DAYS", "60"))
+# A ticker refreshed less than this many seconds ago is not downloaded again
+TTL = float(os.getenv("MARKET_DATA_TTL", "3600"))
+DOWNLOAD_TIMEOUT = float(os.getenv("MARKET_DATA_TIMEOUT", "10"))
+VOLUME_AVERAGE_BARS = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    day    TEXT NOT NULL,
+    open   REAL,
+    high   REAL,
+    low    REAL,
+    close  REAL NOT NULL,
+    volume INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (ticker, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS refreshes (
+    ticker       TEXT PRIMARY KEY,
+    refreshed_at INTEGER NOT NULL
+);
+"""
+
+
+class BarStore:
+    """Daily OHLCV bars per ticker, refreshed incrementally from Yahoo Finance."""
+
+    def __init__(self, path: str = None):
+        self.path = path or cache_path("market_data.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def last_days(self, tickers: list) -> dict:
+        """ticker -> last stored day (YYYY-MM-DD) for tickers that have bars."""
+        marks = ",".join("?" * len(tickers))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT ticker, MAX(day) FROM bars WHERE ticker IN ({marks}) GROUP BY ticker",
+                                      tickers).fetchall()
+        return dict(rows)
+
+    def refreshed_at(self, tickers: list) -> dict:
+        marks = ",".join("?" * len(tickers))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT ticker, refreshed_at FROM refreshes WHERE ticker IN ({marks})",
+                                      tickers).fetchall()
+        return dict(rows)
+
+    def upsert(self, rows: list, tickers: list):
+        """Stores bars (ticker, day, open, high, low, close, volume) and marks `tickers` as refreshed."""
+        now = int(time.time())
+        with self._lock, self._conn:
+            # The last bar of a previous refresh may have been an unfinished session
+            self._conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.executemany("INSERT OR REPLACE INTO refreshes VALUES (?, ?)", [(t, now) for t in tickers])
+
+    def recent(self, ticker: str, limit: int) -> list:
+        """Last `limit` bars as (day, close, volume), oldest first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT day, close, volume FROM bars WHERE ticker = ? ORDER BY day DESC LIMIT ?",
+                                      (ticker, limit)).fetchall()
+        return rows[::-1]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+# One download at a time; concurrent pipelines asking for the same tickers wait for it
+_refresh_lock = threading.Lock()
+# Background refreshes started by refresh_async(); attach() waits for them
+_inflight = []
+
+def get_store() -> BarStore:
+    """Process-wide BarStore."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BarStore()
+        return _store
+
+def _rows(data, tickers: list) -> list:
+    """Flattens a yfinance download (grouped by ticker) into bar rows."""
+    rows = []
+    for ticker in tickers:
+        if data.columns.nlevels > 1:
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            frame = data[ticker]
+        else:
+            frame = data
+        frame = frame.dropna(subset=["Close"])
+        for day, bar in zip(frame.index, frame.itertuples(index=False)):
+            bar = bar._asdict()
+            volume = bar.get("Volume")
+            rows.append((ticker, day.strftime("%Y-%m-%d"), bar.get("Open"), bar.get("High"), bar.get("Low"),
+                         float(bar["Close"]), int(volume) if volume is not None and volume == volume else 0))
+    return rows
+
+def _download(tickers: list, start: str):
+    import yfinance as yf  # heavy; only loaded when bars are actually missing
+    with metrics.timer("market_data_download_seconds"):
+        return yf.download(tickers, start=start, interval="1d", group_by="ticker", auto_adjust=False,
+                           actions=False, threads=True, progress=False, timeout=DOWNLOAD_TIMEOUT)
+
+def refresh(tickers: list, force: bool = False) -> int:
+    """
+    Brings the bar cache up to date for a whole watchlist with as few downloads as
+    possible: one call for tickers already cached (from their oldest last bar on) and
+    one for new tickers (LOOKBACK_DAYS of history).
+
+    Returns:
+        int: Bars written.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    if not ENABLED or not tickers:
+        return 0
+    store = get_store()
+    with _refresh_lock:
+        now = time.time()
+        refreshed = store.refreshed_at(tickers)
+        stale = [t for t in tickers if force or now - refreshed.get(t, 0) >= TTL]
+        if not stale:
+            return 0
+        last_days = store.last_days(stale)
+
+        groups = {}
+        new = [t for t in stale if t not in last_days]
+        if new:
+            groups[(date.today() - timedelta(days=LOOKBACK_DAYS)).isoformat()] = new
+        cached = [t for t in stale if t in last_days]
+        if cached:
+            # Re-fetch the last stored day too: it may have been stored mid-session
+            groups.setdefault(min(last_days[t] for t in cached), []).extend(cached)
+
+        written = 0
+        for start, group in groups.items():
+            try:
+                data = _download(group, start)
+            except Exception as e:
+                logger.error(f"시세 다운로드 오류 ({', '.join(group)}): {e}")
+                metrics.inc("market_data_downloads_total", outcome="error")
+                continue
+            rows = _rows(data, group)
+            # yfinance reports failed symbols in the log and leaves them out; retry those next time
+            received = sorted({row[0] for row in rows})
+            store.upsert(rows, received)
+            written += len(rows)
+            missing = set(group) - set(received)
+            if missing:
+                logger.warning(f"시세를 받지 못한 티커: {', '.join(sorted(missing))}")
+            metrics.inc("market_data_downloads_total", outcome="ok" if not missing else "partial")
+            logger.info(f"시세 갱신: {len(group)}개 티커, {start}부터 {len(rows)}개 봉")
+        return written
+
+def _refresh_logged(tickers: list):
+    try:
+        refresh(tickers)
+    except Exception as e:
+        logger.error(f"시세 갱신 오류: {e}")
+
+def refresh_async(tickers: list) -> threading.Thread:
+    """
+    Starts refresh() in a background thread, e.g. alongside the news fetch. It is
+    registered before it starts, so an attach() that runs later always waits for it.
+    """
+    thread = threading.Thread(target=_refresh_logged, args=(list(tickers),), name="market-data", daemon=True)
+    with _store_lock:
+        _inflight[:] = [t for t in _inflight if t.is_alive()]
+        _inflight.append(thread)
+    thread.start()
+    return thread
+
+def context(ticker: str):
+    """
+    Latest move and volume of a ticker from the bar cache, or None without data.
+    Keys: day, close, change_1d, change_5d, volume_ratio (vs. the 20-bar average).
+    """
+    bars = get_store().recent(ticker.upper(), VOLUME_AVERAGE_BARS + 1)
+    if len(bars) < 2:
+        return None
+    closes = [bar[1] for bar in bars]
+    volumes = [bar[2] for bar in bars]
+    average_volume = sum(volumes[:-1]) / len(volumes[:-1])
+    return {
+        "day": bars[-1][0],
+        "close": closes[-1],
+        "change_1d": closes[-1] / closes[-2] - 1,
+        "change_5d": closes[-1] / closes[-6] - 1 if len(closes) >= 6 else None,
+        "volume_ratio": volumes[-1] / average_volume if average_volume > 0 else None,
+    }
+
+def format_context(market: dict) -> str:
+    """One prompt line, e.g. 'Market data (2026-10-16 close): $2.41, -3.2% 1d, +8.5% 5d, volume 1.8x 20-day avg'."""
+    parts = [f"${market['close']:.2f}", f"{market['change_1d']:+.1%} 1d"]
+    if market.get("change_5d") is not None:
+        parts.append(f"{market['change_5d']:+.1%} 5d")
+    if market.get("volume_ratio") is not None:
+        parts.append(f"volume {market['volume_ratio']:.1f}x {VOLUME_AVERAGE_BARS}-day avg")
+    return f"Market data ({market['day']} close): {', '.join(parts)}"
+
+def attach(items: list, ticker: str) -> list:
+    """
+    Adds the ticker's market context to every item as item['market'] (unchanged without data).
+    Only reads the bar cache: downloads happen in refresh_async(), started by the runs
+    before their pipelines. Those refreshes are waited for, at most DOWNLOAD_TIMEOUT.
+    """
+    if not ENABLED or not items:
+        return items
+    deadline = time.monotonic() + DOWNLOAD_TIMEOUT
+    with _store_lock:
+        pending = list(_inflight)
+    for thread in pending:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    if any(thread.is_alive() for thread in pending):
+        logger.warning(f"시세 갱신이 끝나지 않아 {ticker} 시세 없이 진행합니다.")
+    market = context(ticker)
+    if market is None:
+        return items
+    enriched = []
+    for item in items:
+        item = item.copy()
+        item['market'] = market
+        enriched.append(item)
+    return enriched
@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import bisect
+import logging
+import tempfile
+import threading
+import functools
+from contextlib import contextmanager
+from src.paths import cache_path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PREFIX = "stock_bot_"
+
+# Latency buckets in seconds (Prometheus `le` upper bounds)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Override where the run report / Prometheus textfile (node_exporter textfile collector) go
+REPORT_PATH = os.getenv("METRICS_REPORT_PATH")
+TEXTFILE_PATH = os.getenv("METRICS_TEXTFILE_PATH")
+
+_lock = threading.Lock()
+_counters = {}    # (name, labels) -> float
+_histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+_started = time.time()
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def inc(name: str, value: float = 1, **labels):
+    """Adds `value` to the counter `name` with the given labels."""
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name: str, value: float, **labels):
+    """Records one observation (usually seconds) in the histogram `name`."""
+    key = (name, _labels(labels))
+    index = bisect.bisect_left(BUCKETS, value)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        hist[index] += 1
+        hist[-1] += value
+
+@contextmanager
+def timer(name: str, **labels):
+    """
+    Observes the duration of the block in `name`, labelled outcome="ok" or "error".
+    The yielded dict can be updated with extra labels before the block ends.
+    """
+    extra = {"outcome": "ok"}
+    started = time.perf_counter()
+    try:
+        yield extra
+    except Exception:
+        extra["outcome"] = "error"
+        raise
+    finally:
+        observe(name, time.perf_counter() - started, **labels, **extra)
+
+def timed(name: str, **labels):
+    """Decorator version of timer()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def reset():
+    global _started
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _started = time.time()
+
+def _quantile(hist: list, q: float) -> float:
+    """Upper bucket bound containing the q-quantile (None if above the last bucket)."""
+    total = sum(hist[:-1])
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bound, count in zip(BUCKETS, hist):
+        seen += count
+        if seen >= rank:
+            return bound
+    return None
+
+def snapshot() -> dict:
+    """
+    JSON-friendly view of every metric: counters as values, histograms as count, sum,
+    mean and bucket-resolution p50/p95.
+    """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(hist) for key, hist in _histograms.items()}
+
+    result = {"started_at": _started, "duration": time.time() - _started, "counters": [], "histograms": []}
+    for (name, labels), value in sorted(counters.items()):
+        result["counters"].append({"name": name, "labels": dict(labels), "value": value})
+    for (name, labels), hist in sorted(histograms.items()):
+        count = sum(hist[:-1])
+        result["histograms"].append({
+            "name": name,
+            "labels": dict(labels),
+            "count": count,
+            "sum": hist[-1],
+            "mean": hist[-1] / count if count else None,
+            "p50": _quantile(hist, 0.5),
+            "p95": _quantile(hist, 0.95),
+        })
+    return result
+
+def _format_labels(labels, extra: tuple = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = [(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+def prometheus_text() -> str:
+    """Renders all metrics in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(hist) for key, hist in _histograms.items()}
+
+    lines = []
+    for name in sorted({n for n, _ in counters}):
+        lines.append(f"# TYPE {PREFIX}{name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{PREFIX}{name}{_format_labels(labels)} {value:g}")
+    for name in sorted({n for n, _ in histograms}):
+        lines.append(f"# TYPE {PREFIX}{name} histogram")
+        for (n, labels), hist in sorted(histograms.items()):
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS, hist):
+                cumulative += count
+                lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {cumulative}")
+            cumulative += hist[len(BUCKETS)]
+            lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {cumulative}")
+            lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {hist[-1]:g}")
+            lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+def _atomic_write(path: str, text: str):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    # The textfile collector may read at any moment: never expose a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def write_report(run_name: str = "run") -> tuple:
+    """
+    Writes the JSON run report and the Prometheus textfile.
+
+    Returns:
+        tuple: (report path, textfile path)
+    """
+    report_path = REPORT_PATH or cache_path("metrics", f"{run_name}.json")
+    textfile_path = TEXTFILE_PATH or cache_path("metrics", f"{run_name}.prom")
+    report = snapshot()
+    report["run"] = run_name
+    _atomic_write(report_path, json.dumps(report, ensure_ascii=False, indent=2))
+    _atomic_write(textfile_path, prometheus_text())
+    logger.info(f"메트릭 리포트 저장: {report_path}, {textfile_path}")
+    return report_path, textfile_path
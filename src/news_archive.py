@@ -0,0 +1,241 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import numpy as np
+from src.paths import cache_path
+from src.news_item import NewsItem
+from src.seen_store import normalize_link
+from src import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = "archive"
+MANIFEST_FILE = "manifest.json"
+# More segments than this are merged into one by compact()
+COMPACT_SEGMENTS = int(os.getenv("NEWS_ARCHIVE_COMPACT_SEGMENTS", "16"))
+TEXT_COLUMNS = ("title", "link", "summary")
+COLUMNS = TEXT_COLUMNS + ("publisher", "published")
+
+_lock = threading.Lock()
+
+def link_hash(link: str, title: str = "") -> int:
+    """64-bit key of an article: its normalized link, or the title when there is none."""
+    key = normalize_link(link) or (title or "").strip().lower()
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+def _ticker_dir(ticker: str) -> str:
+    return os.path.dirname(cache_path(ARCHIVE_DIR, ticker.upper(), MANIFEST_FILE))
+
+def load_manifest(ticker: str) -> list:
+    """Live segments of a ticker: [{"name", "first", "last", "rows"}], oldest data first."""
+    try:
+        with open(os.path.join(_ticker_dir(ticker), MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)["segments"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+def _save_manifest(ticker: str, segments: list):
+    directory = _ticker_dir(ticker)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"segments": sorted(segments, key=lambda s: (s["first"], s["last"]))}, f)
+    os.replace(tmp_path, os.path.join(directory, MANIFEST_FILE))
+
+def _encode_text(values: list) -> tuple:
+    """Strings -> (utf-8 bytes as uint8, int64 offsets with len(values) + 1 entries)."""
+    encoded = [(v or "").encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+def _decode_text(data: np.ndarray, offsets: np.ndarray, lo: int, hi: int) -> list:
+    raw = data[offsets[lo]:offsets[hi]].tobytes()
+    base = offsets[lo]
+    return [raw[offsets[i] - base:offsets[i + 1] - base].decode("utf-8") for i in range(lo, hi)]
+
+def _write_segment(ticker: str, columns: dict) -> dict:
+    """Writes one sorted segment directory atomically and returns its manifest entry."""
+    published = columns["published"]
+    directory = _ticker_dir(ticker)
+    tmp_dir = tempfile.mkdtemp(dir=directory, prefix=".seg-")
+    np.save(os.path.join(tmp_dir, "published.npy"), published)
+    np.save(os.path.join(tmp_dir, "key.npy"), columns["key"])
+    # Publishers repeat a lot: dictionary-encoded
+    names, codes = np.unique(np.asarray(columns["publisher"], dtype=object).astype(str), return_inverse=True)
+    np.save(os.path.join(tmp_dir, "publisher.npy"), codes.astype(np.int32))
+    with open(os.path.join(tmp_dir, "publishers.json"), "w", encoding="utf-8") as f:
+        json.dump(names.tolist(), f, ensure_ascii=False)
+    for name in TEXT_COLUMNS:
+        data, offsets = _encode_text(columns[name])
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), data)
+        np.save(os.path.join(tmp_dir, f"{name}.idx.npy"), offsets)
+
+    first, last = int(published[0]), int(published[-1])
+    name = f"seg-{first}-{last}-{os.path.basename(tmp_dir)[5:]}"
+    os.replace(tmp_dir, os.path.join(directory, name))
+    return {"name": name, "first": first, "last": last, "rows": int(len(published))}
+
+
+class Segment:
+    """Read-only view of one segment; columns are memory-mapped and loaded on first use."""
+
+    def __init__(self, ticker: str, entry: dict):
+        self.path = os.path.join(_ticker_dir(ticker), entry["name"])
+        self.entry = entry
+        self._arrays = {}
+        self._publishers = None
+
+    def array(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+        return self._arrays[name]
+
+    def publishers(self) -> list:
+        if self._publishers is None:
+            with open(os.path.join(self.path, "publishers.json"), "r", encoding="utf-8") as f:
+                self._publishers = json.load(f)
+        return self._publishers
+
+    def bounds(self, start: int = None, end: int = None) -> tuple:
+        """Row range [lo, hi) with start <= published < end (rows are sorted by time)."""
+        published = self.array("published")
+        lo = 0 if start is None else int(np.searchsorted(published, start, side="left"))
+        hi = len(published) if end is None else int(np.searchsorted(published, end, side="left"))
+        return lo, hi
+
+    def columns(self, lo: int, hi: int, names: tuple) -> dict:
+        result = {}
+        for name in names:
+            if name in TEXT_COLUMNS:
+                result[name] = _decode_text(self.array(name), self.array(f"{name}.idx"), lo, hi)
+            elif name == "publisher":
+                publishers = self.publishers()
+                result[name] = [publishers[code] for code in self.array("publisher")[lo:hi]]
+            else:
+                result[name] = np.array(self.array(name)[lo:hi])
+        return result
+
+
+def _segments(ticker: str, start: int = None, end: int = None) -> list:
+    """Segments whose time span overlaps [start, end), without opening any file."""
+    return [Segment(ticker, entry) for entry in load_manifest(ticker)
+            if (start is None or entry["last"] >= start) and (end is None or entry["first"] < end)]
+
+def existing_keys(ticker: str) -> np.ndarray:
+    segments = _segments(ticker)
+    if not segments:
+        return np.empty(0, dtype=np.uint64)
+    return np.concatenate([segment.array("key") for segment in segments])
+
+def append(ticker: str, items: list) -> int:
+    """
+    Adds NewsItems to a ticker's archive as one new segment. Items without a publication
+    time and articles already archived (same normalized link) are skipped.
+
+    Returns:
+        int: Rows actually added.
+    """
+    rows = {}
+    for item in items:
+        if item.published is None:
+            continue
+        rows.setdefault(link_hash(item.link, item.title), item)
+    if not rows:
+        return 0
+
+    with _lock:
+        keys = np.fromiter(rows.keys(), dtype=np.uint64, count=len(rows))
+        fresh = ~np.isin(keys, existing_keys(ticker))
+        keys = keys[fresh]
+        if not len(keys):
+            return 0
+        new_items = [item for item, keep in zip(rows.values(), fresh) if keep]
+        published = np.array([item.published for item in new_items], dtype=np.int64)
+        order = np.argsort(published, kind="stable")
+        columns = {
+            "published": published[order],
+            "key": keys[order],
+            "publisher": [new_items[i].publisher or "" for i in order],
+        }
+        for name in TEXT_COLUMNS:
+            columns[name] = [getattr(new_items[i], name) or "" for i in order]
+
+        entry = _write_segment(ticker, columns)
+        _save_manifest(ticker, load_manifest(ticker) + [entry])
+
+    metrics.inc("news_archive_rows_total", entry["rows"], ticker=ticker.upper())
+    return entry["rows"]
+
+def compact(ticker: str, max_segments: int = COMPACT_SEGMENTS) -> bool:
+    """Merges all segments into one when there are more than `max_segments`."""
+    with _lock:
+        segments = _segments(ticker)
+        if len(segments) <= max_segments:
+            return False
+        parts = [segment.columns(0, segment.entry["rows"], COLUMNS + ("key",)) for segment in segments]
+        published = np.concatenate([part["published"] for part in parts])
+        order = np.argsort(published, kind="stable")
+        columns = {"published": published[order], "key": np.concatenate([part["key"] for part in parts])[order]}
+        for name in TEXT_COLUMNS + ("publisher",):
+            values = [value for part in parts for value in part[name]]
+            columns[name] = [values[i] for i in order]
+
+        entry = _write_segment(ticker, columns)
+        _save_manifest(ticker, [entry])
+        # Readers only follow the manifest, so the old directories can go now
+        for segment in segments:
+            shutil.rmtree(segment.path, ignore_errors=True)
+    logger.info(f"{ticker} 아카이브 세그먼트 {len(segments)}개를 하나로 합쳤습니다 ({entry['rows']}건).")
+    return True
+
+def count(ticker: str, start: int = None, end: int = None) -> int:
+    """Number of archived items with start <= published < end; reads only the time column."""
+    total = 0
+    for segment in _segments(ticker, start, end):
+        lo, hi = segment.bounds(start, end)
+        total += hi - lo
+    return total
+
+def scan_columns(ticker: str, start: int = None, end: int = None, columns: tuple = COLUMNS) -> dict:
+    """
+    Column-wise read of a ticker's archive for start <= published < end (UTC epochs).
+    Only the requested columns are touched; text is decoded for the matching rows only.
+
+    Returns:
+        dict: column name -> list (text/publisher) or numpy array (published), oldest first.
+    """
+    result = {name: [] for name in columns}
+    chunks = []
+    for segment in _segments(ticker, start, end):
+        lo, hi = segment.bounds(start, end)
+        if hi > lo:
+            chunks.append(segment.columns(lo, hi, tuple(columns) + ("published",)))
+    if not chunks:
+        if "published" in result:
+            result["published"] = np.empty(0, dtype=np.int64)
+        return result
+
+    # Segments may overlap in time (each backfill run adds one), so merge by time
+    order = np.argsort(np.concatenate([chunk["published"] for chunk in chunks]), kind="stable")
+    for name in columns:
+        if name == "published" or name == "key":
+            result[name] = np.concatenate([chunk[name] for chunk in chunks])[order]
+        else:
+            values = [value for chunk in chunks for value in chunk[name]]
+            result[name] = [values[i] for i in order]
+    return result
+
+def scan(ticker: str, start: int = None, end: int = None) -> list:
+    """Archived NewsItems with start <= published < end, oldest first."""
+    data = scan_columns(ticker, start, end)
+    return [
+        NewsItem(title, link, summary=summary, publisher=publisher, published=int(published))
+        for title, link, summary, publisher, published in zip(
+            data["title"], data["link"], data["summary"], data["publisher"], data["published"])
+    ]
@@ -0,0 +1,121 @@
+import time
+import calendar
+from array import array
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Keys older code used for the same field
+ALIASES = {"source": "publisher", "text": "title", "url": "link"}
+# Keys rendered from the epoch on access
+RENDERED = {"published_at", "created_at"}
+FIELDS = ("title", "link", "summary", "publisher", "published")
+
+def format_epoch(epoch: int, fmt: str = TIME_FORMAT) -> str:
+    """Renders a UTC epoch; only call this when the string is actually displayed or stored."""
+    return time.strftime(fmt, time.gmtime(epoch)) if epoch is not None else ""
+
+def parse_utc(value: str, fmt: str = TIME_FORMAT) -> int:
+    """Parses a naive UTC timestamp string into an epoch, or None."""
+    try:
+        return calendar.timegm(time.strptime(value, fmt))
+    except (TypeError, ValueError):
+        return None
+
+
+class NewsItem:
+    """
+    One fetched article, press release or tweet.
+
+    `published` is an integer UTC epoch; strings such as 'published_at' are rendered on
+    access. Source-specific fields (tweet author, likes, cluster 'publishers'...) live in
+    `extra`. Supports the dict-style access the summarizers and stores already use.
+    """
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self, title: str, link: str = "", summary: str = "", publisher: str = "",
+                 published: int = None, extra: dict = None):
+        self.title = title
+        self.link = link
+        self.summary = summary
+        self.publisher = publisher
+        self.published = published
+        self.extra = extra
+
+    def __getitem__(self, key: str):
+        key = ALIASES.get(key, key)
+        if key in FIELDS:
+            return getattr(self, key)
+        if key in RENDERED:
+            return format_epoch(self.published)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        key = ALIASES.get(key, key)
+        if key in FIELDS:
+            setattr(self, key, value)
+        elif key in RENDERED:
+            self.published = parse_utc(value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> list:
+        return list(FIELDS[:4]) + ["published_at"] + list(self.extra or ())
+
+    def copy(self) -> "NewsItem":
+        return NewsItem(self.title, self.link, self.summary, self.publisher, self.published,
+                        dict(self.extra) if self.extra else None)
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self.keys()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NewsItem":
+        published = data.get("published")
+        if published is None:
+            published = parse_utc(data.get("published_at") or data.get("created_at"))
+        extra = {k: v for k, v in data.items()
+                 if k not in FIELDS and k not in ALIASES and k not in RENDERED}
+        return cls(
+            title=data.get("title") or data.get("text") or "",
+            link=data.get("link") or data.get("url") or "",
+            summary=data.get("summary") or "",
+            publisher=data.get("publisher") or data.get("source") or "",
+            published=int(published) if published is not None else None,
+            extra=extra or None,
+        )
+
+    def __repr__(self):
+        return f"NewsItem({self.title!r}, {self.publisher!r}, {format_epoch(self.published)!r})"
+
+
+def epochs(items: list) -> array:
+    """Published epochs as a compact int64 array (missing dates count as 0)."""
+    return array("q", [item.published or 0 for item in items])
+
+def filter_since(items: list, cutoff: int) -> list:
+    """Items published at or after the UTC epoch `cutoff`."""
+    published = epochs(items)
+    return [item for item, epoch in zip(items, published) if epoch >= cutoff]
+
+def newest_first(items: list) -> list:
+    """Items sorted by publication time, newest first (stable for equal times)."""
+    published = epochs(items)
+    order = sorted(range(len(items)), key=published.__getitem__, reverse=True)
+    return [items[i] for i in order]
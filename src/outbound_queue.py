@@ -0,0 +1,428 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from src.paths import cache_path
+from src import metrics, seen_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+X = "x"
+TELEGRAM = "telegram"
+
+MAX_ATTEMPTS = 5
+# A running job whose claim is older than this is assumed lost (its process died) and requeued
+LEASE_SECONDS = float(os.getenv("OUTBOUND_LEASE_SECONDS", "600"))
+
+# X API v2 POST /2/tweets: Free tier allows 17 posts per 24h per user
+X_POSTS_PER_DAY = float(os.getenv("X_POSTS_PER_DAY", "17"))
+# Telegram: ~30 messages/s overall, ~1 message/s per chat
+TELEGRAM_GLOBAL_PER_SEC = 30.0
+TELEGRAM_CHAT_PER_SEC = float(os.getenv("TELEGRAM_CHAT_PER_SEC", "1"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    destination TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    not_before  REAL NOT NULL,
+    created_at  REAL NOT NULL,
+    finished_at REAL,
+    last_error  TEXT,
+    claimed_at  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs (status, not_before);
+"""
+
+
+class TokenBucket:
+    """
+    Classic token bucket. `rate` tokens per second refill up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, self.paused_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def take(self):
+        self._refill(time.monotonic())
+        self.tokens -= 1
+
+    def pause(self, seconds: float):
+        """Blocks the bucket after a 429 until the server's reset time."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RetryLater(Exception):
+    """Raised by a delivery function when the destination asked us to slow down."""
+
+    def __init__(self, delay: float, message: str = ""):
+        super().__init__(message or f"retry after {delay:.0f}s")
+        self.delay = delay
+
+
+class TransientError(Exception):
+    """
+    Raised by a delivery function for failures worth retrying (5xx, network errors).
+    Anything else a delivery raises (4xx, missing credentials) fails the job at once.
+    """
+
+
+def _deliver_x(payload: dict):
+    import requests
+    import tweepy
+    from src.post_tweet import create_tweet
+
+    try:
+        tweet_id = create_tweet(payload["text"])
+    except tweepy.TooManyRequests as e:
+        reset = e.response.headers.get("x-rate-limit-reset")
+        delay = float(reset) - time.time() if reset else 15 * 60
+        raise RetryLater(max(delay, 1.0), str(e))
+    except (tweepy.TwitterServerError, requests.ConnectionError, requests.Timeout) as e:
+        raise TransientError(str(e)) from e
+    logger.info(f"트윗 포스팅 성공! ID: {tweet_id}")
+
+def _deliver_telegram(payload: dict):
+    import requests
+    from src.telegram_bot import send_message
+    from src.http_session import retry_after
+
+    try:
+        # retries=0: rate limits are rescheduled by the queue instead of sleeping in a worker
+        send_message(payload["text"], chat_id=payload.get("chat_id"), retries=0)
+    except requests.HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        if status == 429:
+            raise RetryLater(retry_after(e.response) or 1.0, str(e))
+        if status is None or status >= 500:
+            raise TransientError(str(e)) from e
+        raise
+    except (requests.ConnectionError, requests.Timeout) as e:
+        raise TransientError(str(e)) from e
+
+DELIVERERS = {X: _deliver_x, TELEGRAM: _deliver_telegram}
+
+
+class OutboundQueue:
+    """
+    Durable posting queue for X and Telegram backed by SQLite.
+
+    Jobs survive restarts, are rate-limited per destination with token buckets, and are
+    rescheduled according to Retry-After / x-rate-limit-reset on 429. Jobs for the same
+    destination (and Telegram chat) are delivered one at a time, in order.
+    """
+
+    def __init__(self, path: str = None, workers: int = 2):
+        self.path = path or cache_path("outbound.db")
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        if "claimed_at" not in columns:
+            # Databases created before claims carried a timestamp
+            with self._conn:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN claimed_at REAL")
+        self._requeue_expired()
+
+        self._buckets = {
+            X: TokenBucket(X_POSTS_PER_DAY / 86400, max(1.0, X_POSTS_PER_DAY)),
+            TELEGRAM: TokenBucket(TELEGRAM_GLOBAL_PER_SEC, TELEGRAM_GLOBAL_PER_SEC),
+        }
+        # The daily X quota spans runs: charge what earlier processes posted in the last 24h
+        posted = self._conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE destination = ? AND status = 'done' AND finished_at >= ?",
+            (X, time.time() - 86400)
+        ).fetchone()[0]
+        if posted:
+            self._buckets[X].tokens = max(0.0, self._buckets[X].tokens - posted)
+            logger.info(f"최근 24시간 동안 X에 {posted}건을 포스팅했습니다. 남은 한도: {self._buckets[X].tokens:.0f}건")
+        self._busy_keys = set()
+        self._latencies = []
+        self._stopped = False
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"outbound-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    # ---- producer API -------------------------------------------------
+
+    def enqueue(self, destination: str, payload: dict, delay: float = 0.0) -> int:
+        """Stores a job and returns its id without waiting for delivery."""
+        if destination not in DELIVERERS:
+            raise ValueError(f"알 수 없는 전송 대상입니다: {destination}")
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO jobs (destination, payload, not_before, created_at) VALUES (?, ?, ?, ?)",
+                    (destination, json.dumps(payload, ensure_ascii=False), now + delay, now)
+                )
+            self._wakeup.notify_all()
+        return cursor.lastrowid
+
+    def depth(self) -> dict:
+        """Pending/running jobs per destination."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT destination, COUNT(*) FROM jobs WHERE status IN ('pending', 'running') GROUP BY destination"
+            ).fetchall()
+        return dict(rows)
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """Blocks until nothing is pending or running. Returns False on timeout."""
+        end_at = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            while self._conn.execute("SELECT 1 FROM jobs WHERE status IN ('pending', 'running') LIMIT 1").fetchone():
+                remaining = None if end_at is None else end_at - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._wakeup.wait(timeout=min(remaining, 1.0) if remaining is not None else 1.0)
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+        result = {"depth": self.depth(), "delivered": len(latencies)}
+        if latencies:
+            result["drain_latency_avg"] = sum(latencies) / len(latencies)
+            result["drain_latency_p95"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return result
+
+    def log_stats(self):
+        s = self.stats()
+        latency = f", 평균 {s['drain_latency_avg']:.1f}초 / p95 {s['drain_latency_p95']:.1f}초" if s["delivered"] else ""
+        logger.info(f"전송 큐: 대기 {s['depth'] or 0}, 완료 {s['delivered']}건{latency}")
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify_all()
+
+    # ---- worker side ---------------------------------------------------
+
+    @staticmethod
+    def _key(destination: str, payload: dict) -> str:
+        if destination == TELEGRAM:
+            return f"{TELEGRAM}:{payload.get('chat_id') or 'default'}"
+        return destination
+
+    def _bucket(self, key: str) -> TokenBucket:
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(TELEGRAM_CHAT_PER_SEC, 1.0)
+        return self._buckets[key]
+
+    def _requeue_expired(self):
+        """
+        Returns running jobs whose lease expired (their process crashed) to the queue.
+        Jobs claimed recently may belong to another live process sharing the database.
+        """
+        with self._conn:
+            requeued = self._conn.execute(
+                "UPDATE jobs SET status = 'pending' WHERE status = 'running' AND COALESCE(claimed_at, 0) < ?",
+                (time.time() - LEASE_SECONDS,)
+            ).rowcount
+        if requeued:
+            logger.warning(f"중단된 전송 작업 {requeued}건을 다시 대기열에 넣었습니다.")
+
+    def _claim(self):
+        """
+        Picks the oldest due job whose destination is idle and within its rate limits.
+        Returns (job, key) or (None, seconds_to_sleep). Caller holds the lock.
+        The claim is a conditional UPDATE, so a job is never taken by two processes.
+        """
+        self._requeue_expired()
+        now = time.time()
+        rows = self._conn.execute(
+            "SELECT id, destination, payload, attempts, created_at FROM jobs "
+            "WHERE status = 'pending' AND not_before <= ? ORDER BY id LIMIT 100",
+            (now,)
+        ).fetchall()
+
+        sleep_for = 1.0
+        for job_id, destination, payload_json, attempts, created_at in rows:
+            payload = json.loads(payload_json)
+            key = self._key(destination, payload)
+            if key in self._busy_keys:
+                continue
+
+            buckets = [self._bucket(destination)] + ([self._bucket(key)] if key != destination else [])
+            wait = max(bucket.wait_time() for bucket in buckets)
+            if wait > 0:
+                # Same-key jobs behind this one must wait too, to keep order
+                self._busy_keys.add(key)
+                self._release_later(key, wait)
+                sleep_for = min(sleep_for, wait)
+                continue
+
+            with self._conn:
+                claimed = self._conn.execute(
+                    "UPDATE jobs SET status = 'running', claimed_at = ? WHERE id = ? AND status = 'pending'",
+                    (now, job_id)
+                ).rowcount
+            if not claimed:
+                # Another process sharing outbound.db took it first
+                continue
+            for bucket in buckets:
+                bucket.take()
+            self._busy_keys.add(key)
+            return (job_id, destination, payload, attempts, created_at), key
+
+        upcoming = self._conn.execute("SELECT MIN(not_before) FROM jobs WHERE status = 'pending'").fetchone()[0]
+        if upcoming is not None:
+            sleep_for = min(sleep_for, max(0.05, upcoming - now))
+        return None, sleep_for
+
+    def _release_later(self, key: str, delay: float):
+        def release():
+            with self._lock:
+                self._busy_keys.discard(key)
+                self._wakeup.notify_all()
+        timer = threading.Timer(delay, release)
+        timer.daemon = True
+        timer.start()
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return
+                job, key_or_sleep = self._claim()
+                if job is None:
+                    self._wakeup.wait(timeout=key_or_sleep)
+                    continue
+            self._run(job, key_or_sleep)
+
+    def _run(self, job, key: str):
+        job_id, destination, payload, attempts, created_at = job
+        attempts += 1
+        try:
+            DELIVERERS[destination](payload)
+        except RetryLater as e:
+            logger.warning(f"{destination} 속도 제한. {e.delay:.0f}초 후 다시 보냅니다.")
+            metrics.inc("outbound_jobs_total", destination=destination, outcome="rate_limited")
+            with self._lock:
+                self._bucket(key).pause(e.delay)
+            # Rate limits do not count as failed attempts
+            self._finish(job_id, key, "pending", attempts - 1, str(e), not_before=time.time() + e.delay)
+            return
+        except TransientError as e:
+            if attempts < MAX_ATTEMPTS:
+                delay = min(300, 2 ** attempts)
+                logger.warning(f"{destination} 전송 실패 (작업 {job_id}, {attempts}/{MAX_ATTEMPTS}): {e}. {delay}초 후 재시도")
+                metrics.inc("outbound_jobs_total", destination=destination, outcome="retry")
+                self._finish(job_id, key, "pending", attempts, str(e), not_before=time.time() + delay)
+            else:
+                self._fail(job_id, key, destination, payload, attempts, e)
+            return
+        except Exception as e:
+            # 4xx (duplicate post, 403, bad request), missing credentials: retrying will not help
+            self._fail(job_id, key, destination, payload, attempts, e)
+            return
+
+        self._finish(job_id, key, "done", attempts, None)
+        latency = time.time() - created_at
+        with self._lock:
+            self._latencies.append(latency)
+        metrics.inc("outbound_jobs_total", destination=destination, outcome="delivered")
+        # Enqueue → delivered, including rate-limit waits and retries
+        metrics.observe("outbound_delivery_seconds", latency, destination=destination)
+        self._follow_up(payload, success=True)
+
+    def _fail(self, job_id: int, key: str, destination: str, payload: dict, attempts: int, error: Exception):
+        logger.error(f"{destination} 전송 최종 실패 (작업 {job_id}): {error}")
+        metrics.inc("outbound_jobs_total", destination=destination, outcome="failed")
+        self._finish(job_id, key, "failed", attempts, str(error))
+        self._follow_up(payload, success=False)
+
+    def _finish(self, job_id: int, key: str, status: str, attempts: int, error, not_before: float = None):
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = ?, last_error = ?, finished_at = ?, "
+                    "not_before = COALESCE(?, not_before) WHERE id = ?",
+                    (status, attempts, error, time.time() if status in ("done", "failed") else None, not_before, job_id)
+                )
+            self._busy_keys.discard(key)
+            self._wakeup.notify_all()
+
+    def _follow_up(self, payload: dict, success: bool):
+        # Items the post was built from count as seen only once it went out
+        if payload.get("seen"):
+            if success:
+                seen_store.confirm(payload["seen"])
+            else:
+                seen_store.release(payload["seen"])
+        # Optional Telegram notification once a post went out (or finally failed)
+        text = payload.get("notify_success") if success else payload.get("notify_failure")
+        if text:
+            self.enqueue(TELEGRAM, {"text": text, "chat_id": payload.get("notify_chat_id")})
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_queue() -> OutboundQueue:
+    """Returns the process-wide queue, starting its workers on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = OutboundQueue()
+        return _queue
+
+def enqueue_tweet(text: str, notify_success: str = None, notify_failure: str = None, seen: dict = None) -> int:
+    """
+    Queues a tweet. Optional Telegram messages are queued after it is posted or finally fails.
+    `seen` is a seen_store reservation, confirmed on delivery and released on final failure.
+    """
+    payload = {"text": text}
+    if seen:
+        payload["seen"] = seen
+    if notify_success:
+        payload["notify_success"] = notify_success
+    if notify_failure:
+        payload["notify_failure"] = notify_failure
+    return get_queue().enqueue(X, payload)
+
+def enqueue_telegram(text: str, chat_id=None, seen: dict = None) -> int:
+    payload = {"text": text, "chat_id": chat_id}
+    if seen:
+        payload["seen"] = seen
+    return get_queue().enqueue(TELEGRAM, payload)
+
+def drain(timeout: float = 120.0) -> bool:
+    """
+    Waits for queued posts before a short-lived process exits. Anything left over stays
+    in the database and is delivered by the next process that uses the queue.
+    """
+    if _queue is None:
+        return True
+    idle = _queue.wait_idle(timeout=timeout)
+    if not idle:
+        logger.warning(f"{timeout}초 안에 전송 큐를 비우지 못했습니다. 남은 작업은 다음 실행에서 전송됩니다.")
+    _queue.log_stats()
+    return idle
@@ -0,0 +1,15 @@
+import os
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# All persistent run state (HTTP cache, stores, checkpoints) lives here.
+# GitHub Actions restores this directory between scheduled runs.
+CACHE_DIR = os.getenv("STOCK_BOT_CACHE_DIR", os.path.join(PROJECT_ROOT, ".cache"))
+
+def cache_path(*parts: str) -> str:
+    """
+    Returns a path inside CACHE_DIR, creating the parent directory if needed.
+    """
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
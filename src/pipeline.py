@@ -0,0 +1,278 @@
+import os
+import html
+import time
+import logging
+from src import seen_store, metrics, selection, telegram_bot
+from src.dedup import expand_clusters
+from src.outbound_queue import enqueue_tweet, enqueue_telegram
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SOURCE = "source"
+FILTER = "filter"
+DEDUP = "dedup"
+SELECT = "select"
+ENRICH = "enrich"
+SUMMARIZE = "summarize"
+PUBLISH = "publish"
+
+HITL_HEADER = """
+----------------------------------------
+[AI 프롬프트 시작]
+"""
+HITL_FOOTER = """
+[AI 프롬프트 끝]
+----------------------------------------
+위 내용을 전체 복사하여 GPT나 Claude 등에 넣고 답변을 받으세요.
+그 후 받은 답변을 이 봇에게 다시 보내주시면 X에 포스팅됩니다!
+"""
+
+
+class Draft:
+    """Text produced by a summarize stage, plus the items it was built from."""
+
+    def __init__(self, text: str, items: list):
+        self.text = text
+        self.items = items
+
+
+class Stage:
+    """
+    One step of a pipeline. `process` turns the upstream stream into a new stream.
+    """
+    kind = None
+
+    def __init__(self, name: str, fn):
+        self.name = name
+        self.fn = fn
+
+    def process(self, stream, ctx: dict):
+        raise NotImplementedError
+
+
+class Source(Stage):
+    """fn(ctx) -> iterable of items. Ignores upstream."""
+    kind = SOURCE
+
+    def process(self, stream, ctx):
+        yield from self.fn(ctx) or ()
+
+
+class Filter(Stage):
+    """fn(item, ctx) -> bool, applied item by item."""
+    kind = FILTER
+
+    def process(self, stream, ctx):
+        for item in stream:
+            if self.fn(item, ctx):
+                yield item
+
+
+class Dedup(Stage):
+    """fn(items) -> items. Needs the whole upstream window, so it buffers."""
+    kind = DEDUP
+
+    def process(self, stream, ctx):
+        yield from self.fn(list(stream))
+
+
+class Select(Stage):
+    """fn(items, ctx) -> items. Ranks the whole upstream window, so it buffers."""
+    kind = SELECT
+
+    def process(self, stream, ctx):
+        yield from self.fn(list(stream), ctx)
+
+
+class Enrich(Stage):
+    """fn(items, ctx) -> items with extra context for the prompt. Buffers the window."""
+    kind = ENRICH
+
+    def process(self, stream, ctx):
+        items = list(stream)
+        yield from (self.fn(items, ctx) if items else ())
+
+
+class Summarize(Stage):
+    """fn(items, ctx) -> Draft or None. Not called when upstream is empty."""
+    kind = SUMMARIZE
+
+    def process(self, stream, ctx):
+        items = list(stream)
+        if not items:
+            logger.info(f"[{ctx.get('name')}] 보고할 새 항목이 없습니다.")
+            return
+        draft = self.fn(items, ctx)
+        if draft is not None:
+            yield draft
+
+
+class Publish(Stage):
+    """fn(draft, ctx) -> None, called once per draft; yields the draft on."""
+    kind = PUBLISH
+
+    def process(self, stream, ctx):
+        for draft in stream:
+            self.fn(draft, ctx)
+            yield draft
+
+
+class _TimedIterator:
+    """Wraps an upstream iterator and accumulates the time spent inside it."""
+
+    def __init__(self, iterable):
+        self.iterator = iter(iterable)
+        self.elapsed = 0.0
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            item = next(self.iterator)
+        finally:
+            self.elapsed += time.perf_counter() - started
+        self.count += 1
+        return item
+
+
+class PipelineResult:
+    def __init__(self, name: str):
+        self.name = name
+        self.stage_times = {}   # stage name -> seconds spent in the stage itself
+        self.stage_counts = {}  # stage name -> items emitted
+        self.drafts = []
+        self.elapsed = 0.0
+
+    def log(self):
+        parts = [f"{stage} {seconds:.2f}초/{self.stage_counts.get(stage, 0)}개" for stage, seconds in self.stage_times.items()]
+        logger.info(f"[{self.name}] 총 {self.elapsed:.2f}초 | " + " → ".join(parts))
+
+
+class Pipeline:
+    """
+    Chain of typed stages connected by generators. Each item flows downstream as soon
+    as it is produced; wall time is recorded per stage, excluding time spent upstream.
+    """
+
+    def __init__(self, name: str, stages: list, **ctx):
+        self.name = name
+        self.stages = stages
+        self.ctx = dict(ctx, name=name)
+
+    def _instrument(self, stage: Stage, upstream, result: PipelineResult):
+        timed = _TimedIterator(upstream)
+        generator = stage.process(timed, self.ctx)
+        while True:
+            started = time.perf_counter()
+            upstream_before = timed.elapsed
+            try:
+                item = next(generator)
+            except StopIteration:
+                return
+            finally:
+                result.stage_times[stage.name] += (time.perf_counter() - started) - (timed.elapsed - upstream_before)
+            result.stage_counts[stage.name] += 1
+            yield item
+
+    def run(self) -> PipelineResult:
+        result = PipelineResult(self.name)
+        started = time.perf_counter()
+        stream = iter(())
+        for stage in self.stages:
+            result.stage_times[stage.name] = 0.0
+            result.stage_counts[stage.name] = 0
+            stream = self._instrument(stage, stream, result)
+        try:
+            result.drafts = list(stream)
+        finally:
+            # Pipelines that never reached summarize must not hold up a shared batch
+            if self.ctx.get("batch"):
+                self.ctx["batch"].leave(self.name)
+        result.elapsed = time.perf_counter() - started
+        for stage in self.stages:
+            metrics.observe("pipeline_stage_seconds", result.stage_times[stage.name], pipeline=self.name, stage=stage.name)
+            metrics.inc("pipeline_items_total", result.stage_counts[stage.name], pipeline=self.name, stage=stage.name)
+        result.log()
+        return result
+
+
+# ---- shared stage building blocks used by the bot definitions ----------------
+
+def selector(fields: tuple = ("title", "summary"), budget: int = None, max_items: int = None) -> Select:
+    """
+    Keeps the best items that fit the prompt token budget (see src.selection).
+    `fields` are the item fields the bot's prompt actually uses.
+    """
+    return Select("select", lambda items, ctx: selection.select(items, fields, budget=budget, max_items=max_items))
+
+def hitl_summarizer(build_prompt) -> Summarize:
+    """
+    Builds the LLM prompt for a human to paste into a chatbot (HITL mode).
+    `build_prompt(items, ctx)` must return the prompt text.
+    """
+    def summarize(items, ctx):
+        prompt = build_prompt(items, ctx)
+        # Telegram messages are sent with parse_mode=HTML
+        text = html.escape(HITL_HEADER + prompt + HITL_FOOTER, quote=False)
+        return Draft(text, items)
+    return Summarize("hitl_prompt", summarize)
+
+def _stream_summary(chunks, ctx) -> str:
+    try:
+        text = telegram_bot.stream_to_telegram(chunks, header=f"[{ctx['name']}] 초안\n\n")
+    except Exception as e:
+        logger.error(f"요약 스트리밍 오류: {e}")
+        return f"Error generating summary: {e}"
+    return text.strip() or "오류: 빈 응답입니다."
+
+def gemini_summarizer(summarize_fn, batch_member=None, stream_fn=None) -> Summarize:
+    """
+    Runs a Gemini summarizer `summarize_fn(items, ctx) -> str` and drops failed results.
+    With ctx "stream", `stream_fn(items, ctx)` chunks are shown live in Telegram while
+    they arrive. Otherwise, when ctx has a "batch" (llm_batch.BatchCollector),
+    `batch_member(items, ctx)` is submitted there so several pipelines share one request.
+    """
+    def summarize(items, ctx):
+        if not os.getenv("GEMINI_API_KEY"):
+            logger.error("GEMINI_API_KEY가 없습니다. 요약을 건너뜁니다.")
+            return None
+        if ctx.get("stream") and stream_fn:
+            text = _stream_summary(stream_fn(items, ctx), ctx)
+        elif ctx.get("batch") and batch_member:
+            text = ctx["batch"].submit(batch_member(items, ctx)) or "오류: 묶음 요약에 실패했습니다."
+        else:
+            text = summarize_fn(items, ctx)
+        logger.info("요약 생성 완료:")
+        print("-" * 40)
+        print(text)
+        print("-" * 40)
+        if text.startswith("Error") or text.startswith("오류"):
+            logger.error("요약 생성 실패. 트위터 포스팅을 건너뜁니다.")
+            return None
+        return Draft(text, items)
+    return Summarize("gemini", summarize)
+
+def publisher(seen_source) -> Publish:
+    """
+    Queues the draft for Telegram (HITL) or X. Its items are reserved in the seen store
+    and marked seen by the queue once the draft is delivered.
+    `seen_source` is a seen-store source name or a callable(ctx) returning one.
+    """
+    def publish(draft, ctx):
+        if ctx.get("dry_run") and not ctx.get("hitl"):
+            logger.info("테스트 모드 활성화. 트위터 포스팅을 건너뜁니다.")
+            return
+        source_name = seen_source(ctx) if callable(seen_source) else seen_source
+        # ctx["watermark"]: (link, published) a source wants saved once the draft is delivered
+        seen = seen_store.reserve(source_name, expand_clusters(draft.items), ctx.get("watermark"))
+        if ctx.get("hitl"):
+            enqueue_telegram(draft.text, seen=seen)
+            logger.info("텔레그램 전송 대기열에 추가했습니다.")
+        else:
+            enqueue_tweet(draft.text, seen=seen)
+    return Publish("publish", publish)
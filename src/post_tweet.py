@@ -1,51 +1,86 @@
-import tweepy
 import os
 import logging
+import threading
+from src import metrics, http_session
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """
+    Returns the process-wide authenticated tweepy.Client, or None if credentials are missing.
+    """
+    global _client
+    # Imported lazily: HITL runs never post directly and should not pay for tweepy
+    import tweepy
+    
+    with _client_lock:
+        if _client is None:
+            consumer_key = os.getenv("X_CONSUMER_KEY")
+            consumer_secret = os.getenv("X_CONSUMER_SECRET")
+            access_token = os.getenv("X_ACCESS_TOKEN")
+            access_token_secret = os.getenv("X_ACCESS_TOKEN_SECRET")
+            bearer_token = os.getenv("X_BEARER_TOKEN")
+            
+            if not all([consumer_key, consumer_secret, access_token, access_token_secret]):
+                return None
+            
+            # Client for API v2
+            _client = tweepy.Client(
+                bearer_token=bearer_token,
+                consumer_key=consumer_key,
+                consumer_secret=consumer_secret,
+                access_token=access_token,
+                access_token_secret=access_token_secret
+            )
+            http_session.mount_overrides(_client.session)
+        return _client
+
+def create_tweet(content: str) -> str:
+    """
+    Posts `content` and returns the tweet ID. tweepy exceptions (e.g. TooManyRequests) propagate.
+    """
+    client = get_client()
+    if client is None:
+        raise ValueError("X API 인증 정보가 없습니다. X_CONSUMER_KEY, X_CONSUMER_SECRET, X_ACCESS_TOKEN, X_ACCESS_TOKEN_SECRET을 설정해주세요.")
+    
+    # Split logic if content is too long (basic chunking)
+    # Note: X Blue allows longer tweets, but free tier is 280 chars unless configured.
+    # For now, we assume the summary fits or we let it fail if too long to warn the user.
+    # A simple check:
+    if len(content) > 280:
+         logger.warning("내용이 280자를 초과합니다. 프리미엄이 아닌 경우 실패할 수 있습니다.")
+    
+    with metrics.timer("post_seconds", channel="x"):
+        response = client.create_tweet(text=content)
+    return response.data['id']
+
 def post_to_x(content: str):
     """
     Posts a tweet to X using Tweepy (API v2).
     
     Args:
         content (str): The text to tweet.
+        
+    Returns:
+        bool: True if the tweet was posted.
     """
-    # Load credentials
-    consumer_key = os.getenv("X_CONSUMER_KEY")
-    consumer_secret = os.getenv("X_CONSUMER_SECRET")
-    access_token = os.getenv("X_ACCESS_TOKEN")
-    access_token_secret = os.getenv("X_ACCESS_TOKEN_SECRET")
-    bearer_token = os.getenv("X_BEARER_TOKEN")
-
-    if not all([consumer_key, consumer_secret, access_token, access_token_secret]):
-        logger.error("X API 인증 정보가 없습니다. X_CONSUMER_KEY, X_CONSUMER_SECRET, X_ACCESS_TOKEN, X_ACCESS_TOKEN_SECRET을 설정해주세요.")
-        return
-
+    import tweepy
+    
     try:
-        # Client for API v2
-        client = tweepy.Client(
-            bearer_token=bearer_token,
-            consumer_key=consumer_key,
-            consumer_secret=consumer_secret,
-            access_token=access_token,
-            access_token_secret=access_token_secret
-        )
-        
-        # Split logic if content is too long (basic chunking)
-        # Note: X Blue allows longer tweets, but free tier is 280 chars unless configured.
-        # For now, we assume the summary fits or we let it fail if too long to warn the user.
-        # A simple check:
-        if len(content) > 280:
-             logger.warning("내용이 280자를 초과합니다. 프리미엄이 아닌 경우 실패할 수 있습니다.")
-        
-        response = client.create_tweet(text=content)
-        logger.info(f"트윗 포스팅 성공! ID: {response.data['id']}")
-        
+        tweet_id = create_tweet(content)
+        logger.info(f"트윗 포스팅 성공! ID: {tweet_id}")
+        return True
+    except ValueError as e:
+        logger.error(str(e))
+        return False
     except tweepy.TweepyException as e:
         logger.error(f"트윗 포스팅 오류: {e}")
+        return False
 
 if __name__ == "__main__":
     # Test stub
@@ -0,0 +1,92 @@
+import os
+import sys
+import argparse
+import logging
+from dotenv import load_dotenv
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from news import main as news_main
+from biotech_news import main as biotech_main
+from xPosting import main as xposting_main
+from src.fanout import fan_out, MODE_MERGE
+from src import http_session, llm, llm_batch, metrics, outbound_queue, market_data
+
+# Load environment variables from .env file for local development
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BOTS = ["news", "biotech", "xposting"]
+
+def build_pipelines(bots: list, tickers: list, dry_run: bool = False, hitl: bool = False, include_seen: bool = False,
+                    stream: bool = False) -> list:
+    pipelines = []
+    if "news" in bots:
+        pipelines.extend(news_main.build_pipeline(t, dry_run=dry_run, hitl=hitl, include_seen=include_seen, stream=stream) for t in tickers)
+    if "biotech" in bots:
+        pipelines.append(biotech_main.build_pipeline(dry_run=dry_run, hitl=hitl, include_seen=include_seen, stream=stream))
+    if "xposting" in bots:
+        # xPosting has no HITL mode
+        pipelines.append(xposting_main.build_pipeline(dry_run=dry_run, include_seen=include_seen, stream=stream))
+    return pipelines
+
+def run_all(bots: list = None, tickers: list = None, dry_run: bool = False, hitl: bool = False,
+            include_seen: bool = False, workers: int = 4, stream: bool = False) -> dict:
+    """
+    Runs several bot pipelines concurrently in this process, so they share the HTTP
+    connection pools, the HTTP/LLM caches, the Gemini client and the outbound queue.
+    Gemini summaries of pipelines that reach the summarize stage together go out as one
+    batched request.
+
+    Returns:
+        dict: pipeline name -> PipelineResult (failed pipelines are logged and omitted).
+    """
+    bots, tickers = bots or BOTS, tickers or ["DNA"]
+    pipelines = build_pipelines(bots, tickers, dry_run=dry_run, hitl=hitl, include_seen=include_seen, stream=stream)
+    logger.info(f"{len(pipelines)}개 파이프라인을 실행합니다: {', '.join(p.name for p in pipelines)}")
+    if not hitl and not stream:
+        # Pipelines queued behind the worker limit cannot join; the batch window covers them
+        batch = llm_batch.BatchCollector(min(len(pipelines), workers))
+        for pipeline in pipelines:
+            pipeline.ctx["batch"] = batch
+
+    if "news" in bots:
+        # Started before any pipeline runs, so every news Enrich stage waits for it
+        market_data.refresh_async(tickers)
+    outcome = fan_out([(p.name, p.run) for p in pipelines], mode=MODE_MERGE, max_workers=workers)
+    for name, error in outcome.errors.items():
+        logger.error(f"{name} 파이프라인 오류: {error}")
+
+    logger.info(f"전체 실행 시간 {outcome.elapsed:.2f}초")
+    http_session.log_stats()
+    cache_stats = llm.stats()
+    logger.info(f"LLM 캐시: 적중 {cache_stats['hits']}회, 미스 {cache_stats['misses']}회")
+    return outcome.results
+
+if __name__ == "__main__":
+    # Run from the project root: python -m src.run_all
+    parser = argparse.ArgumentParser(description="Run the news, biotech and xPosting bots in one process")
+    parser.add_argument("--bots", type=str, default=",".join(BOTS), help=f"Comma-separated bots to run (default: {','.join(BOTS)})")
+    parser.add_argument("--tickers", type=str, default="DNA", help="Tickers for the news bot (default: DNA)")
+    parser.add_argument("--dry-run", action="store_true", help="Run without posting to X")
+    parser.add_argument("--hitl", action="store_true", help="Human-In-The-Loop mode: Send prompts to Telegram")
+    parser.add_argument("--include-seen", action="store_true", help="Do not skip items already delivered in previous runs")
+    parser.add_argument("--stream", action="store_true", help="Show the Gemini draft live in Telegram while it is generated")
+    parser.add_argument("--workers", type=int, default=4, help="Max pipelines running concurrently (default: 4)")
+    args = parser.parse_args()
+
+    bots = [b.strip().lower() for b in args.bots.split(",") if b.strip()]
+    unknown = set(bots) - set(BOTS)
+    if unknown:
+        parser.error(f"unknown bots: {', '.join(sorted(unknown))}")
+    tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+
+    run_all(bots, tickers, dry_run=args.dry_run, hitl=args.hitl, include_seen=args.include_seen, workers=args.workers,
+            stream=args.stream)
+
+    # Posts are queued; give them a chance to go out before the process exits
+    outbound_queue.drain()
+    metrics.write_report("run_all")
@@ -0,0 +1,228 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit
+from src.paths import cache_path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Items older than this (by first-seen time) are forgotten
+HORIZON_DAYS = float(os.getenv("SEEN_STORE_HORIZON_DAYS", "30"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_items (
+    source       TEXT NOT NULL,
+    key          TEXT NOT NULL,
+    title_hash   TEXT NOT NULL,
+    published_at INTEGER,
+    seen_at      INTEGER NOT NULL,
+    PRIMARY KEY (source, key)
+);
+CREATE INDEX IF NOT EXISTS idx_seen_source_published ON seen_items (source, published_at);
+CREATE INDEX IF NOT EXISTS idx_seen_title ON seen_items (source, title_hash);
+CREATE INDEX IF NOT EXISTS idx_seen_seen_at ON seen_items (seen_at);
+CREATE TABLE IF NOT EXISTS pending_items (
+    source      TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    title_hash  TEXT NOT NULL,
+    reserved_at INTEGER NOT NULL,
+    PRIMARY KEY (source, key)
+);
+CREATE INDEX IF NOT EXISTS idx_pending_title ON pending_items (source, title_hash);
+CREATE TABLE IF NOT EXISTS watermarks (
+    source    TEXT PRIMARY KEY,
+    link      TEXT NOT NULL,
+    published INTEGER NOT NULL
+);
+"""
+
+def _hash(value: str) -> str:
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+def normalize_title(title: str) -> str:
+    return re.sub(r"\W+", " ", (title or "").lower()).strip()
+
+def normalize_link(link: str) -> str:
+    # Drop scheme, fragment, query tracking params and trailing slash
+    if not link:
+        return ""
+    parts = urlsplit(link.strip())
+    query = "&".join(p for p in parts.query.split("&") if p and not p.lower().startswith(("utm_", "oc=")))
+    return urlunsplit(("", parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+
+def item_keys(item) -> tuple:
+    """
+    Returns (key, title_hash) for a news/tweet dict. The key prefers the link and falls back
+    to the title, so items without links are still tracked.
+    """
+    title = item.get("title") or item.get("text") or ""
+    link = normalize_link(item.get("link") or item.get("url") or "")
+    title_hash = _hash(normalize_title(title))
+    return (_hash(link) if link else title_hash), title_hash
+
+def _published_epoch(item):
+    # NewsItem carries the epoch; plain dicts only have the rendered string
+    published = getattr(item, "published", None)
+    if published is not None:
+        return int(published)
+    value = item.get("published_at") or item.get("created_at")
+    if not value:
+        return None
+    try:
+        return int(datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+class SeenStore:
+    """
+    Persistent record of items already summarized/posted, keyed per source.
+
+    Items of a queued post are reserved first (so later runs skip them while it waits
+    in src.outbound_queue) and only recorded as seen once the post was delivered.
+    """
+
+    def __init__(self, path: str = None, horizon_days: float = HORIZON_DAYS):
+        self.path = path or cache_path("seen_items.db")
+        self.horizon_days = horizon_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self.evict()
+
+    def filter_new(self, source: str, items: list) -> list:
+        """
+        Returns the items whose link or title has not been seen (or reserved) for `source`.
+        """
+        if not items:
+            return []
+        with self._lock:
+            new_items = []
+            for item in items:
+                key, title_hash = item_keys(item)
+                row = self._conn.execute(
+                    "SELECT 1 FROM seen_items WHERE source = ? AND (key = ? OR title_hash = ?) "
+                    "UNION ALL SELECT 1 FROM pending_items WHERE source = ? AND (key = ? OR title_hash = ?) LIMIT 1",
+                    (source, key, title_hash, source, key, title_hash)
+                ).fetchone()
+                if row is None:
+                    new_items.append(item)
+
+        skipped = len(items) - len(new_items)
+        if skipped:
+            logger.info(f"[{source}] 이미 처리한 항목 {skipped}개를 건너뜁니다. 새 항목 {len(new_items)}개.")
+        return new_items
+
+    def mark_seen(self, source: str, items: list):
+        """
+        Records items as processed. Call only after they were actually delivered.
+        """
+        self.confirm(self.reservation(source, items))
+
+    def reservation(self, source: str, items: list) -> dict:
+        """JSON-serializable record of `items`' keys, to be stored with a queued post."""
+        keys = []
+        for item in items:
+            key, title_hash = item_keys(item)
+            keys.append([key, title_hash, _published_epoch(item)])
+        return {"source": source, "keys": keys}
+
+    def reserve(self, source: str, items: list, watermark: tuple = None) -> dict:
+        """
+        Hides items from filter_new until the post built from them is delivered (confirm)
+        or finally fails (release). Returns the reservation to pass to either.
+        `watermark` is a (link, published) pair saved for `source` on confirm.
+        """
+        reservation = self.reservation(source, items)
+        if watermark:
+            reservation["watermark"] = list(watermark)
+        now = int(time.time())
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pending_items (source, key, title_hash, reserved_at) VALUES (?, ?, ?, ?)",
+                [(source, key, title_hash, now) for key, title_hash, _ in reservation["keys"]]
+            )
+        return reservation
+
+    def confirm(self, reservation: dict):
+        """Records the reserved items as seen."""
+        source, now = reservation["source"], int(time.time())
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_items (source, key, title_hash, published_at, seen_at) VALUES (?, ?, ?, ?, ?)",
+                [(source, key, title_hash, published, now) for key, title_hash, published in reservation["keys"]]
+            )
+            self._conn.executemany("DELETE FROM pending_items WHERE source = ? AND key = ?",
+                                   [(source, key) for key, _, _ in reservation["keys"]])
+            if reservation.get("watermark"):
+                link, published = reservation["watermark"]
+                self._conn.execute(
+                    "INSERT INTO watermarks (source, link, published) VALUES (?, ?, ?) "
+                    "ON CONFLICT (source) DO UPDATE SET link = excluded.link, published = excluded.published "
+                    "WHERE excluded.published >= watermarks.published",
+                    (source, link, published)
+                )
+
+    def watermark(self, source: str) -> dict:
+        """Newest entry of the last delivered post for `source`: {"link", "published"}, or {}."""
+        with self._lock:
+            row = self._conn.execute("SELECT link, published FROM watermarks WHERE source = ?", (source,)).fetchone()
+        return {"link": row[0], "published": row[1]} if row else {}
+
+    def release(self, reservation: dict):
+        """Makes the reserved items available again (their post was not delivered)."""
+        source = reservation["source"]
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM pending_items WHERE source = ? AND key = ?",
+                                   [(source, key) for key, _, _ in reservation["keys"]])
+
+    def evict(self, horizon_days: float = None):
+        horizon = self.horizon_days if horizon_days is None else horizon_days
+        cutoff = int(time.time() - horizon * 86400)
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM seen_items WHERE seen_at < ?", (cutoff,)).rowcount
+            # Reservations whose queue job was lost (e.g. outbound.db deleted)
+            self._conn.execute("DELETE FROM pending_items WHERE reserved_at < ?", (cutoff,))
+        if deleted:
+            logger.info(f"{horizon}일이 지난 처리 기록 {deleted}개를 삭제했습니다.")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store() -> SeenStore:
+    """Returns the process-wide SeenStore."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SeenStore()
+        return _store
+
+def filter_new(source: str, items: list) -> list:
+    return get_store().filter_new(source, items)
+
+def mark_seen(source: str, items: list):
+    get_store().mark_seen(source, items)
+
+def reserve(source: str, items: list, watermark: tuple = None) -> dict:
+    return get_store().reserve(source, items, watermark)
+
+def confirm(reservation: dict):
+    get_store().confirm(reservation)
+
+def release(reservation: dict):
+    get_store().release(reservation)
+
+def watermark(source: str) -> dict:
+    return get_store().watermark(source)
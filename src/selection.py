@@ -0,0 +1,124 @@
+import os
+import re
+import html
+import math
+import time
+import logging
+from functools import lru_cache
+from src import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Token budget for the item text of one prompt (the instructions around it are fixed)
+TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1200"))
+MAX_ITEMS = int(os.getenv("PROMPT_MAX_ITEMS", "5"))
+# A single long RSS summary is clipped so it cannot eat the whole budget
+SUMMARY_MAX_TOKENS = int(os.getenv("PROMPT_SUMMARY_MAX_TOKENS", "200"))
+# Recency score halves every this many hours
+HALF_LIFE_HOURS = float(os.getenv("SELECTION_HALF_LIFE_HOURS", "24"))
+
+# Relative trust per publisher (lower-case); unknown publishers weigh 1.0
+PUBLISHER_WEIGHTS = {
+    "reuters": 1.3,
+    "bloomberg": 1.3,
+    "the wall street journal": 1.3,
+    "financial times": 1.2,
+    "cnbc": 1.1,
+    "nature biotechnology": 1.3,
+    "stat news": 1.2,
+    "endpoints news": 1.2,
+    "fierce biotech": 1.1,
+    "biopharma dive": 1.1,
+    "ginkgo investor relations": 1.2,
+}
+
+TAG_RE = re.compile(r"<[^>]+>")
+SPACE_RE = re.compile(r"\s+")
+# Hangul, CJK and kana come out at roughly one token per character
+WIDE_RE = re.compile(r"[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u4e00-\u9fff\uac00-\ud7af]")
+
+def strip_html(text: str) -> str:
+    """Plain text of an RSS summary: tags removed, entities decoded, whitespace collapsed."""
+    if not text:
+        return ""
+    return SPACE_RE.sub(" ", html.unescape(TAG_RE.sub(" ", text))).strip()
+
+@lru_cache(maxsize=4096)
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate Gemini token count: about 4 characters per token for Latin text and one
+    token per Hangul/CJK character. Cached, since the same items are costed on every run.
+    """
+    if not text:
+        return 0
+    wide = len(WIDE_RE.findall(text))
+    return wide + math.ceil((len(text) - wide) / 4)
+
+def clip_tokens(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # Cut by the estimate's own ratio, then trim to the last word boundary
+    keep = max(1, int(len(text) * max_tokens / estimate_tokens(text)))
+    return text[:keep].rsplit(" ", 1)[0] + "…"
+
+def prompt_text(item, fields: tuple) -> str:
+    """The part of an item that ends up in the prompt, for costing."""
+    return "\n".join(str(item.get(field) or "") for field in fields)
+
+def publisher_weight(item) -> float:
+    # Clusters carry every publisher that ran the story; wider coverage counts a little
+    publishers = item.get('publishers') or [item.get('publisher') or ""]
+    weight = max(PUBLISHER_WEIGHTS.get(p.lower(), 1.0) for p in publishers)
+    return weight * (1 + 0.1 * min(len(publishers) - 1, 3))
+
+def score(item, now: float = None, half_life_hours: float = HALF_LIFE_HOURS) -> float:
+    """recency × publisher weight × engagement (tweets only)."""
+    now = now or time.time()
+    published = getattr(item, "published", None)
+    recency = 0.5 if published is None else 0.5 ** (max(0.0, now - published) / 3600 / half_life_hours)
+    engagement = 1 + math.log1p((item.get('likes') or 0) + 2 * (item.get('retweets') or 0)) / 4
+    return recency * publisher_weight(item) * engagement
+
+def clean(item):
+    """Copy of the item with its summary reduced to clipped plain text."""
+    if not item.get('summary'):
+        return item
+    item = item.copy()
+    item['summary'] = clip_tokens(strip_html(item['summary']), SUMMARY_MAX_TOKENS)
+    return item
+
+def select(items: list, fields: tuple = ("title", "summary"), budget: int = None, max_items: int = None) -> list:
+    """
+    Picks the highest-scoring items whose prompt text fits the token budget.
+
+    Args:
+        items (list): Candidate NewsItems.
+        fields (tuple): Item fields the prompt uses; only these are costed.
+        budget (int): Token budget for the item text (default: PROMPT_TOKEN_BUDGET).
+        max_items (int): Upper bound on the number of items (default: PROMPT_MAX_ITEMS).
+
+    Returns:
+        list: Cleaned copies of the chosen items, best first. The best item is always
+        kept, even when it alone exceeds the budget.
+    """
+    budget = TOKEN_BUDGET if budget is None else budget
+    max_items = MAX_ITEMS if max_items is None else max_items
+    now = time.time()
+    ranked = sorted((clean(item) for item in items), key=lambda item: score(item, now), reverse=True)
+
+    chosen, used = [], 0
+    for item in ranked:
+        if len(chosen) >= max_items:
+            break
+        cost = estimate_tokens(prompt_text(item, fields))
+        if chosen and used + cost > budget:
+            continue
+        chosen.append(item)
+        used += cost
+
+    metrics.inc("prompt_item_tokens_total", used)
+    if len(chosen) < len(items):
+        logger.info(f"후보 {len(items)}개 중 {len(chosen)}개를 선택했습니다 (약 {used}/{budget} 토큰).")
+    return chosen
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import random
+import logging
+import tempfile
+import threading
+from src.paths import cache_path
+from src import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HEALTH_FILE = "source_health.json"
+
+ORDER_HEALTH = "health"
+ORDER_WEIGHTED = "weighted"
+
+# Weight of the newest observation in the moving averages
+ALPHA = float(os.getenv("SOURCE_HEALTH_ALPHA", "0.3"))
+# Consecutive failures that open a source's circuit
+FAILURE_THRESHOLD = int(os.getenv("SOURCE_HEALTH_FAILURES", "3"))
+# First open period; doubled on every failed probe up to MAX_COOLDOWN
+COOLDOWN = float(os.getenv("SOURCE_HEALTH_COOLDOWN", str(30 * 60)))
+MAX_COOLDOWN = float(os.getenv("SOURCE_HEALTH_MAX_COOLDOWN", str(6 * 3600)))
+# Request timeout bounds; in between it follows the observed latency (TCP RTO style)
+MIN_TIMEOUT = float(os.getenv("SOURCE_HEALTH_MIN_TIMEOUT", "3"))
+MAX_TIMEOUT = float(os.getenv("SOURCE_HEALTH_MAX_TIMEOUT", "15"))
+# A feed whose newest entry is this old scores half as much
+FRESHNESS_HALF_LIFE_HOURS = float(os.getenv("SOURCE_HEALTH_FRESHNESS_HOURS", "24"))
+# Latency at which a source scores half as much
+LATENCY_SCALE = 2.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _new_stats() -> dict:
+    return {"latency": None, "latency_dev": 0.0, "error_rate": 0.0, "failures": 0,
+            "newest": None, "opened_at": None, "cooldown": COOLDOWN}
+
+
+class SourceHealth:
+    """
+    Persisted per-source statistics: latency EWMA (with its mean deviation), error-rate
+    EWMA and the publication time of the newest entry seen. They rank sources, size their
+    request timeouts and drive a circuit breaker: after FAILURE_THRESHOLD consecutive
+    failures a source is skipped for a cooldown, then allowed one probe (half-open).
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or cache_path(HEALTH_FILE)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._stats = json.load(f)
+        except (OSError, ValueError):
+            self._stats = {}
+
+    def _get(self, name: str) -> dict:
+        # Called with self._lock held
+        return self._stats.setdefault(name, _new_stats())
+
+    def _save(self):
+        # Called with self._lock held
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._stats, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def state(self, name: str, now: float = None) -> str:
+        now = now or time.time()
+        with self._lock:
+            stats = self._get(name)
+            if stats["opened_at"] is None:
+                return CLOSED
+            return HALF_OPEN if now >= stats["opened_at"] + stats["cooldown"] else OPEN
+
+    def timeout(self, name: str) -> float:
+        """Request timeout: latency EWMA + 4 × mean deviation, within MIN/MAX_TIMEOUT."""
+        with self._lock:
+            stats = self._get(name)
+            if stats["latency"] is None:
+                return MAX_TIMEOUT
+            return min(MAX_TIMEOUT, max(MIN_TIMEOUT, stats["latency"] + 4 * stats["latency_dev"]))
+
+    def score(self, name: str, now: float = None) -> float:
+        """Higher is better: success rate × freshness / latency. Unknown sources score high."""
+        now = now or time.time()
+        with self._lock:
+            stats = self._get(name)
+            latency = stats["latency"] if stats["latency"] is not None else 0.0
+            freshness = 1.0
+            if stats["newest"] is not None:
+                age_hours = max(0.0, now - stats["newest"]) / 3600
+                freshness = max(0.05, 0.5 ** (age_hours / FRESHNESS_HALF_LIFE_HOURS))
+            return (1.0 - stats["error_rate"]) * freshness / (1.0 + latency / LATENCY_SCALE)
+
+    def record_success(self, name: str, latency: float = None, newest: int = None):
+        """`latency` is None when the answer came from a local cache (says nothing about the source)."""
+        with self._lock:
+            stats = self._get(name)
+            if latency is not None and stats["latency"] is None:
+                stats["latency"], stats["latency_dev"] = latency, latency / 2
+            elif latency is not None:
+                stats["latency_dev"] += ALPHA * (abs(latency - stats["latency"]) - stats["latency_dev"])
+                stats["latency"] += ALPHA * (latency - stats["latency"])
+            stats["error_rate"] *= 1 - ALPHA
+            stats["failures"] = 0
+            if newest is not None:
+                stats["newest"] = max(newest, stats["newest"] or 0)
+            if stats["opened_at"] is not None:
+                logger.info(f"{name} 소스가 복구되었습니다. 회로를 닫습니다.")
+                stats["opened_at"], stats["cooldown"] = None, COOLDOWN
+            self._save()
+        metrics.inc("source_requests_total", source=name, outcome="ok")
+
+    def record_failure(self, name: str, latency: float = None):
+        with self._lock:
+            stats = self._get(name)
+            # A timeout says as much about latency as a success does
+            if latency is not None:
+                stats["latency"] = latency if stats["latency"] is None else stats["latency"] + ALPHA * (latency - stats["latency"])
+            stats["error_rate"] += ALPHA * (1.0 - stats["error_rate"])
+            stats["failures"] += 1
+            if stats["opened_at"] is not None:
+                # Failed half-open probe: stay open, wait longer
+                stats["cooldown"] = min(stats["cooldown"] * 2, MAX_COOLDOWN)
+                stats["opened_at"] = time.time()
+            elif stats["failures"] >= FAILURE_THRESHOLD:
+                stats["opened_at"] = time.time()
+                logger.warning(f"{name} 소스가 {stats['failures']}번 연속 실패했습니다. {stats['cooldown'] / 60:.0f}분 동안 건너뜁니다.")
+            self._save()
+        metrics.inc("source_requests_total", source=name, outcome="error")
+
+    def plan(self, names: list, order: str = ORDER_HEALTH, rng: random.Random = None) -> list:
+        """
+        Sources to try this run: half-open probes first, then the rest best first. Probes
+        lead so that callers stopping at the first result (fan_out "first" mode) still run
+        them. Open circuits are left out; if every circuit is open, the one that opened
+        first is probed anyway.
+
+        Args:
+            names (list): Source names.
+            order (str): "health" ranks by score; "weighted" draws a random order in which
+                healthier sources tend to come first, for more varied content.
+            rng (random.Random): Randomness for "weighted" (default: the random module).
+        """
+        now = time.time()
+        states = {name: self.state(name, now) for name in names}
+        closed = [name for name in names if states[name] == CLOSED]
+        probes = [name for name in names if states[name] == HALF_OPEN]
+        skipped = [name for name in names if states[name] == OPEN]
+        for name in skipped:
+            metrics.inc("source_skipped_total", source=name)
+        if skipped:
+            logger.info(f"회로가 열린 소스를 건너뜁니다: {', '.join(skipped)}")
+        if not closed and not probes:
+            with self._lock:
+                probes = [min(names, key=lambda name: self._get(name)["opened_at"])]
+
+        scores = {name: self.score(name, now) for name in closed}
+        if order == ORDER_WEIGHTED:
+            rng = rng or random
+            # Weighted sampling without replacement (Efraimidis-Spirakis keys)
+            keys = {name: rng.random() ** (1.0 / max(scores[name], 1e-6)) for name in closed}
+            closed.sort(key=keys.get, reverse=True)
+        else:
+            closed.sort(key=scores.get, reverse=True)
+        return probes + closed
+
+    def probes(self, names: list) -> list:
+        """The names in a plan() that are probes of an open circuit rather than closed sources."""
+        return [name for name in names if self.state(name) != CLOSED]
+
+
+_health = None
+_health_lock = threading.Lock()
+
+def get_health() -> SourceHealth:
+    """Process-wide SourceHealth."""
+    global _health
+    with _health_lock:
+        if _health is None:
+            _health = SourceHealth()
+        return _health
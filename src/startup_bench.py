@@ -0,0 +1,67 @@
+import sys
+import json
+import argparse
+import subprocess
+from src.paths import PROJECT_ROOT
+
+ENTRY_POINTS = ["news.main", "biotech_news.main", "xPosting.main", "src.listener", "src.run_all", "src.daemon"]
+
+# Dependencies that should only load on the code paths that use them
+HEAVY_MODULES = ["tweepy", "google.genai", "feedparser", "bs4", "yfinance"]
+
+def measure(module: str) -> dict:
+    """
+    Imports `module` in a fresh interpreter with -X importtime.
+
+    Returns:
+        dict: total (µs), per-module cumulative times (µs) and which heavy modules loaded.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{proc.stderr.strip().splitlines()[-1]}")
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, self_us, cumulative_us, name = [p.strip() for p in line.replace("import time:", "|", 1).split("|")]
+        cumulative[name.strip()] = int(cumulative_us)
+
+    return {
+        "module": module,
+        "total_us": cumulative.get(module, 0),
+        "modules": cumulative,
+        "heavy_loaded": [m for m in HEAVY_MODULES if m in cumulative],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of the bot entry points")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS, help="Modules to import (default: all entry points)")
+    parser.add_argument("--top", type=int, default=10, help="Show the N slowest top-level imports per entry point")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results = [measure(module) for module in args.modules]
+
+    if args.json:
+        print(json.dumps([{k: v for k, v in r.items() if k != "modules"} | {
+            "top": sorted(r["modules"].items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+        } for r in results], indent=2))
+        return
+
+    for r in results:
+        print(f"{r['module']}: {r['total_us'] / 1000:.1f} ms")
+        heavy = ", ".join(r["heavy_loaded"]) or "none"
+        print(f"  heavy deps loaded at import: {heavy}")
+        # Skip the entry point itself and its package parents
+        top = [(n, us) for n, us in r["modules"].items() if not r["module"].startswith(n)]
+        for name, us in sorted(top, key=lambda kv: kv[1], reverse=True)[:args.top]:
+            print(f"  {us / 1000:8.1f} ms  {name}")
+
+if __name__ == "__main__":
+    # Run from the project root: python -m src.startup_bench
+    main()
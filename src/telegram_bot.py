@@ -1,23 +1,32 @@
 import os
-import requests
+from src import http_session, metrics
+from src.outbound_queue import TokenBucket
 import logging
 import time
 import html
+import threading
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def send_to_telegram(text: str):
+# Edits count against Telegram's ~1 message/s per chat limit; leave some headroom
+EDIT_INTERVAL = float(os.getenv("TELEGRAM_EDIT_INTERVAL", "1.5"))
+# Telegram rejects longer messages; partial drafts are cut a little earlier
+MAX_MESSAGE_CHARS = 4096
+STREAM_PREVIEW_CHARS = 3900
+CURSOR = " ▌"
+
+def send_message(text: str, chat_id=None, retries: int = 3) -> dict:
     """
-    Sends a message to the configured Telegram chat.
+    Sends a message and returns Telegram's Message object.
+    Raises requests.HTTPError (e.g. 429 once `retries` are used up) or ValueError if unconfigured.
     """
     token = os.getenv("TELEGRAM_BOT_TOKEN")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
+    chat_id = chat_id or os.getenv("TELEGRAM_CHAT_ID")
     
     if not token or not chat_id:
-        logger.error("TELEGRAM_BOT_TOKEN 또는 TELEGRAM_CHAT_ID가 .env에 설정되지 않았습니다.")
-        return False
+        raise ValueError("TELEGRAM_BOT_TOKEN 또는 TELEGRAM_CHAT_ID가 .env에 설정되지 않았습니다.")
         
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     
@@ -28,40 +37,238 @@ def send_to_telegram(text: str):
         "parse_mode": "HTML"
     }
     
-    try:
-        response = requests.post(url, json=payload, timeout=15)
+    with metrics.timer("post_seconds", channel="telegram"):
+        response = http_session.post(url, json=payload, timeout=15, retries=retries)
         if response.status_code == 400:
             logger.warning("HTML 파싱 오류 가능성. 일반 텍스트로 다시 시도합니다.")
             payload.pop("parse_mode")
             # Remove basic tags if sending as plain text to avoid showing <b> etc.
             payload["text"] = text.replace("<b>", "").replace("</b>", "").replace("<i>", "").replace("</i>", "")
-            response = requests.post(url, json=payload, timeout=15)
+            response = http_session.post(url, json=payload, timeout=15, retries=retries)
             
         response.raise_for_status()
+    return response.json().get("result", {})
+
+def edit_message(message_id: int, text: str, chat_id=None, retries: int = 0) -> dict:
+    """
+    Replaces the text of a message sent earlier (editMessageText).
+    Raises requests.HTTPError (429 included; retries=0 leaves pacing to the caller).
+    """
+    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    chat_id = chat_id or os.getenv("TELEGRAM_CHAT_ID")
+    
+    if not token or not chat_id:
+        raise ValueError("TELEGRAM_BOT_TOKEN 또는 TELEGRAM_CHAT_ID가 .env에 설정되지 않았습니다.")
+    
+    url = f"https://api.telegram.org/bot{token}/editMessageText"
+    payload = {
+        "chat_id": chat_id,
+        "message_id": message_id,
+        "text": text,
+        "parse_mode": "HTML"
+    }
+    
+    with metrics.timer("post_seconds", channel="telegram_edit"):
+        response = http_session.post(url, json=payload, timeout=15, retries=retries)
+        if response.status_code == 400 and "not modified" in response.text:
+            return {}
+        if response.status_code == 400:
+            payload.pop("parse_mode")
+            payload["text"] = html.unescape(text)
+            response = http_session.post(url, json=payload, timeout=15, retries=retries)
+        response.raise_for_status()
+    return response.json().get("result", {})
+
+
+class LiveMessage:
+    """
+    A Telegram message that follows a growing text, e.g. an LLM response as it streams.
+
+    The first update sends the message; later updates edit it, at most once per
+    `interval` seconds. Updates arriving in between only replace the pending text, so a
+    fast producer never queues up edits, and a 429 just delays the next edit until
+    Telegram's retry_after. Network calls run on a background thread and never block
+    the producer.
+    """
+
+    def __init__(self, chat_id=None, header: str = "", interval: float = EDIT_INTERVAL):
+        self.chat_id = chat_id
+        self.header = header
+        self.message_id = None
+        self.edits = 0
+        self.coalesced = 0
+        self._bucket = TokenBucket(1 / interval, 1.0)
+        self._cond = threading.Condition()
+        self._latest = ""
+        self._shown = None        # text of the last successful send/edit
+        self._final_shown = False
+        self._closed = False
+        self._failed = False
+        self._thread = threading.Thread(target=self._run, name="telegram-live", daemon=True)
+        self._thread.start()
+
+    def update(self, text: str):
+        with self._cond:
+            if self._latest != self._shown:
+                self.coalesced += 1
+            self._latest = text
+            self._cond.notify_all()
+
+    def close(self, text: str = None, timeout: float = 30.0):
+        """Shows the final text (without the cursor) and waits for it to be delivered."""
+        with self._cond:
+            if text is not None:
+                self._latest = text
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        metrics.inc("telegram_stream_coalesced_total", self.coalesced)
+
+    def _render(self, text: str, final: bool) -> str:
+        if len(text) > STREAM_PREVIEW_CHARS:
+            text = text[:STREAM_PREVIEW_CHARS] + "…"
+        return html.escape(self.header + text, quote=False) + ("" if final else CURSOR)
+
+    def _next(self):
+        """Blocks until there is something to show and the rate limit allows it."""
+        with self._cond:
+            while True:
+                if self._failed or (self._closed and self._final_shown) or (self._closed and not self._latest):
+                    return None
+                pending = self._latest and (self._latest != self._shown or (self._closed and not self._final_shown))
+                if pending:
+                    wait = self._bucket.wait_time()
+                    if wait <= 0:
+                        return self._latest, self._closed
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+
+    def _run(self):
+        while True:
+            step = self._next()
+            if step is None:
+                return
+            text, final = step
+            self._bucket.take()
+            try:
+                if self.message_id is None:
+                    self.message_id = send_message(self._render(text, final), chat_id=self.chat_id, retries=0).get("message_id")
+                    if self.message_id is None:
+                        raise ValueError("message_id가 없는 응답")
+                else:
+                    edit_message(self.message_id, self._render(text, final), chat_id=self.chat_id)
+                    self.edits += 1
+                metrics.inc("telegram_stream_updates_total", outcome="ok")
+            except Exception as e:
+                response = getattr(e, "response", None)
+                if response is not None and response.status_code == 429:
+                    delay = http_session.retry_after(response) or 1.0
+                    logger.warning(f"텔레그램 수정 속도 제한. {delay:.0f}초 후 다시 보냅니다.")
+                    self._bucket.pause(delay)
+                    metrics.inc("telegram_stream_updates_total", outcome="rate_limited")
+                    continue
+                logger.error(f"텔레그램 실시간 메시지 전송 실패: {e}")
+                metrics.inc("telegram_stream_updates_total", outcome="failed")
+                if self.message_id is None:
+                    with self._cond:
+                        self._failed = True
+                    return
+            with self._cond:
+                self._shown = text
+                self._final_shown = final
+
+
+def stream_to_telegram(chunks, chat_id=None, header: str = "") -> str:
+    """
+    Shows text chunks (e.g. llm.generate_stream) live in one Telegram message and
+    returns the full text. Telegram errors never interrupt the stream itself.
+    """
+    live = LiveMessage(chat_id=chat_id, header=header)
+    parts = []
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            live.update("".join(parts))
+    finally:
+        live.close("".join(parts))
+    logger.info(f"텔레그램 실시간 메시지 완료 (수정 {live.edits}회, 건너뛴 중간본 {live.coalesced}개)")
+    return "".join(parts)
+
+def send_to_telegram(text: str):
+    """
+    Sends a message to the configured Telegram chat.
+    """
+    try:
+        send_message(text)
         logger.info("텔레그램 메시지 전송 성공")
         return True
+    except ValueError as e:
+        logger.error(str(e))
+        return False
     except Exception as e:
         logger.error(f"텔레그램 메시지 전송 실패: {e}")
         if hasattr(e, 'response') and e.response is not None:
              logger.error(f"상세 오류 내용: {e.response.text}")
         return False
 
-def get_latest_telegram_reply(last_update_id=None):
+def get_telegram_updates(offset=None, timeout: int = 30) -> list:
     """
-    Polls the Telegram API for new messages from the user.
-    Returns the update_id and the text of the latest message.
+    Long-polls getUpdates and returns every update in the batch, oldest first.
+    Passing `offset` confirms all updates below it on Telegram's side.
+    Raises on network/API errors so callers can back off.
     """
     token = os.getenv("TELEGRAM_BOT_TOKEN")
     if not token:
-        return None, None
+        raise RuntimeError("TELEGRAM_BOT_TOKEN이 설정되지 않았습니다.")
         
     url = f"https://api.telegram.org/bot{token}/getUpdates"
-    params = {"offset": last_update_id + 1 if last_update_id else None, "timeout": 30}
+    params = {"offset": offset, "timeout": timeout}
+    response = http_session.get(url, params=params, timeout=timeout + 5)
+    response.raise_for_status()
+    return response.json().get("result", [])
+
+def set_webhook(url: str, secret_token: str, max_connections: int = 10) -> bool:
+    """
+    Registers `url` as the bot's webhook. Telegram then POSTs every update there with the
+    X-Telegram-Bot-Api-Secret-Token header, and getUpdates stops working until
+    delete_webhook() is called. Raises on network/API errors.
+    """
+    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    if not token:
+        raise RuntimeError("TELEGRAM_BOT_TOKEN이 설정되지 않았습니다.")
+    
+    payload = {
+        "url": url,
+        "secret_token": secret_token,
+        "max_connections": max_connections,
+        "allowed_updates": ["message"],
+    }
+    response = http_session.post(f"https://api.telegram.org/bot{token}/setWebhook", json=payload, timeout=15)
+    response.raise_for_status()
+    return bool(response.json().get("result"))
+
+def delete_webhook() -> bool:
+    """Removes the webhook so getUpdates can be used again; pending updates are kept."""
+    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    if not token:
+        raise RuntimeError("TELEGRAM_BOT_TOKEN이 설정되지 않았습니다.")
+    
+    response = http_session.post(f"https://api.telegram.org/bot{token}/deleteWebhook",
+                                 json={"drop_pending_updates": False}, timeout=15)
+    response.raise_for_status()
+    return bool(response.json().get("result"))
+
+def get_latest_telegram_reply(last_update_id=None):
+    """
+    Polls the Telegram API for new messages from the user.
+    Returns the update_id and the text of the latest message.
+    """
+    if not os.getenv("TELEGRAM_BOT_TOKEN"):
+        return None, None
     
     try:
-        response = requests.get(url, params=params, timeout=35)
-        response.raise_for_status()
-        updates = response.json().get("result", [])
+        updates = get_telegram_updates(last_update_id + 1 if last_update_id else None)
         
         if updates:
             # We take the most recent update
@@ -0,0 +1,180 @@
+import os
+import hmac
+import json
+import secrets
+import logging
+import threading
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+from src.telegram_bot import set_webhook
+from src.listener import UpdateDispatcher, handle_update, start_listener
+from src import http_session, metrics, outbound_queue
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+# Telegram updates are small; anything bigger is not from Telegram
+MAX_BODY_BYTES = 1024 * 1024
+# Parallel deliveries Telegram may open to us (setWebhook max_connections)
+MAX_CONNECTIONS = int(os.getenv("TELEGRAM_WEBHOOK_MAX_CONNECTIONS", "10"))
+# Accepted but unfinished updates; above this Telegram is told to retry later
+MAX_PENDING = int(os.getenv("TELEGRAM_WEBHOOK_MAX_PENDING", "100"))
+DEFAULT_LISTEN = os.getenv("TELEGRAM_WEBHOOK_LISTEN", "127.0.0.1:8080")
+
+
+class WebhookServer:
+    """
+    Small HTTP server that receives Telegram update POSTs and hands them to an
+    UpdateDispatcher, which runs the handler (queueing the post in src.outbound_queue)
+    with bounded concurrency. Each request is answered as soon as the update is accepted,
+    so Telegram never waits on the post to X.
+    """
+
+    def __init__(self, dispatcher: UpdateDispatcher, secret: str, path: str = "/telegram",
+                 host: str = "127.0.0.1", port: int = 8080, max_pending: int = MAX_PENDING):
+        self.dispatcher = dispatcher
+        self.secret = secret
+        self.path = path or "/"
+        self.max_pending = max_pending
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self) -> tuple:
+        return self.server.server_address[:2]
+
+    def start(self) -> "WebhookServer":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="telegram-webhook", daemon=True)
+        self._thread.start()
+        logger.info(f"웹훅 서버 시작: http://{self.address[0]}:{self.address[1]}{self.path}")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, path: str, headers, body: bytes) -> tuple:
+        """Validates and queues one delivery; returns (status, response dict)."""
+        if path.split("?", 1)[0] != self.path:
+            return 404, {"ok": False, "description": "not found"}
+        # Constant-time compare: the secret is the only thing authenticating Telegram
+        if not hmac.compare_digest(headers.get(SECRET_HEADER) or "", self.secret):
+            metrics.inc("webhook_updates_total", outcome="forbidden")
+            return 403, {"ok": False, "description": "bad secret token"}
+        try:
+            update = json.loads(body)
+            update_id = int(update["update_id"])
+        except (ValueError, TypeError, KeyError):
+            metrics.inc("webhook_updates_total", outcome="invalid")
+            return 400, {"ok": False, "description": "invalid update"}
+        if self.dispatcher.pending() >= self.max_pending:
+            # Telegram re-delivers failed webhook requests later
+            metrics.inc("webhook_updates_total", outcome="busy")
+            return 503, {"ok": False, "description": "busy"}
+
+        if self.dispatcher.submit(update):
+            metrics.inc("webhook_updates_total", outcome="accepted")
+        else:
+            logger.info(f"이미 받은 업데이트 {update_id}입니다. 건너뜁니다.")
+            metrics.inc("webhook_updates_total", outcome="duplicate")
+        return 200, {"ok": True}
+
+    def _handler_class(self):
+        webhook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, payload: dict):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 503:
+                    self.send_header("Retry-After", "5")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_BODY_BYTES:
+                    self.close_connection = True
+                    return self._send(413, {"ok": False, "description": "too large"})
+                body = self.rfile.read(length) if length else b""
+                self._send(*webhook.handle(self.path, self.headers, body))
+
+            def do_GET(self):
+                # Health check for the reverse proxy in front of us
+                if self.path == "/healthz":
+                    return self._send(200, {"ok": True, "pending": webhook.dispatcher.pending()})
+                self._send(404, {"ok": False, "description": "not found"})
+
+        return Handler
+
+
+def parse_listen(value: str) -> tuple:
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+def start_webhook(url: str, listen: str = DEFAULT_LISTEN, dry_run: bool = False, workers: int = 4,
+                  stop_event: threading.Event = None, secret: str = None):
+    """
+    Receives updates on a local HTTP server registered as the bot's webhook (`url` is
+    the public HTTPS address that forwards to `listen`). Falls back to getUpdates polling
+    when the webhook cannot be registered. Runs until Ctrl+C or until `stop_event` is set.
+    """
+    stop = stop_event or threading.Event()
+    # A fresh random secret per start works too: it is registered together with the URL
+    secret = secret or os.getenv("TELEGRAM_WEBHOOK_SECRET") or secrets.token_urlsafe(32)
+    host, port = parse_listen(listen)
+
+    dispatcher = UpdateDispatcher(partial(handle_update, dry_run=dry_run), max_workers=workers, in_order=False)
+    server = WebhookServer(dispatcher, secret, path=urlsplit(url).path or "/", host=host, port=port).start()
+    try:
+        set_webhook(url, secret, max_connections=MAX_CONNECTIONS)
+    except Exception as e:
+        logger.error(f"웹훅 등록 실패: {e}. getUpdates 폴링으로 전환합니다.")
+        server.stop()
+        dispatcher.shutdown()
+        return start_listener(dry_run=dry_run, workers=workers, stop_event=stop_event)
+    logger.info(f"텔레그램 웹훅 등록 완료: {url}")
+
+    try:
+        while not stop.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+
+    # The webhook stays registered: Telegram keeps new updates until we are back
+    logger.info("웹훅 서버를 종료합니다. 처리 중인 메시지를 마무리합니다...")
+    server.stop()
+    dispatcher.shutdown()
+    if stop_event is None:
+        outbound_queue.drain(timeout=30)
+        http_session.log_stats()
+        metrics.write_report("listener")
+
+if __name__ == "__main__":
+    import argparse
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Telegram to X Listener (webhook mode)")
+    parser.add_argument("--url", type=str, default=os.getenv("TELEGRAM_WEBHOOK_URL"),
+                        help="Public HTTPS URL Telegram posts updates to (default: TELEGRAM_WEBHOOK_URL)")
+    parser.add_argument("--listen", type=str, default=DEFAULT_LISTEN, help="Local host:port to serve on")
+    parser.add_argument("--dry-run", action="store_true", help="Run without posting to X")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Threads handling updates (queued for X; the outbound queue paces posting)")
+    args = parser.parse_args()
+    if not args.url:
+        parser.error("--url or TELEGRAM_WEBHOOK_URL is required")
+
+    start_webhook(args.url, listen=args.listen, dry_run=args.dry_run, workers=args.workers)
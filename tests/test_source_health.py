@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("STOCK_BOT_CACHE_DIR", tempfile.mkdtemp())
+
+from src import source_health
+from src.fanout import MODE_FIRST
+from biotech_news.src import fetch_biotech
+
+
+class FakeResponse:
+    fresh = False
+
+
+def test_half_open_source_closes_after_probe_in_first_mode(monkeypatch, tmp_path):
+    health = source_health.SourceHealth(path=str(tmp_path / "health.json"))
+    probed = fetch_biotech.RSS_SOURCES[-1]
+    for _ in range(source_health.FAILURE_THRESHOLD):
+        health.record_failure(probed['name'])
+    # Cooldown over: the circuit is half-open
+    health._stats[probed['name']]["opened_at"] = time.time() - health._stats[probed['name']]["cooldown"] - 1
+    assert health.state(probed['name']) == source_health.HALF_OPEN
+
+    def cached_get(url, **kwargs):
+        # The probe is the slowest source, so a healthy one always wins the first wave
+        if url == probed['url']:
+            time.sleep(0.2)
+        return FakeResponse()
+
+    entry = {'title': 'News', 'link': 'https://example.com/news', 'summary': '', 'published': int(time.time())}
+    monkeypatch.setattr(fetch_biotech, "get_health", lambda: health)
+    monkeypatch.setattr(fetch_biotech, "cached_get", cached_get)
+    monkeypatch.setattr(fetch_biotech, "cached_parse", lambda response, parse, version=None: [entry])
+
+    items = fetch_biotech.fetch_biotech_news(mode=MODE_FIRST, skip_seen=False)
+    assert items
+
+    # The probe was not cancelled with the rest of the wave; it finishes in the background
+    deadline = time.time() + 5
+    while health.state(probed['name']) != source_health.CLOSED and time.time() < deadline:
+        time.sleep(0.05)
+    assert health.state(probed['name']) == source_health.CLOSED
@@ -7,10 +7,12 @@ from dotenv import load_dotenv
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.post_tweet import post_to_x
+from src import outbound_queue, metrics, selection
+from src.pipeline import Pipeline, Source, Select, gemini_summarizer, publisher
+from xPosting.src import fetch_tweets, fetch_blog_rss
 from xPosting.src.fetch_tweets import fetch_ginkgo_tweets
 from xPosting.src.fetch_blog_rss import fetch_ginkgo_blog
-from xPosting.src.translate_tweets import translate_and_comment
+from xPosting.src.translate_tweets import translate_and_comment, stream_translation, batch_member, prompt_fields
 
 # Load environment variables from .env file for local development
 load_dotenv()
@@ -18,48 +20,48 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def main(dry_run: bool = False):
-    logger.info("깅코바이오웍스 X 큐레이션 봇을 시작합니다...")
-    
-    # 1. Try fetching tweets from experts first
-    content_source = "tweets"
-    tweets = fetch_ginkgo_tweets(lookback_hours=24)
-    
-    # 2. Fallback to Ginkgo blog RSS if X API fails
-    if not tweets:
-        logger.info("X API에서 트윗을 가져올 수 없습니다. Ginkgo 블로그 RSS로 전환합니다...")
-        content_source = "blog"
-        tweets = fetch_ginkgo_blog(lookback_hours=168)  # 7 days
-    
-    if not tweets:
-        logger.info("보고할 콘텐츠가 없습니다.")
-        return
+def build_pipeline(dry_run: bool = False, include_seen: bool = False, stream: bool = False) -> Pipeline:
+    """
+    fetch (expert tweets, falling back to the Ginkgo IR page) → select → translate + comment → publish.
+    """
+    def fetch(ctx):
+        # 1. Try fetching tweets from experts first
+        ctx["content_source"] = "tweets"
+        items = fetch_ginkgo_tweets(lookback_hours=24, skip_seen=not include_seen)
+        # 2. Fallback to Ginkgo blog RSS if X API fails
+        if not items:
+            logger.info("X API에서 트윗을 가져올 수 없습니다. Ginkgo 블로그 RSS로 전환합니다...")
+            ctx["content_source"] = "blog"
+            # The watermark is saved by the publish stage once the post is delivered
+            items, ctx["watermark"] = fetch_ginkgo_blog(lookback_hours=168, skip_seen=not include_seen)  # 7 days
+        return items
 
-    # 3. Translate and add commentary
-    if not os.getenv("GEMINI_API_KEY"):
-        logger.error("GEMINI_API_KEY가 없습니다. 번역을 건너뜁니다.")
-        return
-        
-    content = translate_and_comment(tweets, content_type=content_source)
-    logger.info("번역 및 해설 생성 완료:")
-    print("-" * 40)
-    print(content)
-    print("-" * 40)
+    def seen_source(ctx):
+        return fetch_tweets.SEEN_SOURCE if ctx["content_source"] == "tweets" else fetch_blog_rss.SEEN_SOURCE
 
-    if content.startswith("Error"):
-        logger.error("번역 생성 실패. 트위터 포스팅을 건너뜁니다.")
-        return
+    return Pipeline("xposting", [
+        Source("fetch", fetch),
+        Select("select", lambda items, ctx: selection.select(items, prompt_fields(ctx["content_source"]))),
+        gemini_summarizer(lambda items, ctx: translate_and_comment(items, content_type=ctx["content_source"]),
+                          lambda items, ctx: batch_member(items, content_type=ctx["content_source"]),
+                          lambda items, ctx: stream_translation(items, content_type=ctx["content_source"])),
+        publisher(seen_source),
+    ], dry_run=dry_run, stream=stream)
 
-    # 3. Post to X
-    if dry_run:
-        logger.info("테스트 모드 활성화. 트위터 포스팅을 건너뜁니다.")
-    else:
-        post_to_x(content)
+def main(dry_run: bool = False, include_seen: bool = False, stream: bool = False):
+    logger.info("깅코바이오웍스 X 큐레이션 봇을 시작합니다...")
+    return build_pipeline(dry_run=dry_run, include_seen=include_seen, stream=stream).run()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Ginkgo Bioworks X Curation Bot")
     parser.add_argument("--dry-run", action="store_true", help="Run without posting to X")
+    parser.add_argument("--stream", action="store_true", help="Show the Gemini draft live in Telegram while it is generated")
+    parser.add_argument("--include-seen", action="store_true", help="Do not skip content already delivered in previous runs")
     
     args = parser.parse_args()
     
-    main(dry_run=args.dry_run)
+    main(dry_run=args.dry_run, include_seen=args.include_seen, stream=args.stream)
+    
+    # Posts are queued; give them a chance to go out before the process exits
+    outbound_queue.drain()
+    metrics.write_report("xposting")
@@ -1,104 +1,161 @@
-import requests
-from bs4 import BeautifulSoup
+import time
 import logging
-from datetime import datetime, timedelta
+import importlib.util
+from src.http_cache import cached_get, cached_parse
+from src import seen_store, metrics
+from src.news_item import NewsItem, parse_utc, filter_since
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def fetch_ginkgo_blog(lookback_hours: int = 168) -> list:
+SEEN_SOURCE = "ginkgo_ir"
+
+BASE_URL = "https://investors.ginkgobioworks.com"
+NEWS_URL = f"{BASE_URL}/news/default.aspx"
+
+# Upper bound on pages walked in one run (page 1 is always fetched)
+MAX_PAGES = 5
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9,ko;q=0.8',
+    'Referer': f'{BASE_URL}/',
+    'Connection': 'keep-alive'
+}
+
+def _parser_backend() -> str:
+    # lxml is several times faster than html.parser but optional
+    return 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+
+def _absolute(link: str) -> str:
+    if link and not link.startswith('http'):
+        return f"{BASE_URL}{link}"
+    return link
+
+def _parse_press_releases(content: bytes) -> dict:
+    """
+    Extracts the releases (title, link, date_str) and the next-page link from one IR news
+    page. Only the .module_item blocks and the pager link are built into a tree. The
+    result is stored next to the HTTP cache so an unchanged page is not parsed again.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer  # lazy: only needed when the page changed
+    
+    wanted = SoupStrainer(class_=lambda c: c in ('module_item', 'pager_next'))
+    soup = BeautifulSoup(content, _parser_backend(), parse_only=wanted)
+    
+    # Identified selectors from browser analysis
+    entries = []
+    for item in soup.select('.module_item'):
+        try:
+            # Extract Headline Link
+            link_elem = item.select_one('.module_headline-link')
+            if not link_elem:
+                continue
+            
+            # Title typically in <h4> or the link text itself
+            title_elem = link_elem.find('h4') or link_elem
+            title = title_elem.get_text(strip=True)
+            
+            # Date extraction
+            date_elem = item.select_one('.module_date-text')
+            date_str = date_elem.get_text(strip=True) if date_elem else ""
+            
+            entries.append({'title': title, 'link': _absolute(link_elem['href']), 'date_str': date_str})
+        except Exception as e:
+            logger.warning(f"항목 파싱 중 오류: {e}")
+            continue
+    
+    next_elem = soup.select_one('a.pager_next[href]')
+    return {'items': entries, 'next': _absolute(next_elem['href']) if next_elem else None}
+
+def scrape_press_releases(cutoff: int, max_pages: int = MAX_PAGES) -> tuple:
+    """
+    Walks the IR news pages newest first and stops at the first page that reaches the
+    watermark (the newest release of the last delivered post) or the cutoff epoch, so a
+    normal run touches only page 1. Pages that did not change are answered from the HTTP cache.
+    
+    Returns:
+        tuple: (NewsItems from every page walked, newest first; (link, published) of the
+        newest release, or None). The caller saves the pair once its post is delivered.
+    """
+    watermark = seen_store.watermark(SEEN_SOURCE)
+    now = int(time.time())
+    releases = []
+    url = NEWS_URL
+    pages = 0
+    
+    while url and pages < max_pages:
+        logger.info(f"Ginkgo IR 보도자료 페이지 스크래핑 중: {url}")
+        response = cached_get(url, headers=HEADERS, timeout=15)
+        page = cached_parse(response, _parse_press_releases, version="strained")
+        pages += 1
+        
+        # Date format: Jan 12, 2024 (UTC midnight). If parsing fails, use the current time
+        items = [
+            NewsItem(
+                item['title'],
+                item['link'],
+                summary=f"발표일: {item['date_str']}\n{item['title']}",
+                publisher='Ginkgo Investor Relations',
+                published=parse_utc(item['date_str'], "%b %d, %Y") or now
+            )
+            for item in page['items']
+        ]
+        releases.extend(items)
+        
+        if not items:
+            break
+        reached_watermark = bool(watermark) and any(
+            item.link == watermark.get('link') or item.published < watermark.get('published', 0) for item in items
+        )
+        if reached_watermark or min(item.published for item in items) < cutoff:
+            break
+        url = page['next']
+    
+    metrics.inc("ir_pages_total", pages)
+    newest = None
+    if releases:
+        latest = max(releases, key=lambda item: item.published)
+        newest = (latest.link, latest.published)
+    logger.info(f"Ginkgo IR 페이지 {pages}개를 확인했습니다.")
+    return releases, newest
+
+@metrics.timed("fetch_seconds", source="ginkgo_ir")
+def fetch_ginkgo_blog(lookback_hours: int = 168, skip_seen: bool = True) -> tuple:
     """
     Fetch recent press releases from Ginkgo's Investor Relations page as fallback.
     
     Args:
         lookback_hours (int): How many hours back to search (default: 168 = 7 days).
+        skip_seen (bool): Drop releases already delivered in a previous run.
         
     Returns:
-        list: List of press release dictionaries.
+        tuple: (NewsItems for the press releases, watermark pair for the pipeline's ctx).
     """
     try:
-        url = "https://investors.ginkgobioworks.com/news/default.aspx"
+        cutoff = int(time.time()) - lookback_hours * 3600
+        releases, newest = scrape_press_releases(cutoff)
         
-        logger.info(f"Ginkgo IR 보도자료 페이지 스크래핑 중: {url}")
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9,ko;q=0.8',
-            'Referer': 'https://investors.ginkgobioworks.com/',
-            'Connection': 'keep-alive'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Identified selectors from browser analysis
-        news_items = soup.select('.module_item')
-        
-        if not news_items:
+        if not releases:
             logger.warning("뉴스 항목(.module_item)을 찾을 수 없습니다. 페이지 구조 확인 필요.")
-            return []
+            return [], None
         
-        press_releases = []
-        cutoff_time = datetime.utcnow() - timedelta(hours=lookback_hours)
+        press_releases = filter_since(releases, cutoff)
         
-        for item in news_items:
-            try:
-                # Extract Headline Link
-                link_elem = item.select_one('.module_headline-link')
-                if not link_elem:
-                    continue
-                
-                # Title typically in <h4> or the link text itself
-                title_elem = link_elem.find('h4') or link_elem
-                title = title_elem.get_text(strip=True)
-                
-                # Link handling
-                link = link_elem['href']
-                if link and not link.startswith('http'):
-                    link = f"https://investors.ginkgobioworks.com{link}"
-                
-                # Date extraction
-                date_elem = item.select_one('.module_date-text')
-                date_str = date_elem.get_text(strip=True) if date_elem else ""
-                
-                # Parse date (Format: Jan 12, 2024)
-                # If parsing fails, use current time but keep original string
-                pub_date = datetime.utcnow()
-                try:
-                    if date_str:
-                        pub_date = datetime.strptime(date_str, "%b %d, %Y")
-                except:
-                    pass
-                
-                if pub_date >= cutoff_time:
-                    press_releases.append({
-                        'title': title,
-                        'summary': f"발표일: {date_str}\n{title}",
-                        'link': link,
-                        'published_at': pub_date.strftime('%Y-%m-%d %H:%M:%S'),
-                        'source': 'Ginkgo Investor Relations'
-                    })
-                
-                if len(press_releases) >= 3:
-                    break
-                    
-            except Exception as e:
-                logger.warning(f"항목 파싱 중 오류: {e}")
-                continue
+        if skip_seen:
+            press_releases = seen_store.filter_new(SEEN_SOURCE, press_releases)
         
         logger.info(f"Ginkgo IR 보도자료 {len(press_releases)}개를 찾았습니다.")
-        return press_releases
+        return press_releases, newest
         
     except Exception as e:
         logger.error(f"Ginkgo IR 페이지 스크래핑 오류: {e}")
-        return []
+        return [], None
 
 if __name__ == "__main__":
     # Test
-    posts = fetch_ginkgo_blog()
+    posts, _ = fetch_ginkgo_blog()
     for post in posts:
         print(f"{post['title']}: {post['summary'][:100]}...")
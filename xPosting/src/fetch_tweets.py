@@ -1,7 +1,9 @@
 import os
-import tweepy
+import time
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from src import seen_store, metrics, http_session
+from xPosting.src import tweet_store
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,83 +18,161 @@ EXPERT_ACCOUNTS = [
     "FierceBiotech",    # Biotech news
 ]
 
-def fetch_ginkgo_tweets(lookback_hours: int = 24) -> list:
+SEEN_SOURCE = "x_tweets"
+
+# search/recent: up to 100 results per request; pages per run bound the read quota
+PAGE_SIZE = 100
+MAX_PAGES = 5
+# since_id must fall inside search/recent's 7-day window
+MAX_SINCE_ID_AGE = 6.5 * 24 * 3600
+METRICS_REFRESH_AFTER = 6 * 3600
+
+# Twitter snowflake IDs carry their creation time in ms since this epoch
+SNOWFLAKE_EPOCH_MS = 1288834974657
+
+def build_query() -> str:
+    # Search for Ginkgo-related keywords from expert accounts
+    # Note: $DNA (cashtag) not supported in Basic tier
+    keywords = "(Ginkgo OR \"Ginkgo Bioworks\" OR DNA OR synbio)"
+    accounts_query = " OR ".join([f"from:{acc}" for acc in EXPERT_ACCOUNTS])
+    return f"{keywords} ({accounts_query}) -is:retweet"
+
+def snowflake_time(tweet_id: int) -> float:
+    return ((int(tweet_id) >> 22) + SNOWFLAKE_EPOCH_MS) / 1000
+
+def _get_client():
+    """
+    The shared posting client from src.post_tweet (its bearer token is used for search),
+    or a bearer-only client when user credentials are not configured.
+    """
+    from src.post_tweet import get_client
+    client = get_client()
+    if client is not None:
+        return client
+    bearer_token = os.getenv("X_BEARER_TOKEN")
+    if not bearer_token:
+        return None
+    # Imported lazily to keep startup fast when X is not used
+    import tweepy
+    client = tweepy.Client(bearer_token=bearer_token)
+    http_session.mount_overrides(client.session)
+    return client
+
+def search_new_tweets(client, query: str, start_time: datetime, max_pages: int = MAX_PAGES) -> int:
+    """
+    Pulls tweets newer than the stored since_id (or since `start_time` on the first run),
+    following next_token, into the tweet store. The checkpoint only advances after all
+    pages were read, so a failed run is retried from the same point.
+    
+    Returns:
+        int: Number of tweets fetched.
+    """
+    store = tweet_store.get_store()
+    since_id = store.since_id(query)
+    if since_id and time.time() - snowflake_time(since_id) > MAX_SINCE_ID_AGE:
+        logger.info("since_id가 검색 기간(7일)을 벗어났습니다. 시간 범위로 검색합니다.")
+        since_id = None
+    
+    params = {
+        "query": query,
+        "max_results": PAGE_SIZE,
+        "tweet_fields": ['created_at', 'author_id', 'public_metrics'],
+        "expansions": ['author_id'],
+        "user_fields": ['username', 'name'],
+    }
+    if since_id:
+        params["since_id"] = since_id
+    else:
+        params["start_time"] = start_time
+    
+    newest_id = None
+    fetched = 0
+    next_token = None
+    for page in range(max_pages):
+        response = client.search_recent_tweets(next_token=next_token, **params)
+        metrics.inc("x_search_requests_total")
+        meta = response.meta or {}
+        # Results are newest first: the first page carries the new checkpoint
+        if newest_id is None and meta.get('newest_id'):
+            newest_id = meta['newest_id']
+        if response.data:
+            users = {user.id: user for user in (response.includes or {}).get('users', [])}
+            store.upsert(response.data, users)
+            fetched += len(response.data)
+        next_token = meta.get('next_token')
+        if not next_token:
+            break
+    else:
+        if next_token:
+            logger.warning(f"검색 결과가 {max_pages}페이지를 넘습니다. 나머지 오래된 트윗은 건너뜁니다.")
+    
+    metrics.inc("x_tweets_read_total", fetched)
+    if newest_id:
+        store.set_since_id(query, newest_id)
+    logger.info(f"새 트윗 {fetched}개를 가져왔습니다 (since_id={since_id or '없음'}).")
+    return fetched
+
+def refresh_metrics(client, since: int, older_than: float = METRICS_REFRESH_AFTER) -> int:
+    """
+    Re-reads public_metrics of stored tweets (one lookup for up to 100 IDs). Costs read
+    quota, so it is opt-in.
+    """
+    store = tweet_store.get_store()
+    ids = store.stale_ids(since, older_than)[:100]
+    if not ids:
+        return 0
+    response = client.get_tweets(ids, tweet_fields=['public_metrics'])
+    metrics.inc("x_lookup_requests_total")
+    if response.data:
+        store.update_metrics(response.data)
+        metrics.inc("x_tweets_read_total", len(response.data))
+    return len(response.data or [])
+
+@metrics.timed("fetch_seconds", source="x_tweets")
+def fetch_ginkgo_tweets(lookback_hours: int = 24, skip_seen: bool = True, refresh: bool = False) -> list:
     """
     Fetch tweets from biotech experts mentioning Ginkgo Bioworks.
     
+    Only tweets newer than the last checkpoint are requested; candidates come from the
+    local tweet store, so tweets fetched by earlier runs in the window still count.
+    
     Args:
         lookback_hours (int): How many hours back to search (default: 24).
+        skip_seen (bool): Drop tweets already delivered in a previous run.
+        refresh (bool): Re-read engagement metrics of stored tweets before ranking.
         
     Returns:
-        list: List of tweet dictionaries with text, author, timestamp, url.
+        list: NewsItems (text as title, url as link; author, author_name, likes, retweets in extra).
     """
-    consumer_key = os.getenv("X_CONSUMER_KEY")
-    consumer_secret = os.getenv("X_CONSUMER_SECRET")
-    access_token = os.getenv("X_ACCESS_TOKEN")
-    access_token_secret = os.getenv("X_ACCESS_TOKEN_SECRET")
-    bearer_token = os.getenv("X_BEARER_TOKEN")
-
-    if not all([consumer_key, consumer_secret, access_token, access_token_secret]):
+    client = _get_client()
+    if client is None:
         logger.error("X API 인증 정보가 없습니다.")
         return []
-
+    
     try:
-        # Initialize Tweepy client
-        client = tweepy.Client(
-            bearer_token=bearer_token,
-            consumer_key=consumer_key,
-            consumer_secret=consumer_secret,
-            access_token=access_token,
-            access_token_secret=access_token_secret
-        )
-        
-        # Build search query
-        # Search for Ginkgo-related keywords from expert accounts
-        # Note: $DNA (cashtag) not supported in Basic tier
-        keywords = "(Ginkgo OR \"Ginkgo Bioworks\" OR DNA OR synbio)"
-        accounts_query = " OR ".join([f"from:{acc}" for acc in EXPERT_ACCOUNTS])
-        query = f"{keywords} ({accounts_query}) -is:retweet"
-        
-        # Calculate time range
-        start_time = datetime.utcnow() - timedelta(hours=lookback_hours)
+        query = build_query()
+        start_time = datetime.now(timezone.utc) - timedelta(hours=lookback_hours)
         
         logger.info(f"X 검색 중: {query}")
+        search_new_tweets(client, query, start_time)
         
-        # Search tweets
-        response = client.search_recent_tweets(
-            query=query,
-            start_time=start_time,
-            max_results=10,
-            tweet_fields=['created_at', 'author_id', 'public_metrics'],
-            expansions=['author_id'],
-            user_fields=['username', 'name']
-        )
+        since = int(start_time.timestamp())
+        if refresh:
+            refresh_metrics(client, since)
         
-        if not response.data:
+        tweets = tweet_store.get_store().recent(since)
+        if not tweets:
             logger.info("Ginkgo 관련 트윗을 찾을 수 없습니다.")
             return []
         
-        # Process tweets
-        tweets = []
-        users_dict = {user.id: user for user in response.includes['users']}
-        
-        for tweet in response.data:
-            author = users_dict.get(tweet.author_id)
-            tweets.append({
-                'text': tweet.text,
-                'author': f"@{author.username}" if author else "Unknown",
-                'author_name': author.name if author else "Unknown",
-                'created_at': tweet.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                'url': f"https://twitter.com/{author.username}/status/{tweet.id}" if author else "",
-                'likes': tweet.public_metrics['like_count'],
-                'retweets': tweet.public_metrics['retweet_count']
-            })
+        if skip_seen:
+            tweets = seen_store.filter_new(SEEN_SOURCE, tweets)
         
-        # Sort by engagement (likes + retweets)
+        # Sort by engagement (likes + retweets); the selection stage decides how many are used
         tweets.sort(key=lambda x: x['likes'] + x['retweets'], reverse=True)
         
         logger.info(f"최근 {lookback_hours}시간 내 Ginkgo 관련 트윗 {len(tweets)}개를 찾았습니다.")
-        return tweets[:3]  # Return top 3 most engaging tweets
+        return tweets
         
     except Exception as e:
         logger.error(f"트윗 가져오기 오류: {e}")
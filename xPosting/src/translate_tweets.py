@@ -1,46 +1,23 @@
 import os
-from google import genai
 import logging
+from src import llm, llm_batch, metrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def translate_and_comment(content_items: list, content_type: str = "tweets") -> str:
+def prompt_fields(content_type: str) -> tuple:
+    """Item fields the prompt uses (what the token budget is spent on)."""
+    return ("text", "author", "author_name") if content_type == "tweets" else ("title", "summary", "link")
+
+def build_instructions(content_type: str = "tweets") -> str:
     """
-    Translate content to Korean and add investment commentary.
-    
-    Args:
-        content_items (list): List of tweet or blog post dictionaries.
-        content_type (str): "tweets" or "blog"
-        
-    Returns:
-        str: Korean translation with commentary for X post.
+    The task instructions without the content. They only depend on the content type,
+    so a batched request carries them once.
     """
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        logger.error("환경 변수에서 GEMINI_API_KEY를 찾을 수 없습니다.")
-        return "오류: API 키가 없습니다."
-
-    if not content_items:
-        return "오늘 깅코바이오웍스 관련 콘텐츠가 없습니다."
-
-    # Prepare content text based on type
-    content_text = ""
-    if content_type == "tweets":
-        for idx, item in enumerate(content_items[:3], 1):
-            content_text += f"{idx}. @{item['author']} ({item['author_name']}):\n"
-            content_text += f"   \"{item['text']}\"\n"
-            content_text += f"   (좋아요: {item['likes']}, 리트윗: {item['retweets']})\n\n"
-    else:  # blog posts
-        for idx, item in enumerate(content_items[:3], 1):
-            content_text += f"{idx}. {item['title']}\n"
-            content_text += f"   {item['summary']}\n"
-            content_text += f"   링크: {item['link']}\n\n"
-
     source_description = "해외 바이오테크 전문가들의 최근 트윗" if content_type == "tweets" else "깅코바이오웍스 공식 블로그의 최근 포스트"
     
-    prompt = f"""
+    return f"""
     당신은 바이오테크 전문 애널리스트입니다.
     다음은 깅코바이오웍스(Ginkgo Bioworks)에 대한 {source_description}입니다.
     한국 투자자들을 위해 이를 요약하고 해설해주세요.
@@ -62,23 +39,73 @@ def translate_and_comment(content_items: list, content_type: str = "tweets") ->
     5. 마무리:
        - 출처: {'각 트윗 작성자 명시' if content_type == 'tweets' else 'Ginkgo 공식 블로그'}
        - 해시태그: #DNA #깅코바이오웍스 #바이오테크
-    
+    """
+
+def build_task(content_items: list, content_type: str = "tweets") -> str:
+    """The tweets or blog posts to translate and comment on."""
+    # Prepare content text based on type
+    content_text = ""
+    if content_type == "tweets":
+        for idx, item in enumerate(content_items, 1):
+            content_text += f"{idx}. @{item['author']} ({item['author_name']}):\n"
+            content_text += f"   \"{item['text']}\"\n"
+            content_text += f"   (좋아요: {item['likes']}, 리트윗: {item['retweets']})\n\n"
+    else:  # blog posts
+        for idx, item in enumerate(content_items, 1):
+            content_text += f"{idx}. {item['title']}\n"
+            content_text += f"   {item['summary']}\n"
+            content_text += f"   링크: {item['link']}\n\n"
+
+    return f"""
     콘텐츠:
     {content_text}
     """
+
+def build_prompt(content_items: list, content_type: str = "tweets") -> str:
+    """
+    Builds the translation/commentary prompt for tweets or blog posts.
+    """
+    return build_instructions(content_type) + build_task(content_items, content_type)
+
+def batch_member(content_items: list, content_type: str = "tweets") -> llm_batch.BatchMember:
+    """This content as one member of a batched Gemini request (see src.llm_batch)."""
+    task = build_task(content_items, content_type)
+    return llm_batch.BatchMember("xposting", build_instructions(content_type), task)
+
+@metrics.timed("summarize_seconds", bot="xposting")
+def translate_and_comment(content_items: list, content_type: str = "tweets") -> str:
+    """
+    Translate content to Korean and add investment commentary.
     
-    try:
-        client = genai.Client(api_key=api_key)
+    Args:
+        content_items (list): List of tweet or blog post dictionaries. All of them go into the
+            prompt, so callers pre-select them (the pipeline's Select stage, or src.selection.select).
+        content_type (str): "tweets" or "blog"
         
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt
-        )
-        return response.text
+    Returns:
+        str: Korean translation with commentary for X post.
+    """
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        logger.error("환경 변수에서 GEMINI_API_KEY를 찾을 수 없습니다.")
+        return "오류: API 키가 없습니다."
+
+    if not content_items:
+        return "오늘 깅코바이오웍스 관련 콘텐츠가 없습니다."
+
+    prompt = build_prompt(content_items, content_type)
+
+    try:
+        return llm.generate(prompt, model='gemini-2.5-flash')
     except Exception as e:
         logger.error(f"번역 및 해설 생성 오류: {e}")
         return f"Error: {e}"
 
+def stream_translation(content_items: list, content_type: str = "tweets"):
+    """Like translate_and_comment, but yields the text as Gemini writes it."""
+    prompt = build_prompt(content_items, content_type)
+    yield from llm.generate_stream(prompt, model='gemini-2.5-flash')
+
 if __name__ == "__main__":
     # Test stub
     logger.info("테스트 실행...")
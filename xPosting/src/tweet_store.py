@@ -0,0 +1,163 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from src.paths import cache_path
+from src.news_item import NewsItem
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Search/recent only reaches back 7 days; keep a little longer for metric refreshes
+RETENTION_DAYS = float(os.getenv("TWEET_STORE_RETENTION_DAYS", "10"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    id            INTEGER PRIMARY KEY,
+    author_id     INTEGER,
+    username      TEXT,
+    name          TEXT,
+    text          TEXT NOT NULL,
+    created_at    INTEGER NOT NULL,
+    likes         INTEGER NOT NULL DEFAULT 0,
+    retweets      INTEGER NOT NULL DEFAULT 0,
+    replies       INTEGER NOT NULL DEFAULT 0,
+    quotes        INTEGER NOT NULL DEFAULT 0,
+    impressions   INTEGER NOT NULL DEFAULT 0,
+    fetched_at    INTEGER NOT NULL,
+    metrics_at    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tweets_created ON tweets (created_at);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    query_hash TEXT PRIMARY KEY,
+    since_id   INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+"""
+
+def query_hash(query: str) -> str:
+    # A since_id only makes sense for the exact query that produced it
+    return hashlib.sha1(query.encode("utf-8")).hexdigest()
+
+def _metric_columns(public_metrics: dict) -> tuple:
+    m = public_metrics or {}
+    return (m.get("like_count", 0), m.get("retweet_count", 0), m.get("reply_count", 0),
+            m.get("quote_count", 0), m.get("impression_count", 0))
+
+
+class TweetStore:
+    """
+    Local copy of searched tweets with their latest public metrics, plus the since_id
+    checkpoint per search query.
+    """
+
+    def __init__(self, path: str = None, retention_days: float = RETENTION_DAYS):
+        self.path = path or cache_path("tweets.db")
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self.evict()
+
+    def since_id(self, query: str):
+        with self._lock:
+            row = self._conn.execute("SELECT since_id FROM checkpoints WHERE query_hash = ?", (query_hash(query),)).fetchone()
+        return row[0] if row else None
+
+    def set_since_id(self, query: str, since_id: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO checkpoints (query_hash, since_id, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(query_hash) DO UPDATE SET since_id = MAX(since_id, excluded.since_id), updated_at = excluded.updated_at",
+                (query_hash(query), int(since_id), int(time.time()))
+            )
+
+    def upsert(self, tweets: list, users: dict):
+        """
+        Stores tweepy Tweet objects. `users` maps author_id -> tweepy User (from includes).
+        Existing rows only get their metrics updated.
+        """
+        now = int(time.time())
+        rows = []
+        for tweet in tweets:
+            user = users.get(tweet.author_id)
+            rows.append((
+                int(tweet.id), tweet.author_id, user.username if user else None, user.name if user else None,
+                tweet.text, int(tweet.created_at.timestamp()), *_metric_columns(tweet.public_metrics), now, now
+            ))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO tweets (id, author_id, username, name, text, created_at, likes, retweets, replies, quotes, "
+                "impressions, fetched_at, metrics_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET likes = excluded.likes, retweets = excluded.retweets, "
+                "replies = excluded.replies, quotes = excluded.quotes, impressions = excluded.impressions, "
+                "metrics_at = excluded.metrics_at",
+                rows
+            )
+
+    def update_metrics(self, tweets: list):
+        """Refreshes metrics from a tweet lookup (tweepy Tweet objects with public_metrics)."""
+        now = int(time.time())
+        rows = [(*_metric_columns(t.public_metrics), now, int(t.id)) for t in tweets]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE tweets SET likes = ?, retweets = ?, replies = ?, quotes = ?, impressions = ?, metrics_at = ? WHERE id = ?",
+                rows
+            )
+
+    def stale_ids(self, since: int, older_than: float) -> list:
+        """IDs of tweets created after `since` whose metrics are older than `older_than` seconds."""
+        cutoff = int(time.time() - older_than)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM tweets WHERE created_at >= ? AND metrics_at < ? ORDER BY created_at DESC",
+                (since, cutoff)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def recent(self, since: int) -> list:
+        """NewsItems for stored tweets created at or after the UTC epoch `since`."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, username, name, text, created_at, likes, retweets FROM tweets "
+                "WHERE created_at >= ? ORDER BY created_at DESC",
+                (since,)
+            ).fetchall()
+        items = []
+        for tweet_id, username, name, text, created_at, likes, retweets in rows:
+            author = f"@{username}" if username else "Unknown"
+            items.append(NewsItem(
+                text,
+                link=f"https://twitter.com/{username}/status/{tweet_id}" if username else "",
+                publisher=author,
+                published=created_at,
+                extra={'author': author, 'author_name': name or "Unknown", 'likes': likes, 'retweets': retweets}
+            ))
+        return items
+
+    def evict(self, retention_days: float = None):
+        retention = self.retention_days if retention_days is None else retention_days
+        cutoff = int(time.time() - retention * 86400)
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM tweets WHERE created_at < ?", (cutoff,)).rowcount
+        if deleted:
+            logger.info(f"{retention}일이 지난 트윗 {deleted}개를 삭제했습니다.")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store() -> TweetStore:
+    """Returns the process-wide TweetStore."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TweetStore()
+        return _store